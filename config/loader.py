@@ -0,0 +1,319 @@
+import os
+import json
+from types import MappingProxyType
+from config.settings import Config
+from config.trading_params import TradingParams
+
+ENV_PREFIX = 'METRICTREES_'
+PROFILE_ENV = 'METRICTREES_PROFILE'
+CONFIG_FILE_ENV = 'METRICTREES_CONFIG'
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+
+# freeze() tarafından türetilen, dosyadan okunmayan alanlar
+DERIVED_KEYS = ('MODEL_ORDER', 'WEIGHT_MATRIX', 'HORIZONS')
+
+
+class ConfigError(ValueError):
+    """Konfigürasyon okunamadı veya doğrulanamadı"""
+
+
+def _defaults():
+    """Config ve TradingParams sınıf sabitlerinden varsayılan değerler"""
+    values = {}
+    for source in (Config, TradingParams):
+        for key in dir(source):
+            if key.isupper():
+                values[key] = getattr(source, key)
+    return values
+
+
+def _read_file(path):
+    """TOML, YAML veya JSON profil dosyasını oku"""
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == '.toml':
+            import tomllib
+            with open(path, 'rb') as f:
+                return tomllib.load(f)
+        if ext in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ConfigError("YAML profilleri için PyYAML kurulu olmalı")
+            with open(path, 'r') as f:
+                return yaml.safe_load(f) or {}
+        if ext == '.json':
+            with open(path, 'r') as f:
+                return json.load(f)
+    except ConfigError:
+        raise
+    except FileNotFoundError:
+        raise ConfigError(f"Konfigürasyon dosyası bulunamadı: {path}")
+    except Exception as e:
+        raise ConfigError(f"Konfigürasyon dosyası okunamadı ({path}): {e}")
+
+    raise ConfigError(f"Desteklenmeyen konfigürasyon formatı: {path}")
+
+
+def _profile_path(profile):
+    for ext in ('.toml', '.yaml', '.yml', '.json'):
+        path = os.path.join(PROFILES_DIR, profile + ext)
+        if os.path.exists(path):
+            return path
+    raise ConfigError(f"Profil bulunamadı: {profile}")
+
+
+def _parse_env_value(raw, default):
+    """Ortam değişkenini varsayılan değerin tipine göre çöz"""
+    if isinstance(default, str):
+        return raw
+    if isinstance(default, bool):
+        return raw.strip().lower() in ('1', 'true', 'yes', 'on')
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        raise ConfigError(f"Ortam değişkeni çözülemedi: {raw!r}")
+
+
+def _resolve_path(value, base_dir):
+    if isinstance(value, str) and value and not os.path.isabs(value):
+        return os.path.join(base_dir, value)
+    return value
+
+
+def _normalize(values):
+    """Anahtar tiplerini ve göreli dosya yollarını düzelt"""
+    # TOML/JSON anahtarları string olur: rejimleri int'e çevir
+    values['ENSEMBLE_WEIGHTS'] = {
+        int(regime): {name: float(w) for name, w in weights.items()}
+        for regime, weights in values['ENSEMBLE_WEIGHTS'].items()
+    }
+
+    base_dir = values['BASE_DIR']
+    for key, value in values.items():
+        if key.endswith('_PATH'):
+            values[key] = _resolve_path(value, base_dir)
+        elif key.endswith('_PATHS') and isinstance(value, dict):
+            values[key] = {name: _resolve_path(p, base_dir) for name, p in value.items()}
+
+    # Ufuk bazlı model yolları iki seviyeli: {ufuk: {model: yol}}
+    values['HORIZON_MODEL_PATHS'] = {
+        int(horizon): {name: _resolve_path(p, base_dir) for name, p in paths.items()}
+        for horizon, paths in values['HORIZON_MODEL_PATHS'].items()
+    }
+    return values
+
+
+def validate(values):
+    """Değerleri bir kez, başlangıçta doğrula"""
+    defaults = _defaults()
+    errors = []
+
+    for key, value in values.items():
+        default = defaults.get(key)
+        if default is None or value is None:
+            continue
+        expected = float if isinstance(default, float) else type(default)
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            continue
+        if expected is list and isinstance(value, tuple):
+            continue
+        if not isinstance(value, expected):
+            errors.append(f"{key}: {expected.__name__} bekleniyordu, {type(value).__name__} geldi")
+
+    if errors:
+        raise ConfigError("; ".join(errors))
+
+    if values['LOOK_BACK'] <= 0 or values['STEP_AHEAD'] <= 0:
+        errors.append("LOOK_BACK ve STEP_AHEAD pozitif olmalı")
+    if values['FEATURES'] != len(values['FEATURES_LIST']):
+        errors.append(f"FEATURES ({values['FEATURES']}) != len(FEATURES_LIST) ({len(values['FEATURES_LIST'])})")
+    if not values['MODEL_PATHS']:
+        errors.append("MODEL_PATHS boş olamaz")
+    if values['VOLATILITY_THRESHOLD_LOW'] >= values['VOLATILITY_THRESHOLD_HIGH']:
+        errors.append("VOLATILITY_THRESHOLD_LOW < VOLATILITY_THRESHOLD_HIGH olmalı")
+    for name, precision in values['MODEL_PRECISION'].items():
+        if name not in values['MODEL_PATHS'] or precision not in ('float32', 'float16', 'int8'):
+            errors.append(f"MODEL_PRECISION geçersiz: {name}={precision}")
+    for horizon, paths in values['HORIZON_MODEL_PATHS'].items():
+        if horizon <= 0 or horizon == values['STEP_AHEAD'] or not paths:
+            errors.append(f"HORIZON_MODEL_PATHS geçersiz ufuk: {horizon} (pozitif, STEP_AHEAD'den farklı ve boş olmamalı)")
+    if values['REGIME_VOL_WINDOW'] < 2 or values['REGIME_SLOPE_WINDOW'] < 2 or values['REGIME_MIN_DWELL'] < 1:
+        errors.append("REGIME_VOL_WINDOW/REGIME_SLOPE_WINDOW >= 2 ve REGIME_MIN_DWELL >= 1 olmalı")
+    if not 0 <= values['SPECULATIVE_START_SECOND'] < 59:
+        errors.append("SPECULATIVE_START_SECOND [0, 59) aralığında olmalı")
+    if min(values['API_TIMEOUT'], values['ASYNC_FETCH_TIMEOUT'], values['ASYNC_COMPUTE_TIMEOUT'],
+           values['ASYNC_PUBLISH_TIMEOUT']) <= 0:
+        errors.append("API_TIMEOUT ve ASYNC_*_TIMEOUT pozitif olmalı")
+    if values['FEATURE_CACHE_MAX_MB'] <= 0 or values['FEATURE_CACHE_FLUSH_ROWS'] < 1 \
+            or values['FEATURE_CACHE_MEMORY_PARTITIONS'] < 1:
+        errors.append("FEATURE_CACHE_MAX_MB > 0, FEATURE_CACHE_FLUSH_ROWS ve FEATURE_CACHE_MEMORY_PARTITIONS >= 1 olmalı")
+    for minutes in values['TIMEFRAMES']:
+        if not isinstance(minutes, int) or minutes <= 1 or 1440 % minutes:
+            errors.append(f"TIMEFRAMES geçersiz: {minutes} (1'den büyük ve 1440'ı bölen dakika olmalı)")
+    if values['TIMEFRAMES'] and values['INTERVAL'] != '1m':
+        errors.append("TIMEFRAMES sadece INTERVAL = '1m' ile kullanılabilir")
+    if values['TIMEFRAME_WINDOW_SIZE'] < 2:
+        errors.append("TIMEFRAME_WINDOW_SIZE >= 2 olmalı")
+    if values['ENSEMBLE_DEADLINE_MS'] < 0 or values['ENSEMBLE_MAX_MISSES'] < 1 \
+            or values['ENSEMBLE_EXCLUDE_MINUTES'] < 1:
+        errors.append("ENSEMBLE_DEADLINE_MS >= 0, ENSEMBLE_MAX_MISSES ve ENSEMBLE_EXCLUDE_MINUTES >= 1 olmalı")
+    if not 0 <= values['ADMIN_PORT'] <= 65535 or values['ADMIN_STALE_SECONDS'] <= 0:
+        errors.append("ADMIN_PORT [0, 65535] aralığında ve ADMIN_STALE_SECONDS > 0 olmalı")
+    if values['ADMIN_ENABLED'] and values['ADMIN_HOST'] not in ('127.0.0.1', 'localhost', '::1') \
+            and not values['ADMIN_TOKEN']:
+        errors.append("ADMIN_HOST yerel değilse ADMIN_TOKEN verilmeli")
+    if values['PROFILE_MINUTES'] < 1 or values['PROFILE_SAMPLE_INTERVAL_MS'] <= 0:
+        errors.append("PROFILE_MINUTES >= 1 ve PROFILE_SAMPLE_INTERVAL_MS > 0 olmalı")
+    if values['CHECKPOINT_EVERY'] < 1 or values['CHECKPOINT_PUBLISH_MAX_AGE'] < 0:
+        errors.append("CHECKPOINT_EVERY >= 1 ve CHECKPOINT_PUBLISH_MAX_AGE >= 0 olmalı")
+    if values['DATASET_CHUNK_SAMPLES'] < 1:
+        errors.append("DATASET_CHUNK_SAMPLES >= 1 olmalı")
+    if values['ASYNC_IO_WORKERS'] < 1 or values['ASYNC_CPU_WORKERS'] < 1:
+        errors.append("ASYNC_IO_WORKERS ve ASYNC_CPU_WORKERS >= 1 olmalı")
+    if not 0 <= values['REGIME_HYSTERESIS'] < 1:
+        errors.append("REGIME_HYSTERESIS [0, 1) aralığında olmalı")
+    if values['MIN_POSITION_SIZE'] > values['MAX_POSITION_SIZE']:
+        errors.append("MIN_POSITION_SIZE <= MAX_POSITION_SIZE olmalı")
+
+    missing = set(defaults['ENSEMBLE_WEIGHTS']) - set(values['ENSEMBLE_WEIGHTS'])
+    if missing:
+        errors.append(f"ENSEMBLE_WEIGHTS eksik rejimler: {sorted(missing)}")
+
+    for regime, weights in values['ENSEMBLE_WEIGHTS'].items():
+        unknown = set(weights) - set(values['MODEL_PATHS'])
+        if unknown:
+            errors.append(f"Rejim {regime}: bilinmeyen modeller {sorted(unknown)}")
+        if any(w < 0 for w in weights.values()):
+            errors.append(f"Rejim {regime}: negatif ağırlık")
+
+    if errors:
+        raise ConfigError("; ".join(errors))
+
+
+def compile_weight_matrix(ensemble_weights, model_order):
+    """Ağırlık tablosunu model sırasına hizalı (rejim x model) NumPy matrisine çevir
+
+    Satır indeksi rejim numarasıdır; tanımsız rejimlerin satırı sıfırdır.
+    """
+    import numpy as np
+
+    n_rows = max(ensemble_weights) + 1 if ensemble_weights else 1
+    matrix = np.zeros((n_rows, len(model_order)))
+    for regime, weights in ensemble_weights.items():
+        for j, name in enumerate(model_order):
+            matrix[regime, j] = weights.get(name, 0.0)
+    matrix.setflags(write=False)
+    return matrix
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class RuntimeConfig:
+    """Doğrulanmış, değiştirilemez çalışma zamanı konfigürasyonu
+
+    Alanlar Config ve TradingParams sabitleriyle aynı isimlerdedir; somut sınıf
+    anahtarlara göre __slots__ ile oluşturulur (bkz. freeze).
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"RuntimeConfig değiştirilemez: {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"RuntimeConfig değiştirilemez: {name}")
+
+    def __repr__(self):
+        return f"RuntimeConfig(profile={self.PROFILE!r})"
+
+    def as_dict(self):
+        """Değerleri düz sözlük olarak döndür"""
+        def thaw(value):
+            if isinstance(value, MappingProxyType):
+                return {k: thaw(v) for k, v in value.items()}
+            if isinstance(value, tuple):
+                return [thaw(v) for v in value]
+            return value
+
+        return {key: thaw(getattr(self, key)) for key in self.__slots__
+                if key not in DERIVED_KEYS}
+
+    def weight_vector(self, regime):
+        """Rejim için MODEL_ORDER sırasına hizalı ağırlık vektörü"""
+        return self.WEIGHT_MATRIX[regime]
+
+    def replace(self, **overrides):
+        """Bazı alanları değiştirilmiş yeni (doğrulanmış) bir kopya döndür"""
+        values = self.as_dict()
+        values.update(overrides)
+        return freeze(values)
+
+
+def freeze(values):
+    """Sözlüğü doğrula ve slotlu, değiştirilemez RuntimeConfig nesnesine çevir"""
+    values = _normalize(dict(values))
+    validate(values)
+
+    values['MODEL_ORDER'] = tuple(values['MODEL_PATHS'])
+    values['WEIGHT_MATRIX'] = compile_weight_matrix(values['ENSEMBLE_WEIGHTS'], values['MODEL_ORDER'])
+    values['HORIZONS'] = tuple(sorted({values['STEP_AHEAD'], *values['HORIZON_MODEL_PATHS']}))
+    values.setdefault('PROFILE', 'default')
+
+    keys = tuple(sorted(values))
+    frozen_type = type('RuntimeConfig', (RuntimeConfig,), {'__slots__': keys})
+    instance = object.__new__(frozen_type)
+    for key in keys:
+        object.__setattr__(instance, key, _freeze(values[key]))
+    return instance
+
+
+def load_config(profile=None, path=None, environ=None):
+    """Varsayılanlar < profil dosyası < ortam değişkenleri sırasıyla konfigürasyonu yükle"""
+    environ = os.environ if environ is None else environ
+    values = _defaults()
+
+    profile = profile or environ.get(PROFILE_ENV)
+    path = path or environ.get(CONFIG_FILE_ENV)
+    if profile and not path:
+        path = _profile_path(profile)
+
+    if path:
+        for key, value in _read_file(path).items():
+            key = key.upper()
+            if key not in values:
+                raise ConfigError(f"Bilinmeyen konfigürasyon anahtarı: {key} ({path})")
+            values[key] = value
+
+    for env_key, raw in environ.items():
+        if not env_key.startswith(ENV_PREFIX) or env_key in (PROFILE_ENV, CONFIG_FILE_ENV):
+            continue
+        key = env_key[len(ENV_PREFIX):]
+        if key in values:
+            values[key] = _parse_env_value(raw, values[key])
+
+    values['PROFILE'] = profile or (os.path.basename(path) if path else 'default')
+    return freeze(values)
+
+
+_runtime_config = None
+
+
+def get_config():
+    """Paylaşılan konfigürasyonu döndür (ilk çağrıda ortamdan yüklenir)"""
+    global _runtime_config
+    if _runtime_config is None:
+        _runtime_config = load_config()
+    return _runtime_config
+
+
+def set_config(config):
+    """Başlangıçta yüklenen konfigürasyonu paylaşılan nesne olarak ayarla"""
+    global _runtime_config
+    _runtime_config = config
@@ -1,26 +1,56 @@
+import os
+
+
 class Config:
     # API Ayarları
     API_BASE_URL = "https://api.metrictrees.yusuf-erdem.com/api/v1"
     TOKEN_ID = 2 # XRP
     INTERVAL = "1m"
+    API_RECORD_PATH = ''  # Doluysa API istek/yanıtları bu JSONL dosyasına kaydedilir (utils/replay.py)
+    API_TIMEOUT = 10.0  # HTTP isteği başına zaman aşımı (saniye)
+
+    # Veri Kalite Kontrolü
+    DATA_QUALITY_ENABLED = True
+    MAX_BACKFILL_MINUTES = 180  # Tek aralık isteğiyle geri doldurulabilecek maksimum boşluk
+    MAX_GAP_FILL_MINUTES = 3  # API'de de bulunamayan boşluklarda ileri doldurma limiti
 
     # Model Ayarları
     LOOK_BACK = 60
     STEP_AHEAD = 15
     FEATURES = 20
 
+    # Proje kök dizini (dosya yolları buna göre çözülür)
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
     # Model Dosya Yolları
     MODEL_PATHS = {
-        'lstm': r'C:\Users\lunaf\Desktop\Projects\MetricTrees-AI\MetricTrees-Prediction-Model\models\saved_models\LSTM_best_model.h5',
-        'cnn_lstm': r'C:\Users\lunaf\Desktop\Projects\MetricTrees-AI\MetricTrees-Prediction-Model\models\saved_models\CNN-LSTM_best_model.h5',
-        'transformer_lstm': r'C:\Users\lunaf\Desktop\Projects\MetricTrees-AI\MetricTrees-Prediction-Model\models\saved_models\Transformer-LSTM_best_model.h5',
-        'attention_gru': r'C:\Users\lunaf\Desktop\Projects\MetricTrees-AI\MetricTrees-Prediction-Model\models\saved_models\Attention-GRU_best_model.h5',
-        'stacked_lstm': r'C:\Users\lunaf\Desktop\Projects\MetricTrees-AI\MetricTrees-Prediction-Model\models\saved_models\Stacked-LSTM_best_model.h5'
+        'lstm': os.path.join(BASE_DIR, 'models', 'saved_models', 'LSTM_best_model.h5'),
+        'cnn_lstm': os.path.join(BASE_DIR, 'models', 'saved_models', 'CNN-LSTM_best_model.h5'),
+        'transformer_lstm': os.path.join(BASE_DIR, 'models', 'saved_models', 'Transformer-LSTM_best_model.h5'),
+        'attention_gru': os.path.join(BASE_DIR, 'models', 'saved_models', 'Attention-GRU_best_model.h5'),
+        'stacked_lstm': os.path.join(BASE_DIR, 'models', 'saved_models', 'Stacked-LSTM_best_model.h5')
     }
 
     # Scaler Dosya Yolları
-    SCALER_X_PATH = r'C:\Users\lunaf\Desktop\Projects\MetricTrees-AI\MetricTrees-Prediction-Model\data\scalers\scaler_X.pkl'
-    SCALER_Y_PATH = r'C:\Users\lunaf\Desktop\Projects\MetricTrees-AI\MetricTrees-Prediction-Model\data\scalers\scaler_y.pkl'
+    SCALER_X_PATH = os.path.join(BASE_DIR, 'data', 'scalers', 'scaler_X.pkl')
+    SCALER_Y_PATH = os.path.join(BASE_DIR, 'data', 'scalers', 'scaler_y.pkl')
+
+    # Model Hassasiyeti: {'model_adı': 'float32' | 'float16' | 'int8'}
+    # float32 dışındaki varyantlar scripts/quantize_models.py ile üretilir
+    MODEL_PRECISION = {}
+    QUANTIZED_MODEL_DIR = os.path.join(BASE_DIR, 'models', 'saved_models', 'quantized')
+    TFLITE_NUM_THREADS = 1
+
+    # Çoklu Ufuk Tahmini: {ufuk_dakika: {'model_adı': 'model_yolu.h5'}}
+    # STEP_AHEAD ufku MODEL_PATHS ile tanımlıdır; ek ufuklar aynı feature'ları ve
+    # ölçeklenmiş girdiyi paylaşır, ağırlıkları ENSEMBLE_WEIGHTS'ten model adına göre alır.
+    # Örn: {1: {'lstm': 'models/saved_models/h1/LSTM_best_model.h5'}, 5: {...}, 60: {...}}
+    HORIZON_MODEL_PATHS = {}
+
+    # Artifact Paketi (scripts/build_bundle.py çıktısı). Varsa modeller, scaler
+    # parametreleri, feature listesi ve ağırlıklar buradan okunur.
+    ARTIFACT_BUNDLE_PATH = os.path.join(BASE_DIR, 'artifacts', 'bundle')
+    USE_ARTIFACT_BUNDLE = True
 
     # Feature Listesi (kullandığınız feature'lar)
     FEATURES_LIST = [
@@ -30,6 +60,93 @@ class Config:
         'rsi_7', 'cmf_20', 'macd_hist'
     ]
 
+    # Eğitim Veri Seti (scripts/build_dataset.py): canlı feature koduyla memmap .npy çıktısı
+    DATASET_PATH = os.path.join(BASE_DIR, 'data', 'dataset')
+    DATASET_CHUNK_SAMPLES = 4096  # Parça başına örnek; bellek ~ parça x LOOK_BACK x FEATURES x 8 bayt
+
+    # Kalıcı Feature Cache'i: token başına günlük sütunlu dosyalar, feature tanımlarının özetiyle sürümlenir
+    FEATURE_CACHE_ENABLED = False
+    FEATURE_CACHE_PATH = os.path.join(BASE_DIR, 'data', 'cache', 'features')
+    FEATURE_CACHE_MAX_MB = 512  # Aşılırsa en eski günlük bölümler silinir
+    FEATURE_CACHE_FLUSH_ROWS = 60  # Bu kadar yeni satır birikince diske yazılır
+    FEATURE_CACHE_MEMORY_PARTITIONS = 8  # Bellekte tutulan günlük bölüm sayısı
+
+    # Çoklu Zaman Dilimi: 1m akışından artımlı toplanan dilimler (dakika, ör. [5, 15, 60]); boşsa kapalı
+    TIMEFRAMES = []
+    TIMEFRAME_WINDOW_SIZE = 180  # Dilim başına pencere uzunluğu (bar)
+
+    # Ensemble Ağırlık Dosyası (scripts/optimize_weights.py çıktısı)
+    ENSEMBLE_WEIGHTS_PATH = os.path.join(BASE_DIR, 'models', 'ensemble_weights.json')
+    PREDICTION_CACHE_PATH = os.path.join(BASE_DIR, 'data', 'cache', 'model_predictions.csv')
+    RECORD_PREDICTIONS = True  # Model bazlı tahminleri cache'e yaz
+    ONLINE_WEIGHT_UPDATE = False  # Gerçekleşen fiyatlarla ağırlıkları canlı güncelle
+
+    # Süre Sınırlı Ensemble: dakika başına çıkarım bütçesi (ms); 0 = kapalı (birleşik model, süre sınırı yok)
+    ENSEMBLE_DEADLINE_MS = 0.0
+    ENSEMBLE_MAX_MISSES = 3  # Bu kadar ardışık süre aşımında model dışlanır
+    ENSEMBLE_EXCLUDE_MINUTES = 30  # Dışlanan modelin yeniden denenmesine kadar geçen süre
+
+    # İşlem Günlüğü (yalnızca eklemeli; açık pozisyonlar yeniden başlatmada buradan kurulur)
+    LEDGER_PATH = os.path.join(BASE_DIR, 'data', 'ledger', 'trades.bin')
+
+    # Son kararların bellekte tutulduğu halka tampon uzunluğu (dakika)
+    DECISION_LOG_SIZE = 1440
+
+    # Spekülatif Ön Hesaplama: dakika kapanmadan feature ve model çıktısını hazırla
+    SPECULATIVE_ENABLED = False
+    SPECULATIVE_START_SECOND = 45  # Oluşmakta olan barla ön hesaplamanın başladığı saniye
+    SPECULATIVE_PRICE_TOLERANCE = 0.0005  # Kapanış barının OHLC göreli farkı bunun altındaysa sonuç kullanılır
+    SPECULATIVE_VOLUME_TOLERANCE = 0.25  # Hacim için göreli fark eşiği
+
+    # asyncio Çalışma Modu (main.py --async): aşama başına zaman aşımları (saniye)
+    ASYNC_FETCH_TIMEOUT = 15.0  # Bar çekme (ağ G/Ç)
+    ASYNC_COMPUTE_TIMEOUT = 40.0  # Feature, tahmin, sinyal ve risk (executor'da CPU)
+    ASYNC_PUBLISH_TIMEOUT = 15.0  # Tahmin gönderimi (ağ G/Ç, sonraki işlerle örtüşür)
+    ASYNC_IO_WORKERS = 8  # Bloklayan HTTP çağrıları için thread sayısı
+    ASYNC_CPU_WORKERS = 2  # Feature ve çıkarım için thread sayısı
+
+    # Gölge (shadow) Model Değerlendirmesi: {'aday_adı': 'model_yolu.h5'}
+    SHADOW_MODEL_PATHS = {}
+    SHADOW_MAX_CPU_SHARE = 0.25  # Gölge işçinin kullanabileceği maksimum CPU payı
+    SHADOW_NICE = 10  # Gölge işçi thread önceliği (Linux nice)
+    SHADOW_LOG_PATH = 'logs/shadow_predictions.csv'
+
+    # Canlı Doğruluk ve Drift İzleme
+    MONITOR_WINDOW = 60  # Kayan değerlendirme penceresi (tahmin sayısı)
+    DRIFT_EW_ALPHA = 0.01  # Feature drift için üstel ortalama katsayısı
+    DRIFT_Z_THRESHOLD = 3.0  # Eğitim ortalamasından sapma alarm eşiği (z-skoru)
+
     # Logging
     LOG_LEVEL = "INFO"
-    LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
\ No newline at end of file
+    LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_MAX_BYTES = 10 * 1024 * 1024  # Log dosyası bu boyutta döndürülür
+    LOG_BACKUP_COUNT = 5  # Saklanan eski log dosyası sayısı
+
+    # Bellek İzleme (utils/memory_guard.py)
+    MEMORY_GUARD_ENABLED = True
+    MEMORY_SNAPSHOT_INTERVAL = 30  # RSS örnekleme aralığı (dakika)
+    MEMORY_WARMUP_MINUTES = 120  # Büyüme hesabına katılmayan ısınma süresi (dakika)
+    MEMORY_HISTORY_SIZE = 672  # Tutulan RSS örneği sayısı (30 dk aralıkla 2 hafta)
+    MEMORY_GROWTH_ALERT_MB_PER_DAY = 20.0  # Kararlı durumda bu eğimin üstü uyarı
+    MEMORY_TRACEMALLOC = False  # Python tahsislerini izle (ek CPU/bellek maliyeti var)
+    MEMORY_TRACEMALLOC_FRAMES = 1
+    MEMORY_TOP_ALLOCATIONS = 5  # Uyarıda loglanan en çok büyüyen satır sayısı
+
+    # Yönetim Uç Noktası (utils/admin_server.py): GET /status /metrics /health, POST /pause /resume /reload /profile
+    ADMIN_ENABLED = False
+    ADMIN_HOST = '127.0.0.1'  # Sadece yerel erişim; dışarı açmak için ADMIN_TOKEN da verilmeli
+    ADMIN_PORT = 8765
+    ADMIN_TOKEN = ''  # Doluysa POST komutları X-Admin-Token başlığı ister
+    ADMIN_STALE_SECONDS = 180  # /health: son tamamlanan dakikadan bu kadar süre geçtiyse 503
+
+    # İsteğe Bağlı Profilleme: kill -USR1 <pid> veya tetikleme dosyası (içeriği: dakika sayısı, isteğe bağlı)
+    PROFILE_PATH = os.path.join(BASE_DIR, 'logs', 'profiles')
+    PROFILE_TRIGGER_PATH = os.path.join(BASE_DIR, 'logs', 'profiles', 'trigger')
+    PROFILE_MINUTES = 5  # Tetiklemeden sonra profillenen dakikalık işlem sayısı
+    PROFILE_SAMPLE_INTERVAL_MS = 10.0  # Oturum boyunca yığın örnekleme aralığı
+
+    # Durum Kontrol Noktası (utils/checkpoint.py): yeniden başlatmada pencere ve durum diskten yüklenir
+    CHECKPOINT_ENABLED = False
+    CHECKPOINT_PATH = os.path.join(BASE_DIR, 'data', 'checkpoints', 'state.npz')
+    CHECKPOINT_EVERY = 1  # Kaç dakikada bir yazılır
+    CHECKPOINT_PUBLISH_MAX_AGE = 50  # Gönderilmemiş karar bu kadar saniyeden eskiyse yeniden gönderilmez
\ No newline at end of file
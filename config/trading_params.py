@@ -31,18 +31,34 @@ class TradingParams:
         }
     }
 
+    # Ağırlık Optimizasyonu
+    WEIGHT_FIT_WINDOW = 1440  # Kayan pencere uzunluğu (örnek)
+    WEIGHT_FIT_STEP = 240  # Pencere kayma adımı
+    WEIGHT_MIN_SAMPLES = 120  # Rejim başına minimum örnek
+    ONLINE_WEIGHT_DECAY = 0.995  # Online modda üstel unutma katsayısı
+    ONLINE_WEIGHT_REFIT_EVERY = 60  # Online modda kaç gözlemde bir ağırlık güncellenir
+
     # Al/Sat Sinyal Parametreleri
     TOLERANCE = 0.001  # %0.1 tolerans
     MIN_MOVE = 0.002  # Minimum %0.2 hareket
     STOP_LOSS_THRESHOLD = 0.02  # %2 stop loss
+    FILTER_TRACE_ENABLED = True  # Filtre çalışma/veto izini kaydet ve say
+    ATR_STOP_MULTIPLIER = 2.0  # Stop mesafesi = ATR * çarpan (boyutlandırmada da kullanılır)
 
     # Pozisyon Yönetimi
-    MAX_POSITION_SIZE = 1000  # Maksimum pozisyon büyüklüğü
-    MIN_POSITION_SIZE = 10  # Minimum pozisyon büyüklüğü
-    RISK_PER_TRADE = 0.02  # Trade başına risk %2
+    MAX_POSITION_SIZE = 1000  # Maksimum pozisyon büyüklüğü (nominal, kote para)
+    MIN_POSITION_SIZE = 10  # Minimum pozisyon büyüklüğü (nominal); altındaki işlemler yapılmaz
+    RISK_PER_TRADE = 0.02  # Trade başına risk %2 (stop'ta kaybedilecek özsermaye payı)
+    MAX_POSITIONS_PER_TOKEN = 1  # Aynı yönde eşzamanlı açık pozisyon limiti
+    TRADE_FEE_RATE = 0.0  # İşlem başına komisyon oranı (nominal değer üzerinden)
+    INITIAL_CAPITAL = 10000.0  # Özsermaye eğrisi ve turnover için başlangıç sermayesi
 
     # Piyasa Durumu Parametreleri
     VOLATILITY_THRESHOLD_HIGH = 0.02  # Yüksek volatilite eşiği
     VOLATILITY_THRESHOLD_LOW = 0.005  # Düşük volatilite eşiği
     TREND_THRESHOLD = 0.001  # Trend eşiği
-    SIDEWAYS_THRESHOLD = 0.0005  # Sideways eşiği
\ No newline at end of file
+    SIDEWAYS_THRESHOLD = 0.0005  # Sideways eşiği
+    REGIME_VOL_WINDOW = 20  # Volatilite penceresi (log getiri sayısı)
+    REGIME_SLOPE_WINDOW = 60  # Trend eğimi penceresi (kapanış sayısı)
+    REGIME_HYSTERESIS = 0.1  # Mevcut rejimden çıkmak için eşiklerin bu oranda aşılması gerekir
+    REGIME_MIN_DWELL = 3  # Yeni rejim bu kadar ardışık dakika görülmeden geçiş yapılmaz
\ No newline at end of file
@@ -2,21 +2,32 @@ import requests
 import pandas as pd
 import logging
 from datetime import datetime, timedelta, timezone
-from config.settings import Config
+from config.loader import get_config
+from trading.decision import API_SIGNAL_IDS
 
 
 class APIClient:
-    def __init__(self):
-        self.config = Config()
+    def __init__(self, config=None, clock=None, recorder=None):
+        self.config = config or get_config()
         self.logger = logging.getLogger('api_client')
         self.base_url = self.config.API_BASE_URL
+        # clock: "şimdi"yi döndüren çağrılabilir (replay'de simüle saat)
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        # recorder: istek/yanıtları kaydeden ApiRecorder (replay harness için)
+        self.recorder = recorder
+        if self.recorder is None and self.config.API_RECORD_PATH:
+            from utils.replay import ApiRecorder
+            self.recorder = ApiRecorder(self.config.API_RECORD_PATH)
 
     def get_historical_data(self, minutes=180):
         """Geçmiş veriyi çek"""
-        try:
-            end_time = datetime.now(timezone.utc)
-            start_time = end_time - timedelta(minutes=minutes)
+        end_time = self.clock()
+        start_time = end_time - timedelta(minutes=minutes)
+        return self.get_range_data(start_time, end_time)
 
+    def get_range_data(self, start_time, end_time):
+        """Belirli bir zaman aralığındaki barları tek istekle çek"""
+        try:
             params = {
                 'tokenId': self.config.TOKEN_ID,
                 'interval': self.config.INTERVAL,
@@ -24,10 +35,13 @@ class APIClient:
                 'endTime': int(end_time.timestamp())
             }
 
-            response = requests.get(f"{self.base_url}/Prices/getinterval", params=params)
+            response = requests.get(f"{self.base_url}/Prices/getinterval", params=params,
+                                    timeout=self.config.API_TIMEOUT)
             response.raise_for_status()
 
             data = response.json()
+            if self.recorder is not None:
+                self.recorder.record('getinterval', params, data)
             df = pd.DataFrame(data["data"])
 
             # Zaman sütununu datetime'a çevir
@@ -44,7 +58,7 @@ class APIClient:
     def get_latest_data(self):
         """En son 1 dakikalık veriyi çek"""
         try:
-            end_time = datetime.now(timezone.utc)
+            end_time = self.clock()
             start_time = end_time - timedelta(minutes=1)
 
             params = {
@@ -54,10 +68,13 @@ class APIClient:
                 'endTime': int(end_time.timestamp())
             }
 
-            response = requests.get(f"{self.base_url}/Prices/getinterval", params=params)
+            response = requests.get(f"{self.base_url}/Prices/getinterval", params=params,
+                                    timeout=self.config.API_TIMEOUT)
             response.raise_for_status()
 
             data = response.json()
+            if self.recorder is not None:
+                self.recorder.record('getinterval', params, data)
 
             if data and len(data) > 0:
                 latest = data["data"][-1]
@@ -74,23 +91,37 @@ class APIClient:
             self.logger.error(f"Son veri çekme hatası: {e}")
             return pd.DataFrame()  # Hata durumunda da boş DataFrame döndür
 
-    def send_prediction(self, predicted_price, strategy_type, signal):
-        """Tahmin ve sinyali API'ye gönder"""
+    def send_prediction(self, predicted_price, strategy_type, signal, horizon_predictions=None):
+        """Tahmin ve sinyali (int8 kod) API'ye gönder
+
+        horizon_predictions ({ufuk_dakika: fiyat}) birden fazla ufuk içeriyorsa
+        aynı istekte gönderilir; tek ufukta yük değişmez.
+        """
         try:
             data = {
-                'tokenId': 2,
+                'tokenId': self.config.TOKEN_ID,
                 'predictedPrice': predicted_price,
-                'timestamp': int(datetime.now(timezone.utc).timestamp()),
+                'timestamp': int(self.clock().timestamp()),
                 'stateId': int(strategy_type),
-                'signalId': 1 if signal == 'buy' else 2 if signal == 'hold' else 3 # 'buy', 'sell', 'hold'
+                'signalId': int(API_SIGNAL_IDS[signal + 1])  # buy=1, hold=2, sell=3
             }
+            if horizon_predictions and len(horizon_predictions) > 1:
+                data['horizonPredictions'] = {str(h): float(p) for h, p in horizon_predictions.items()}
             print(data)
-            response = requests.post(f"{self.base_url}/ModelPredictions/add", json=data)
+            response = requests.post(f"{self.base_url}/ModelPredictions/add", json=data,
+                                     timeout=self.config.API_TIMEOUT)
             response.raise_for_status()
+            if self.recorder is not None:
+                self.recorder.record('prediction', data, response.status_code)
 
             self.logger.info(f"Tahmin gönderildi: {data}")
             return True
 
         except Exception as e:
             self.logger.error(f"Tahmin gönderme hatası: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def send_decision(self, record, horizon_predictions=None):
+        """DecisionRecord'daki tahmin, rejim ve sinyali gönder"""
+        prediction = None if record.prediction != record.prediction else float(record.prediction)  # NaN -> None
+        return self.send_prediction(prediction, record.regime, record.signal, horizon_predictions)
\ No newline at end of file
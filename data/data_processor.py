@@ -3,23 +3,55 @@ import numpy as np
 import logging
 import pickle
 import warnings
-from config.settings import Config
+from config.loader import get_config
+from data.time_features import get_calendar_table
+from models.artifact_bundle import get_bundle
 
 # FutureWarning'leri sustur
 warnings.filterwarnings('ignore', category=FutureWarning)
 
 
+def rolling_slope_series(series, window):
+    """Kayan OLS eğimi; rolling(window).apply(np.polyfit) ile aynı sonuç, tek matris çarpımı
+
+    Pencerede NaN varsa sonuç NaN'dır (rolling'in min_periods=window davranışı).
+    """
+    values = series.to_numpy(dtype=np.float64)
+    slope = np.full(len(values), np.nan)
+    if len(values) >= window:
+        x = np.arange(window) - (window - 1) / 2
+        slope[window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window) @ x / (x @ x)
+    return pd.Series(slope, index=series.index)
+
+
 class DataProcessor:
-    def __init__(self):
-        self.config = Config()
+    def __init__(self, config=None, with_scalers=True):
+        self.config = config or get_config()
         self.logger = logging.getLogger('data_processor')
+        self.calendar = get_calendar_table()
+
+        # Scaler'ları yükle (veri seti üretiminde scaler'lar yeniden öğrenilir, gerekmez)
+        self.scaler_X = self.scaler_y = None
+        if with_scalers:
+            self.load_scalers()
 
-        # Scaler'ları yükle
-        self.load_scalers()
+        # Kalıcı feature cache'i (FEATURE_CACHE_ENABLED): token başına, zaman damgasıyla anahtarlı
+        self.feature_cache = None
+        if self.config.FEATURE_CACHE_ENABLED:
+            from data.feature_cache import FeatureCache
+            self.feature_cache = FeatureCache(self.config)
 
     def load_scalers(self):
         """Scaler'ları yükle"""
         try:
+            bundle = get_bundle(self.config)
+            if bundle is not None:
+                # Paketteki düz diziler: sklearn unpickle gerekmez
+                self.scaler_X = bundle.load_scaler('scaler_X')
+                self.scaler_y = bundle.load_scaler('scaler_y')
+                self.logger.info(f"Scaler'lar artifact paketinden yüklendi: v{bundle.version}")
+                return
+
             with open(self.config.SCALER_X_PATH, 'rb') as f:
                 self.scaler_X = pickle.load(f)
 
@@ -32,14 +64,33 @@ class DataProcessor:
             self.logger.error(f"Scaler yükleme hatası: {e}")
             raise
 
-    def calculate_features(self, df, look_back=60, step_ahead=15):
+    def calculate_features(self, df, look_back=60):
         """Feature'ları hesapla (sizin kodunuzdan)"""
+        return self.compute_features(df, look_back).tail(60)
+
+    def compute_features(self, df, look_back=60):
+        """NaN'sız tüm feature satırları; canlı yol ve veri seti üretimi aynı kodu kullanır"""
         # Kopyala
         price_df = df[['open', 'high', 'low', 'close', 'volumeTo']].copy()
         price_df['close'] = pd.to_numeric(price_df['close'], errors='coerce')
 
-        # Hedef (tahmin için gerekli değil ama feature hesabında kullanılıyor)
-        price_df['target'] = price_df['close'].shift(-step_ahead)
+        # Sadece geçmiş barlara bağlı sütunlar cache'ten okunabilir; pencereye bağlı olanlar her zaman hesaplanır
+        if self.feature_cache is not None and isinstance(price_df.index, pd.DatetimeIndex):
+            price_df = self.feature_cache.invariant_features(self, price_df, look_back)
+        else:
+            price_df = self.invariant_features(price_df, look_back)
+        self.add_window_features(price_df)
+
+        # NaN'ları temizle
+        price_df.dropna(inplace=True)
+
+        return price_df
+
+    def invariant_features(self, price_df, look_back=60):
+        """Değeri yalnızca son look_back bara bağlı sütunlar (pencere başından bağımsız)"""
+        # Not: hedef (close.shift(-STEP_AHEAD)) burada hesaplanmaz; dropna son
+        # STEP_AHEAD barı atıp modeli eski veriyle besliyordu. Tüm ufuklar aynı
+        # feature'ları paylaşır.
 
         # Çoklu lag özellikleri
         for lag in [5, 20, 60, look_back]:
@@ -48,23 +99,11 @@ class DataProcessor:
         # Rolling özet istatistikler
         windows = [20, 60, look_back]
 
-        # Slope fonksiyonunu loop dışında tanımla
-        def safe_slope(x):
-            try:
-                if len(x) == 0 or x.isna().all():
-                    return np.nan
-                clean_x = x.dropna()
-                if len(clean_x) < 2:
-                    return np.nan
-                return np.polyfit(np.arange(len(clean_x)), clean_x.values, 1)[0]
-            except:
-                return np.nan
-
         for w in windows:
             # FutureWarning tamamen düzeltildi
             rolling_mean = price_df['close'].rolling(w).mean()
             rolling_std = price_df['close'].rolling(w).std()
-            rolling_slope = price_df['close'].rolling(w).apply(safe_slope, raw=False)
+            rolling_slope = rolling_slope_series(price_df['close'], w)
 
             price_df[f'close_mean_{w}'] = rolling_mean
             price_df[f'close_std_{w}'] = rolling_std
@@ -96,23 +135,6 @@ class DataProcessor:
 
         price_df['atr_14'] = tr.rolling(14).mean()
 
-        # VWAP
-        pv = ((price_df['high'] + price_df['low'] + price_df['close']) / 3) * price_df['volumeTo']
-        price_df['vwap'] = pv.cumsum() / price_df['volumeTo'].cumsum()
-
-        # OBV ve CMF - FIXED OBV CALCULATION
-        try:
-            close_diff = price_df['close'].diff()
-            # Handle NaN values and ensure proper comparison
-            close_diff_clean = close_diff.fillna(0)
-            obv_direction = (close_diff_clean > 0).astype(int) * 2 - 1
-            obv = obv_direction * price_df['volumeTo']
-            price_df['obv'] = obv.cumsum()
-        except Exception as e:
-            self.logger.warning(f"OBV calculation failed, using fallback: {e}")
-            # Fallback: simple volume-based calculation
-            price_df['obv'] = price_df['volumeTo'].cumsum()
-
         # CMF - FIXED CALCULATION
         try:
             high_low_diff = price_df['high'] - price_df['low']
@@ -147,14 +169,6 @@ class DataProcessor:
         price_df['rsi_overbought'] = (price_df['rsi_7'] > 70).astype(int)
         price_df['rsi_oversold'] = (price_df['rsi_7'] < 30).astype(int)
 
-        # MACD
-        ema_fast = price_df['close'].ewm(span=8, adjust=False).mean()
-        ema_slow = price_df['close'].ewm(span=17, adjust=False).mean()
-        macd = ema_fast - ema_slow
-        price_df['macd'] = macd
-        price_df['macd_signal'] = macd.ewm(span=9, adjust=False).mean()
-        price_df['macd_hist'] = price_df['macd'] - price_df['macd_signal']
-
         # Bollinger Band
         ma20 = price_df['close'].rolling(20).mean()
         std20 = price_df['close'].rolling(20).std()
@@ -165,14 +179,14 @@ class DataProcessor:
 
         # Zaman periyodik - Boolean kontrol düzeltildi
         try:
-            if hasattr(price_df.index, 'hour'):
-                h = price_df.index.hour + price_df.index.minute / 60
-                price_df['hour_sin'] = np.sin(2 * np.pi * h / 24)
-                price_df['hour_cos'] = np.cos(2 * np.pi * h / 24)
-                wd = price_df.index.weekday
-                price_df['dow_sin'] = np.sin(2 * np.pi * wd / 7)
-                price_df['dow_cos'] = np.cos(2 * np.pi * wd / 7)
-                price_df['is_weekend'] = (wd >= 5).astype(int)
+            if isinstance(price_df.index, pd.DatetimeIndex):
+                # Önceden hesaplanmış takvim tablosundan indeksle oku
+                calendar_features = self.calendar.features_for_index(price_df.index)
+                price_df['hour_sin'] = calendar_features['hour_sin']
+                price_df['hour_cos'] = calendar_features['hour_cos']
+                price_df['dow_sin'] = calendar_features['dow_sin']
+                price_df['dow_cos'] = calendar_features['dow_cos']
+                price_df['is_weekend'] = calendar_features['is_weekend'].astype(int)
                 # Zaman-hacim etkileşimi
                 price_df['hour_volume'] = price_df['hour_sin'] * price_df['volumeTo']
             else:
@@ -198,18 +212,40 @@ class DataProcessor:
         price_df['support_1'] = 2 * price_df['pivot'] - price_df['high'].shift(1)
         price_df['resistance_1'] = 2 * price_df['pivot'] - price_df['low'].shift(1)
 
-        # NaN'ları temizle
-        price_df.dropna(inplace=True)
+        return price_df
 
-        last_60_rows = price_df.tail(60)
+    def add_window_features(self, price_df):
+        """Pencere başından kümülatif/özyinelemeli sütunlar (vwap, obv, macd); cache'lenmez"""
+        # VWAP
+        pv = ((price_df['high'] + price_df['low'] + price_df['close']) / 3) * price_df['volumeTo']
+        price_df['vwap'] = pv.cumsum() / price_df['volumeTo'].cumsum()
+
+        # OBV - FIXED OBV CALCULATION
+        try:
+            close_diff = price_df['close'].diff()
+            # Handle NaN values and ensure proper comparison
+            close_diff_clean = close_diff.fillna(0)
+            obv_direction = (close_diff_clean > 0).astype(int) * 2 - 1
+            obv = obv_direction * price_df['volumeTo']
+            price_df['obv'] = obv.cumsum()
+        except Exception as e:
+            self.logger.warning(f"OBV calculation failed, using fallback: {e}")
+            # Fallback: simple volume-based calculation
+            price_df['obv'] = price_df['volumeTo'].cumsum()
 
-        return last_60_rows
+        # MACD
+        ema_fast = price_df['close'].ewm(span=8, adjust=False).mean()
+        ema_slow = price_df['close'].ewm(span=17, adjust=False).mean()
+        macd = ema_fast - ema_slow
+        price_df['macd'] = macd
+        price_df['macd_signal'] = macd.ewm(span=9, adjust=False).mean()
+        price_df['macd_hist'] = price_df['macd'] - price_df['macd_signal']
 
     def prepare_model_input(self, features_df):
         """Model için giriş verilerini hazırla"""
         try:
             # Sadece kullandığınız feature'ları seç
-            selected_features = features_df[self.config.FEATURES_LIST].copy()
+            selected_features = features_df[list(self.config.FEATURES_LIST)].copy()
             # Tekrar eden satır kaldırıldı
             print("SELECTED FEATURE SHAPE")
             print(selected_features.shape)
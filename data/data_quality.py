@@ -0,0 +1,170 @@
+import logging
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from config.loader import get_config
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+BAR_COLUMNS = PRICE_COLUMNS + ['volumeTo']
+
+
+class DataQualityGate:
+    """APIClient ile SlidingWindow arasında bar doğrulama ve onarım katmanı"""
+
+    def __init__(self, api_client=None, interval_minutes=1, config=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('data_quality')
+        self.api_client = api_client
+        self.freq = pd.Timedelta(minutes=interval_minutes)
+
+        self.stats = {
+            'bars_in': 0,
+            'bars_out': 0,
+            'non_numeric': 0,
+            'invalid_dropped': 0,
+            'ohlc_repaired': 0,
+            'duplicates': 0,
+            'stale': 0,
+            'gaps_detected': 0,
+            'gaps_backfilled': 0,
+            'gaps_forward_filled': 0,
+            'backfill_requests': 0,
+        }
+
+    def _normalize(self, df):
+        """Index'i dakikaya hizala, sayısal olmayan alanları temizle, OHLC tutarlılığını onar"""
+        if df is None or len(df) == 0:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+
+        df = df.copy()
+        if not isinstance(df.index, pd.DatetimeIndex):
+            if 'time' in df.columns:
+                df.index = pd.to_datetime(pd.to_numeric(df['time'], errors='coerce'), unit='s')
+            elif 'timestamp' in df.columns:
+                df.index = pd.to_datetime(df['timestamp'])
+        df.index = df.index.floor(self.freq)
+        df.index.name = 'timestamp'
+
+        # Sayısal olmayan alanlar -> NaN
+        numeric = df.reindex(columns=BAR_COLUMNS).apply(pd.to_numeric, errors='coerce')
+        raw_missing = df.reindex(columns=BAR_COLUMNS).isna().to_numpy()
+        bad = numeric.isna().to_numpy() & ~raw_missing
+        self.stats['non_numeric'] += int(bad.sum())
+
+        values = numeric.to_numpy(dtype=float)
+        close = values[:, 3]
+        # Kapanışı olmayan veya pozitif olmayan bar kullanılamaz
+        valid = np.isfinite(close) & (close > 0) & df.index.notna()
+        self.stats['invalid_dropped'] += int((~valid).sum())
+        values = values[valid]
+        df = df[valid]
+
+        # Eksik open/high/low -> close, eksik hacim -> 0
+        ohl = values[:, :3]
+        missing = ~np.isfinite(ohl)
+        ohl[missing] = np.broadcast_to(values[:, 3:4], ohl.shape)[missing]
+        vol = values[:, 4]
+        vol[~np.isfinite(vol) | (vol < 0)] = 0.0
+
+        # High/low tutarlılığı
+        hi = values[:, :4].max(axis=1)
+        lo = values[:, :4].min(axis=1)
+        repaired = (values[:, 1] != hi) | (values[:, 2] != lo)
+        self.stats['ohlc_repaired'] += int(repaired.sum())
+        values[:, 1] = hi
+        values[:, 2] = lo
+
+        df[BAR_COLUMNS] = values
+        return df
+
+    def process(self, new_data, last_timestamp=None, last_close=None):
+        """Yeni barları doğrula; tekrar/eski barları at, boşlukları doldur"""
+        if new_data is None:
+            return None
+
+        self.stats['bars_in'] += len(new_data)
+        df = self._normalize(new_data)
+
+        # Aynı dakikaya ait tekrar eden barlar: sonuncuyu tut
+        dup = df.index.duplicated(keep='last')
+        self.stats['duplicates'] += int(dup.sum())
+        df = df[~dup].sort_index()
+
+        if last_timestamp is not None and len(df) > 0:
+            # Pencerede zaten bulunan (eski) barlar
+            stale = df.index <= last_timestamp
+            self.stats['stale'] += int(stale.sum())
+            df = df[~stale]
+
+        if last_timestamp is not None and len(df) > 0:
+            df = self._fill_gaps(df, start=last_timestamp + self.freq, end=df.index[-1],
+                                 anchor=(last_timestamp, last_close))
+
+        self.stats['bars_out'] += len(df)
+        return self._sync_time_column(df)
+
+    def repair_window(self, window_df):
+        """Tüm pencerede boşlukları tespit et ve tek aralık isteğiyle doldur"""
+        if window_df is None or len(window_df) == 0:
+            return window_df
+
+        df = self._normalize(window_df)
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        return self._sync_time_column(self._fill_gaps(df, start=df.index[0], end=df.index[-1]))
+
+    @staticmethod
+    def _sync_time_column(df):
+        """'time' sütununu (unix saniye) index ile eşitle"""
+        if 'time' in df.columns:
+            df['time'] = df.index.asi8 // 1_000_000_000
+        return df
+
+    def _fill_gaps(self, df, start, end, anchor=None):
+        """Eksik dakikaları önce API'den, kalanları ileri doldurarak tamamla"""
+        expected = pd.date_range(start, end, freq=self.freq)
+        missing = expected.difference(df.index)
+        if len(missing) == 0:
+            return df
+
+        self.stats['gaps_detected'] += len(missing)
+        self.logger.warning(f"{len(missing)} eksik bar tespit edildi: {missing[0]} - {missing[-1]}")
+
+        # Hedefli geri doldurma: tüm boşlukları kapsayan tek aralık isteği
+        if self.api_client is not None and len(missing) <= self.config.MAX_BACKFILL_MINUTES:
+            self.stats['backfill_requests'] += 1
+            fetched = self.api_client.get_range_data(
+                missing[0].tz_localize('UTC').to_pydatetime(),
+                (missing[-1] + self.freq).tz_localize('UTC').to_pydatetime() - timedelta(seconds=1)
+            )
+            if fetched is not None and len(fetched) > 0:
+                fetched = self._normalize(fetched)
+                fetched = fetched[fetched.index.isin(missing)]
+                fetched = fetched[~fetched.index.duplicated(keep='last')]
+                self.stats['gaps_backfilled'] += len(fetched)
+                df = pd.concat([df, fetched]).sort_index()
+                missing = missing.difference(fetched.index)
+
+        if len(missing) == 0:
+            return df
+
+        # Kalan kısa boşlukları son kapanışla sentetik barlarla doldur (hacim 0)
+        fill_limit = self.config.MAX_GAP_FILL_MINUTES
+        full = df.reindex(df.index.union(missing))
+        close = full['close']
+        if anchor is not None and anchor[1] is not None:
+            # Boşluk penceredeki son bardan hemen sonra başlıyorsa onun kapanışını kullan
+            seed = pd.Series([float(anchor[1])], index=pd.DatetimeIndex([anchor[0]]))
+            close = pd.concat([seed, close]).ffill(limit=fill_limit).iloc[1:]
+        else:
+            close = close.ffill(limit=fill_limit)
+        filled = full['close'].isna() & close.notna()
+        if filled.any():
+            full.loc[filled, PRICE_COLUMNS] = np.repeat(close[filled].to_numpy()[:, None], 4, axis=1)
+            full.loc[filled, 'volumeTo'] = 0.0
+            self.stats['gaps_forward_filled'] += int(filled.sum())
+
+        return full[full['close'].notna()]
+
+    def get_stats(self):
+        """Kalite sayaçlarını döndür"""
+        return dict(self.stats)
@@ -0,0 +1,289 @@
+import os
+import json
+import shutil
+import pickle
+import logging
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config.loader import get_config
+from data.data_processor import DataProcessor
+from data.data_quality import DataQualityGate
+
+DATASET_FORMAT_VERSION = 1
+META_NAME = 'meta.json'
+# TradingBot'un SlidingWindow uzunluğu: canlı feature'lar bu pencerede hesaplanır
+WINDOW_SIZE = 180
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volumeTo']
+# compute_features'ın pencere başında her zaman düşürdüğü satır sayısı (closelag60)
+FEATURE_WARMUP = 60
+
+
+def load_history(path):
+    """Saklanan dakikalık barları oku (.csv, .parquet veya API_RECORD_PATH kaydı .jsonl)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.jsonl':
+        from utils.replay import BarTape
+        df = pd.DataFrame(BarTape.from_recording(path).bars)
+    elif ext == '.parquet':
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+
+    # APIClient ile aynı dönüşüm: 'time' (unix saniye) -> index
+    df['timestamp'] = pd.to_datetime(df['time'], unit='s')
+    return df.set_index('timestamp').sort_index()
+
+
+class RunningMoments:
+    """Parça parça güncellenen sütun ortalaması ve varyansı (Chan birleştirmesi)"""
+
+    def __init__(self, n_columns):
+        self.count = 0
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.mean))
+        n = len(values)
+        if n == 0:
+            return
+        mean = values.mean(axis=0)
+        m2 = ((values - mean) ** 2).sum(axis=0)
+        delta = mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    @property
+    def var(self):
+        """Popülasyon varyansı (StandardScaler ile aynı, ddof=0)"""
+        return self.m2 / self.count if self.count else np.zeros_like(self.m2)
+
+    def to_scaler(self):
+        """DataProcessor'ın yüklediği türde scaler (sklearn yoksa ArrayScaler)"""
+        var = self.var
+        scale = np.sqrt(var)
+        # Sabit sütunlar sklearn'deki gibi ölçeklenmez; parça birleştirmesinin yuvarlama
+        # artığı (ör. tek günlük geçmişte dow_sin ~1e-14) da sabit sayılır
+        constant = var <= 10 * np.finfo(np.float64).eps * (self.mean ** 2 + 1)
+        scale[constant] = 1.0
+        try:
+            from sklearn.preprocessing import StandardScaler
+        except ImportError:
+            from models.artifact_bundle import ArrayScaler
+            return ArrayScaler(self.mean.copy(), scale)
+
+        scaler = StandardScaler()
+        scaler.mean_ = self.mean.copy()
+        scaler.var_ = var
+        scaler.scale_ = scale
+        scaler.n_samples_seen_ = np.int64(self.count)
+        scaler.n_features_in_ = len(self.mean)
+        return scaler
+
+
+class DatasetBuilder:
+    """Saklanan geçmişten canlı feature koduyla eğitim veri seti üret
+
+    Her örnek, canlı botun o barda gördüğü 180 dakikalık pencereyle aynıdır:
+    X = calculate_features(pencere)[FEATURES_LIST] son LOOK_BACK satır,
+    y = STEP_AHEAD dakika sonraki kapanış. Feature'lar parça başına bir kez
+    hesaplanır; pencere başından kümülatif olan vwap ve obv her örnek için
+    kendi pencere başına göre yeniden sabitlenir. Scaler'lar ilk geçişte
+    akış halinde öğrenilir, ikinci geçişte X ve y memmap .npy dosyalarına
+    ölçeklenmiş olarak yazılır; bellek kullanımı parça boyutuyla sınırlıdır.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('dataset_builder')
+        self.processor = DataProcessor(self.config, with_scalers=False)
+        self.features = list(self.config.FEATURES_LIST)
+        self.look_back = self.config.LOOK_BACK
+        self.step_ahead = self.config.STEP_AHEAD
+        self.stats = {'samples': 0, 'shifted': 0, 'dropped': 0, 'chunks': 0}
+
+    def prepare_history(self, history):
+        """Canlı ilk pencereyle aynı onarım (tekrarlar, kısa boşluklar)"""
+        gate = DataQualityGate(None, config=self.config)
+        bars = gate.repair_window(history)
+        return bars[BAR_COLUMNS].astype(np.float64)
+
+    def sample_positions(self, bars):
+        """Penceresi ve hedefi aynı kesintisiz dakika dizisinde kalan barların konumları"""
+        n = len(bars)
+        if n < WINDOW_SIZE + self.step_ahead:
+            return np.empty(0, dtype=np.int64)
+        ns = bars.index.asi8
+        segment = np.concatenate([[0], np.cumsum(np.diff(ns) != 60_000_000_000)])
+        positions = np.arange(WINDOW_SIZE - 1, n - self.step_ahead)
+        return positions[segment[positions - WINDOW_SIZE + 1] == segment[positions + self.step_ahead]]
+
+    def _chunks(self, positions, size):
+        """Ardışık konumları en fazla size uzunluğunda parçalara böl"""
+        breaks = np.flatnonzero(np.diff(positions) != 1) + 1
+        for run in np.split(positions, breaks):
+            for start in range(0, len(run), size):
+                yield run[start:start + size]
+
+    def chunk_samples(self, bars, positions):
+        """Bir parçanın (X, y, geçerli) dizileri; X ölçeklenmemiş float64"""
+        lo = positions[0] - WINDOW_SIZE + 1
+        window = bars.iloc[lo:positions[-1] + 1]
+        features = self.processor.compute_features(window).reindex(window.index)
+        values = features[self.features].to_numpy(dtype=np.float64)
+
+        # Canlı yol NaN satırları atıp kalan son LOOK_BACK satırı kullanır; aynı satırları seç
+        kept = np.flatnonzero(~np.isnan(values).any(axis=1))
+        if len(kept) < self.look_back:
+            self.stats['dropped'] += len(positions)
+            return np.empty((len(positions), self.look_back, len(self.features))), np.empty(len(positions)), \
+                np.zeros(len(positions), dtype=bool)
+        local = positions - lo
+        starts = local - WINDOW_SIZE + 1
+        end = np.searchsorted(kept, local, side='right')
+        rows = kept[np.clip(end - self.look_back, 0, None)[:, None] + np.arange(self.look_back)]
+        # Pencerenin ilk FEATURE_WARMUP satırı canlıda hep düşer; yeterli satır yoksa örnek atılır
+        valid = (end >= self.look_back) & (rows[:, 0] >= starts + FEATURE_WARMUP)
+        self.stats['dropped'] += int((~valid).sum())
+        self.stats['shifted'] += int((valid & (rows[:, 0] != local - self.look_back + 1)).sum())
+
+        X = values[rows]
+        self._anchor_cumulative(X, window, rows, starts)
+        y = bars['close'].to_numpy()[positions + self.step_ahead]
+        return X, y, valid
+
+    def _anchor_cumulative(self, X, window, rows, starts):
+        """vwap ve obv'yi her örneğin kendi pencere başına göre yeniden hesapla"""
+        volume = window['volumeTo'].to_numpy()
+        close = window['close'].to_numpy()
+        if 'vwap' in self.features:
+            pv = (window['high'].to_numpy() + window['low'].to_numpy() + close) / 3 * volume
+            cum_pv = np.concatenate([[0.0], np.cumsum(pv)])
+            cum_volume = np.concatenate([[0.0], np.cumsum(volume)])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                X[:, :, self.features.index('vwap')] = (
+                    (cum_pv[rows + 1] - cum_pv[starts][:, None]) / (cum_volume[rows + 1] - cum_volume[starts][:, None]))
+        if 'obv' in self.features:
+            # Pencerenin ilk barında fark yoktur, yön -1 sayılır (calculate_features ile aynı)
+            direction = np.where(np.diff(close, prepend=np.nan) > 0, 1.0, -1.0)
+            cum_obv = np.cumsum(direction * volume)
+            X[:, :, self.features.index('obv')] = (
+                cum_obv[rows] - cum_obv[starts][:, None] - volume[starts][:, None])
+
+    def live_features(self, bars, position):
+        """Canlı yolun bu bardaki model girdisi (ölçeklenmemiş); yetersizse None"""
+        window = bars.iloc[position - WINDOW_SIZE + 1:position + 1]
+        features = self.processor.calculate_features(window)[self.features].iloc[-self.look_back:]
+        if len(features) < self.look_back:
+            return None
+        return features.to_numpy(dtype=np.float64)
+
+    def build(self, history, output_path=None, chunk_samples=None, source=None):
+        """Veri setini üret ve dizine yaz (atomik olarak yer değiştirir); meta sözlüğünü döndür"""
+        output_path = output_path or self.config.DATASET_PATH
+        chunk_samples = chunk_samples or self.config.DATASET_CHUNK_SAMPLES
+        bars = self.prepare_history(history)
+        positions = self.sample_positions(bars)
+        if len(positions) == 0:
+            raise ValueError(f"Yetersiz geçmiş: {len(bars)} bar (en az {WINDOW_SIZE + self.step_ahead} ardışık dakika)")
+
+        tmp_path = f"{output_path}.tmp-{os.getpid()}"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+
+        shape = (self.look_back, len(self.features))
+        open_memmap = np.lib.format.open_memmap
+        raw_X = open_memmap(os.path.join(tmp_path, 'X_raw.npy'), mode='w+', dtype=np.float32,
+                            shape=(len(positions),) + shape)
+        raw_y = np.empty(len(positions), dtype=np.float64)
+        times = np.empty(len(positions), dtype=np.int64)
+        moments_X, moments_y = RunningMoments(len(self.features)), RunningMoments(1)
+
+        # 1. geçiş: feature'lar ve akış halinde scaler istatistikleri
+        count = 0
+        for chunk in self._chunks(positions, chunk_samples):
+            X, y, valid = self.chunk_samples(bars, chunk)
+            X, y = X[valid], y[valid]
+            moments_X.update(X)
+            moments_y.update(y)
+            raw_X[count:count + len(X)] = X
+            raw_y[count:count + len(X)] = y
+            times[count:count + len(X)] = bars.index.asi8[chunk[valid]] // 1_000_000_000
+            count += len(X)
+            self.stats['chunks'] += 1
+            if self.stats['chunks'] % 50 == 0:
+                self.logger.info(f"Veri seti: {count}/{len(positions)} örnek")
+
+        scaler_X, scaler_y = moments_X.to_scaler(), moments_y.to_scaler()
+        if self.processor.feature_cache is not None:
+            self.processor.feature_cache.flush()
+
+        # 2. geçiş: ölçeklenmiş float32 çıktılar
+        X_out = open_memmap(os.path.join(tmp_path, 'X.npy'), mode='w+', dtype=np.float32, shape=(count,) + shape)
+        for start in range(0, count, chunk_samples):
+            end = min(start + chunk_samples, count)
+            X_out[start:end] = scaler_X.transform(
+                raw_X[start:end].reshape(-1, shape[1]).astype(np.float64)).reshape((end - start,) + shape)
+        X_out.flush()
+        del X_out, raw_X
+        os.remove(os.path.join(tmp_path, 'X_raw.npy'))
+
+        np.save(os.path.join(tmp_path, 'y.npy'), scaler_y.transform(raw_y[:count, None]).astype(np.float32))
+        np.save(os.path.join(tmp_path, 'times.npy'), times[:count])
+        for name, scaler in (('scaler_X', scaler_X), ('scaler_y', scaler_y)):
+            with open(os.path.join(tmp_path, f"{name}.pkl"), 'wb') as f:
+                pickle.dump(scaler, f)
+
+        self.stats['samples'] = count
+        meta = {
+            'format_version': DATASET_FORMAT_VERSION,
+            'created': datetime.now().isoformat(),
+            'source': source,
+            'samples': count,
+            'window_size': WINDOW_SIZE,
+            'look_back': self.look_back,
+            'step_ahead': self.step_ahead,
+            'features': self.features,
+            'start': int(times[0]) if count else None,
+            'end': int(times[count - 1]) if count else None,
+            'stats': dict(self.stats),
+            'files': {'X': 'X.npy', 'y': 'y.npy', 'times': 'times.npy',
+                      'scaler_X': 'scaler_X.pkl', 'scaler_y': 'scaler_y.pkl'},
+        }
+        with open(os.path.join(tmp_path, META_NAME), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        # Eski veri setini yenisiyle değiştir
+        if os.path.exists(output_path):
+            old_path = f"{output_path}.old-{os.getpid()}"
+            os.replace(output_path, old_path)
+            os.replace(tmp_path, output_path)
+            shutil.rmtree(old_path, ignore_errors=True)
+        else:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            os.replace(tmp_path, output_path)
+
+        self.logger.info(f"Veri seti oluşturuldu: {output_path} ({count} örnek)")
+        return meta
+
+    def verify(self, history, output_path=None, samples=20, seed=0):
+        """Rastgele örnekleri canlı yolla (calculate_features + scaler_X) karşılaştır; en büyük fark"""
+        output_path = output_path or self.config.DATASET_PATH
+        bars = self.prepare_history(history)
+        X = np.load(os.path.join(output_path, 'X.npy'), mmap_mode='r')
+        times = np.load(os.path.join(output_path, 'times.npy'))
+        with open(os.path.join(output_path, 'scaler_X.pkl'), 'rb') as f:
+            scaler_X = pickle.load(f)
+
+        rng = np.random.default_rng(seed)
+        picks = rng.choice(len(times), size=min(samples, len(times)), replace=False)
+        positions = np.searchsorted(bars.index.asi8, times[picks] * 1_000_000_000)
+        max_diff = 0.0
+        for i, position in zip(picks, positions):
+            live = scaler_X.transform(self.live_features(bars, position))
+            max_diff = max(max_diff, float(np.abs(live - X[i]).max()))
+        return max_diff
@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import calendar
+import shutil
+import hashlib
+import inspect
+import logging
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from config.loader import get_config
+from utils.metrics import get_metrics
+
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volumeTo']
+SECONDS_PER_DAY = 86400
+COLUMNS_NAME = 'columns.json'
+
+# 64 bit karıştırma sabitleri (splitmix64)
+_MIX = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+
+def feature_definition_hash(look_back=60):
+    """Cache'lenen sütunları üreten kodun özeti; kod değişince eski satırlar geçersizleşir"""
+    from data import data_processor, time_features
+    digest = hashlib.sha256(str(look_back).encode())
+    for obj in (data_processor.DataProcessor.invariant_features, data_processor.rolling_slope_series,
+                time_features.CalendarTable):
+        try:
+            digest.update(inspect.getsource(obj).encode())
+        except (OSError, TypeError):
+            # Kaynak yoksa (derlenmiş dağıtım) modül dosyasının tamamı
+            with open(inspect.getfile(obj), 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def bar_fingerprints(times, bars, width):
+    """Her satırın son width barının (zaman + OHLCV) 64 bit özeti; ilk width-1 satır için 0"""
+    words = np.ascontiguousarray(bars, dtype=np.float64).view(np.uint64)
+    h = np.asarray(times, dtype=np.int64).view(np.uint64) * _MIX[0]
+    for k in range(words.shape[1]):
+        h = (h ^ words[:, k]) * _MIX[1]
+    h ^= h >> np.uint64(31)
+    h *= _MIX[2]
+    h ^= h >> np.uint64(29)
+
+    # Kayan toplam (taşma modüler): satırın geriye bakışındaki tüm barlar özetlenir
+    cumulative = np.concatenate([np.zeros(1, dtype=np.uint64), np.cumsum(h, dtype=np.uint64)])
+    fingerprints = np.zeros(len(h), dtype=np.uint64)
+    if len(h) >= width:
+        fingerprints[width - 1:] = cumulative[width:] - cumulative[:-width]
+    return fingerprints
+
+
+class _Partition:
+    """Bir günün cache satırları (zamana göre sıralı)"""
+
+    __slots__ = ('times', 'fingerprints', 'values', 'dirty')
+
+    def __init__(self, times, fingerprints, values, dirty=False):
+        self.times = times
+        self.fingerprints = fingerprints
+        self.values = values
+        self.dirty = dirty
+
+
+class FeatureCache:
+    """Pencereden bağımsız feature satırlarının kalıcı cache'i
+
+    Satırlar bar zaman damgasıyla anahtarlanır ve satırın geriye bakışındaki
+    barların (zaman + OHLCV) özetiyle doğrulanır; düzeltilen veya geçici bir
+    barla hesaplanmış satır kendiliğinden yeniden hesaplanır. Dosyalar
+    token ve feature tanımı özetiyle ayrılmış dizinlerde günlük sütunlu .npz
+    bölümleridir; FEATURE_CACHE_MAX_MB aşılınca en eski günler silinir.
+    """
+
+    def __init__(self, config=None, look_back=60):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('feature_cache')
+        self.look_back = look_back
+        # closelag{look_back}: pencerenin ilk warmup satırı her zaman NaN, satır warmup+1 bara bağlı
+        self.warmup = max(60, look_back)
+        self.version = feature_definition_hash(look_back)
+        self.token_path = os.path.join(self.config.FEATURE_CACHE_PATH, f"token_{self.config.TOKEN_ID}")
+        self.path = os.path.join(self.token_path, self.version)
+        self.max_bytes = self.config.FEATURE_CACHE_MAX_MB * 1024 * 1024
+
+        self.columns, self.dtypes = self._read_columns()
+        self._partitions = OrderedDict()  # gün -> _Partition (LRU)
+        self._pending = 0
+        self.stats = {'hits': 0, 'misses': 0, 'flushes': 0, 'evicted': 0}
+        self._remove_old_versions()
+
+    def _read_columns(self):
+        try:
+            with open(os.path.join(self.path, COLUMNS_NAME)) as f:
+                meta = json.load(f)
+            return meta['columns'], meta['dtypes']
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def _remove_old_versions(self):
+        """Feature tanımı değiştiyse eski sürüm dizinlerini sil"""
+        if not os.path.isdir(self.token_path):
+            return
+        for name in os.listdir(self.token_path):
+            if name != self.version:
+                shutil.rmtree(os.path.join(self.token_path, name), ignore_errors=True)
+                self.logger.info(f"Eski feature cache sürümü silindi: {name}")
+
+    def invariant_features(self, processor, price_df, look_back=60):
+        """processor.invariant_features ile aynı çerçeve; sadece cache'te olmayan satırlar hesaplanır"""
+        if look_back != self.look_back or len(price_df) <= self.warmup:
+            return processor.invariant_features(price_df, look_back)
+
+        times = price_df.index.asi8 // 1_000_000_000
+        fingerprints = bar_fingerprints(times, price_df[BAR_COLUMNS].to_numpy(dtype=np.float64), self.warmup + 1)
+
+        if self.columns is None:
+            # İlk kullanım: sütunları öğren, tüm çerçeveyi hesapla
+            features = processor.invariant_features(price_df, look_back)
+            self.columns = [c for c in features.columns if c not in BAR_COLUMNS]
+            self.dtypes = {c: str(features[c].dtype) for c in self.columns}
+            os.makedirs(self.path, exist_ok=True)
+            with open(os.path.join(self.path, COLUMNS_NAME), 'w') as f:
+                json.dump({'columns': self.columns, 'dtypes': self.dtypes, 'look_back': look_back}, f)
+            self._store(times[self.warmup:], fingerprints[self.warmup:],
+                        features[self.columns].to_numpy(dtype=np.float64)[self.warmup:])
+            self.stats['misses'] += len(price_df) - self.warmup
+            return features
+
+        found, cached_fingerprints, values = self.lookup(times)
+        hit = found & (cached_fingerprints == fingerprints)
+        hit[:self.warmup] = False
+        need = ~hit
+        need[:self.warmup] = False  # Bu satırlar her durumda dropna ile düşer
+
+        if need.any():
+            rows = np.flatnonzero(need)
+            start = max(rows[0] - self.warmup, 0)
+            computed = processor.invariant_features(price_df.iloc[start:rows[-1] + 1].copy(), look_back)
+            computed_values = computed[self.columns].to_numpy(dtype=np.float64)[rows - start]
+            values[rows] = computed_values
+            self._store(times[rows], fingerprints[rows], computed_values)
+
+        values[:self.warmup] = np.nan
+        self.stats['hits'] += int(hit.sum())
+        self.stats['misses'] += int(need.sum())
+        self.publish()
+
+        columns = {}
+        for i, column in enumerate(self.columns):
+            column_values = values[:, i]
+            if self.dtypes[column] != 'float64':
+                # Tamsayı sütunlarda ısınma satırları 0 olur; satırlar zaten dropna ile düşer
+                column_values = np.nan_to_num(column_values).astype(self.dtypes[column])
+            columns[column] = column_values
+        price_df = pd.concat([price_df, pd.DataFrame(columns, index=price_df.index)], axis=1)
+        return price_df
+
+    def lookup(self, times):
+        """times (unix saniye) için (bulundu, özet, değer matrisi)"""
+        n = len(times)
+        found = np.zeros(n, dtype=bool)
+        fingerprints = np.zeros(n, dtype=np.uint64)
+        values = np.full((n, len(self.columns)), np.nan)
+        days = times // SECONDS_PER_DAY
+        for day in np.unique(days):
+            partition = self._partition(int(day))
+            if partition is None or len(partition.times) == 0:
+                continue
+            rows = np.flatnonzero(days == day)
+            positions = np.minimum(np.searchsorted(partition.times, times[rows]), len(partition.times) - 1)
+            match = partition.times[positions] == times[rows]
+            rows, positions = rows[match], positions[match]
+            found[rows] = True
+            fingerprints[rows] = partition.fingerprints[positions]
+            values[rows] = partition.values[positions]
+        return found, fingerprints, values
+
+    def _store(self, times, fingerprints, values):
+        """Satırları günlük bölümlere ekle (aynı zaman damgası güncellenir)"""
+        days = times // SECONDS_PER_DAY
+        for day in np.unique(days):
+            rows = days == day
+            partition = self._partition(int(day), create=True)
+            all_times = np.concatenate([partition.times, times[rows]])
+            # Sıralı birleştirmede her zaman damgasının son (yeni) kaydı kalır
+            order = np.argsort(all_times, kind='stable')
+            all_times = all_times[order]
+            keep = np.append(all_times[1:] != all_times[:-1], True)
+            partition.times = all_times[keep]
+            partition.fingerprints = np.concatenate([partition.fingerprints, fingerprints[rows]])[order][keep]
+            partition.values = np.concatenate([partition.values, values[rows]])[order][keep]
+            partition.dirty = True
+        self._pending += len(times)
+        if self._pending >= self.config.FEATURE_CACHE_FLUSH_ROWS:
+            self.flush()
+
+    def _partition_file(self, day):
+        return os.path.join(self.path, time.strftime('%Y%m%d', time.gmtime(day * SECONDS_PER_DAY)) + '.npz')
+
+    def _partition(self, day, create=False):
+        partition = self._partitions.get(day)
+        if partition is not None:
+            self._partitions.move_to_end(day)
+            return partition
+
+        partition = self._load(day)
+        if partition is None:
+            if not create:
+                return None
+            partition = _Partition(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64),
+                                   np.empty((0, len(self.columns))))
+        self._partitions[day] = partition
+        while len(self._partitions) > self.config.FEATURE_CACHE_MEMORY_PARTITIONS:
+            old_day, old = self._partitions.popitem(last=False)
+            if old.dirty:
+                self._write(old_day, old)
+        return partition
+
+    def _load(self, day):
+        path = self._partition_file(day)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return _Partition(data['time'], data['fingerprint'],
+                                  np.column_stack([data[c] for c in self.columns]))
+        except Exception as e:
+            self.logger.warning(f"Bozuk feature cache bölümü atlandı: {path} ({e})")
+            return None
+
+    def _write(self, day, partition):
+        """Bölümü atomik olarak yaz (sütun başına bir dizi)"""
+        path = self._partition_file(day)
+        tmp_path = path[:-len('.npz')] + '.tmp.npz'
+        arrays = {c: partition.values[:, i] for i, c in enumerate(self.columns)}
+        np.savez(tmp_path, time=partition.times, fingerprint=partition.fingerprints, **arrays)
+        os.replace(tmp_path, path)
+        partition.dirty = False
+
+    def pending_rows(self):
+        """Diske henüz yazılmamış satır sayısı"""
+        return self._pending
+
+    def flush(self):
+        """Bekleyen satırları diske yaz ve boyut sınırını uygula"""
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            for day, partition in self._partitions.items():
+                if partition.dirty:
+                    self._write(day, partition)
+            self._pending = 0
+            self.stats['flushes'] += 1
+            self._evict()
+        except Exception as e:
+            self.logger.error(f"Feature cache yazma hatası: {e}")
+
+    def _evict(self):
+        """FEATURE_CACHE_MAX_MB aşılırsa en eski günlük bölümleri sil"""
+        files = sorted(name for name in os.listdir(self.path) if name.endswith('.npz'))
+        sizes = {name: os.path.getsize(os.path.join(self.path, name)) for name in files}
+        total = sum(sizes.values())
+        for name in files:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.path, name))
+            total -= sizes[name]
+            day = calendar.timegm(time.strptime(name[:8], '%Y%m%d')) // SECONDS_PER_DAY
+            self._partitions.pop(day, None)
+            self.stats['evicted'] += 1
+            self.logger.info(f"Feature cache bölümü silindi: {name}")
+
+    def publish(self):
+        """İsabet oranını metrik kayıt defterine yaz"""
+        total = self.stats['hits'] + self.stats['misses']
+        get_metrics().publish('feature_cache', {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / total if total else None,
+            'partitions_in_memory': len(self._partitions),
+            'version': self.version,
+        })
@@ -0,0 +1,216 @@
+import os
+import logging
+import numpy as np
+from config.loader import get_config
+from data.sliding_window import SlidingWindow
+from utils.metrics import get_metrics
+
+
+class BarAggregator:
+    """1 dakikalık barları O(1) ile daha büyük zaman dilimine topla
+
+    Kova başlangıcı (unix saniye) minutes * 60'ın katıdır; bar zamanı kova
+    başlangıcıdır (pandas resample label='left' ile aynı). Kova son dakikası
+    geldiğinde hemen, son dakika eksikse bir sonraki kovanın ilk barıyla
+    kapanır. Aynı dakikanın düzeltilmiş tekrarında kova kendi barlarından
+    yeniden toplanır; kapanmış kovalara gelen barlar yok sayılır.
+    """
+
+    def __init__(self, minutes):
+        self.minutes = int(minutes)
+        self.seconds = self.minutes * 60
+        self.closed_bucket = None
+        self.emitted = 0
+        self._start(None)
+
+    def _start(self, bucket):
+        self.bucket = bucket
+        self._bars = {}  # kovadaki dakika barları: zaman -> (o, h, l, c, v)
+        self.open_time = self.close_time = None
+        self.open = self.high = self.low = self.close = None
+        self.volume = 0.0
+
+    def add(self, time, open_, high, low, close, volume):
+        """Barı ekle; bu barla tamamlanan kovaları (dict listesi) döndür"""
+        time = int(time)
+        bucket = time - time % self.seconds
+        if self.closed_bucket is not None and bucket <= self.closed_bucket:
+            return []
+
+        completed = []
+        if self.bucket is not None and bucket != self.bucket:
+            completed.append(self._emit())
+        if self.bucket is None:
+            self._start(bucket)
+
+        bar = (float(open_), float(high), float(low), float(close), float(volume))
+        if time in self._bars:
+            self._bars[time] = bar
+            self._rebuild()
+        else:
+            self._bars[time] = bar
+            self._update(time, bar)
+
+        if time == bucket + self.seconds - 60:
+            completed.append(self._emit())
+        return completed
+
+    def _update(self, time, bar):
+        open_, high, low, close, volume = bar
+        if self.open_time is None or time < self.open_time:
+            self.open_time, self.open = time, open_
+        if self.close_time is None or time > self.close_time:
+            self.close_time, self.close = time, close
+        self.high = high if self.high is None else max(self.high, high)
+        self.low = low if self.low is None else min(self.low, low)
+        self.volume += volume
+
+    def _rebuild(self):
+        """Düzeltilmiş dakikadan sonra kovayı baştan topla (en fazla minutes bar)"""
+        bars = self._bars
+        self._start(self.bucket)
+        self._bars = bars
+        for time in sorted(bars):
+            self._update(time, bars[time])
+
+    def state_dict(self):
+        """Kontrol noktası için açık kova ve kapanmış kova sınırı"""
+        times = sorted(self._bars)
+        return {
+            'bucket': self.bucket,
+            'closed_bucket': self.closed_bucket,
+            'emitted': self.emitted,
+            'times': np.array(times, dtype=np.int64),
+            'bars': np.array([self._bars[t] for t in times], dtype=np.float64).reshape(len(times), 5),
+        }
+
+    def load_state(self, state):
+        self.closed_bucket = state['closed_bucket']
+        self.emitted = state['emitted']
+        self._start(state['bucket'])
+        self._bars = {int(t): tuple(bar) for t, bar in zip(state['times'], state['bars'].tolist())}
+        if self._bars:
+            self._rebuild()
+
+    def partial(self):
+        """Oluşmakta olan kova (tamamlanmamış), yoksa None"""
+        return None if self.bucket is None else self._as_bar()
+
+    def _as_bar(self):
+        return {
+            'time': self.bucket,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volumeTo': self.volume,
+            'minutes': len(self._bars),
+        }
+
+    def _emit(self):
+        bar = self._as_bar()
+        self.closed_bucket = self.bucket
+        self.emitted += 1
+        self._start(None)
+        return bar
+
+
+class MultiTimeframeFeed:
+    """Tek 1m akışından zaman dilimi başına pencere ve feature motoru
+
+    TIMEFRAMES'teki her dilim (dakika) kendi BarAggregator'ı, SlidingWindow'u
+    ve DataProcessor'ıyla beslenir; ek API isteği ve tam yeniden örnekleme
+    gerekmez. Feature'lar sadece tamamlanmış barlarla, yeni bar geldiğinde
+    hesaplanır.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('resampler')
+        self.timeframes = sorted({int(m) for m in self.config.TIMEFRAMES})
+        self.aggregators = {m: BarAggregator(m) for m in self.timeframes}
+        self.windows = {m: SlidingWindow(window_size=self.config.TIMEFRAME_WINDOW_SIZE) for m in self.timeframes}
+        self.processors = {}
+        self.features = {}  # dilim -> son feature DataFrame'i
+        self.updated = set()
+
+    @property
+    def history_minutes(self):
+        """Tüm pencereleri doldurmak için gereken 1m bar sayısı"""
+        # +1 kova: geçmişin başındaki yarım kova atlanır
+        return max(self.timeframes) * (self.config.TIMEFRAME_WINDOW_SIZE + 1) if self.timeframes else 0
+
+    def add(self, bars):
+        """1m barları (DataFrame, zaman index'li) tüm dilimlere ekle; güncellenen dilimleri döndür"""
+        if bars is None or len(bars) == 0:
+            return set()
+        times = bars.index.asi8 // 1_000_000_000
+        values = bars[['open', 'high', 'low', 'close', 'volumeTo']].to_numpy(dtype=np.float64)
+        updated = set()
+        for time, row in zip(times.tolist(), values.tolist()):
+            for minutes, aggregator in self.aggregators.items():
+                for bar in aggregator.add(time, *row):
+                    self.windows[minutes].add_data(bar)
+                    updated.add(minutes)
+        self.updated |= updated
+        return updated
+
+    def seed(self, history):
+        """Başlangıç geçmişini pencerelere yükle; baştaki eksik kova atlanır"""
+        if history is None or len(history) == 0:
+            return
+        start = history.index[-1] - np.timedelta64(self.history_minutes, 'm')
+        history = history[history.index > start]
+        first = int(history.index[0].timestamp())
+        for aggregator in self.aggregators.values():
+            if first % aggregator.seconds:
+                aggregator.closed_bucket = first - first % aggregator.seconds
+        self.add(history)
+        self.logger.info("Zaman dilimi pencereleri: " + ", ".join(
+            f"{m}m={self.windows[m].size()}" for m in self.timeframes))
+
+    def state_dict(self):
+        """Kontrol noktası için dilim başına pencere ve toplayıcı durumu"""
+        return {
+            f"{m}m": {'window': self.windows[m].state_dict(), 'aggregator': self.aggregators[m].state_dict()}
+            for m in self.timeframes
+        }
+
+    def load_state(self, state):
+        """Kayıtta bulunan dilimleri yükle (yeni eklenen dilim boş başlar)"""
+        for minutes in self.timeframes:
+            saved = state.get(f"{minutes}m")
+            if saved is not None:
+                self.windows[minutes].load_state(saved['window'])
+                self.aggregators[minutes].load_state(saved['aggregator'])
+                self.updated.add(minutes)
+
+    def processor(self, minutes):
+        """Dilime ait feature motoru (cache dizini dilim başına ayrı)"""
+        if minutes not in self.processors:
+            from data.data_processor import DataProcessor
+            config = self.config.replace(FEATURE_CACHE_PATH=os.path.join(self.config.FEATURE_CACHE_PATH, f"{minutes}m"))
+            self.processors[minutes] = DataProcessor(config, with_scalers=False)
+        return self.processors[minutes]
+
+    def refresh(self):
+        """Yeni barı gelen dilimlerin feature'larını hesapla"""
+        for minutes in sorted(self.updated):
+            window = self.windows[minutes].get_window()
+            try:
+                self.features[minutes] = self.processor(minutes).calculate_features(window) if len(window) else None
+            except Exception as e:
+                self.logger.error(f"{minutes}m feature hesaplama hatası: {e}")
+        self.updated.clear()
+        self.publish()
+
+    def publish(self):
+        """Dilim başına pencere durumunu metrik kayıt defterine yaz"""
+        get_metrics().publish('timeframes', {
+            f"{m}m": {
+                'bars': self.windows[m].size(),
+                'last_bar': str(self.windows[m].get_last_timestamp()),
+                'feature_rows': 0 if self.features.get(m) is None else len(self.features[m]),
+            }
+            for m in self.timeframes
+        })
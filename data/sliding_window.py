@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import logging
 
 
@@ -20,6 +21,9 @@ class SlidingWindow:
         if 'time' in df_point.columns:
             df_point['timestamp'] = pd.to_datetime(df_point['time'], unit='s')  # saniye cinsinden Unix zamanı ise
             df_point.set_index('timestamp', inplace=True)
+        elif 'timestamp' in df_point.columns:
+            df_point['timestamp'] = pd.to_datetime(df_point['timestamp'])
+            df_point.set_index('timestamp', inplace=True)
 
         self.data = pd.concat([self.data, df_point])
         self.data = self.data[~self.data.index.duplicated(keep='last')]
@@ -38,11 +42,34 @@ class SlidingWindow:
     def is_full(self):
         return len(self.data) == self.window_size
 
+    def get_last_timestamp(self):
+        if len(self.data) > 0:
+            return self.data.index[-1]
+        return None
+
     def get_latest_price(self):
         if len(self.data) > 0:
             return self.data.iloc[-1].get('close', 0)
         return 0
 
+    def state_dict(self):
+        """Kontrol noktası için pencere: index (ns) ve sayısal sütun dizileri"""
+        columns = [c for c in self.data.columns if pd.api.types.is_numeric_dtype(self.data[c])]
+        state = {
+            'index': self.data.index.asi8.copy() if len(self.data) else np.empty(0, dtype=np.int64),
+            'columns': columns,
+        }
+        for column in columns:
+            state[f'column:{column}'] = self.data[column].to_numpy()
+        return state
+
+    def load_state(self, state):
+        """state_dict() çıktısından pencereyi tek seferde kur"""
+        index = pd.DatetimeIndex(np.asarray(state['index'], dtype='datetime64[ns]'), name='timestamp')
+        self.data = pd.DataFrame({c: state[f'column:{c}'] for c in state['columns']}, index=index)
+        if len(self.data) > self.window_size:
+            self.data = self.data.iloc[-self.window_size:]
+
     def clear(self):
         self.data = pd.DataFrame()
 
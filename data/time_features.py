@@ -0,0 +1,70 @@
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+DAYS_PER_WEEK = 7
+NS_PER_MINUTE = 60 * 1_000_000_000
+# 1970-01-01 Perşembe (weekday=3)
+EPOCH_WEEKDAY = 3
+
+
+class CalendarTable:
+    """Dakika × haftanın günü için önceden hesaplanmış zaman feature tablosu"""
+
+    COLUMNS = ['hour_sin', 'hour_cos', 'dow_sin', 'dow_cos', 'is_weekend']
+
+    def __init__(self):
+        minutes = np.arange(MINUTES_PER_DAY)
+        # calculate_features ile birebir aynı: saat + dakika / 60
+        h = minutes // 60 + (minutes % 60) / 60
+        hour_sin = np.sin(2 * np.pi * h / 24)
+        hour_cos = np.cos(2 * np.pi * h / 24)
+
+        wd = np.arange(DAYS_PER_WEEK)
+        dow_sin = np.sin(2 * np.pi * wd / 7)
+        dow_cos = np.cos(2 * np.pi * wd / 7)
+        is_weekend = (wd >= 5).astype(float)
+
+        # Satır indeksi: weekday * 1440 + dakika
+        self.table = np.empty((DAYS_PER_WEEK * MINUTES_PER_DAY, len(self.COLUMNS)))
+        self.table[:, 0] = np.tile(hour_sin, DAYS_PER_WEEK)
+        self.table[:, 1] = np.tile(hour_cos, DAYS_PER_WEEK)
+        self.table[:, 2] = np.repeat(dow_sin, MINUTES_PER_DAY)
+        self.table[:, 3] = np.repeat(dow_cos, MINUTES_PER_DAY)
+        self.table[:, 4] = np.repeat(is_weekend, MINUTES_PER_DAY)
+        self.table.setflags(write=False)
+
+    @staticmethod
+    def index_from_ns(ns):
+        """Epoch nanosaniyelerinden tablo indeksini hesapla (sadece tamsayı işlemleri)"""
+        minutes = np.asarray(ns, dtype=np.int64) // NS_PER_MINUTE
+        minute_of_day = minutes % MINUTES_PER_DAY
+        weekday = (minutes // MINUTES_PER_DAY + EPOCH_WEEKDAY) % DAYS_PER_WEEK
+        return weekday * MINUTES_PER_DAY + minute_of_day
+
+    def index_from_datetime_index(self, index):
+        """DatetimeIndex'ten tablo indekslerini hesapla"""
+        if index.tz is not None:
+            # Duvar saatini kullan (DatetimeIndex.hour davranışı)
+            index = index.tz_localize(None)
+        # asi8 birim cinsindendir; datetime64[s]/[ms] index'ler önce nanosaniyeye çevrilir
+        return self.index_from_ns(index.as_unit('ns').asi8)
+
+    def lookup(self, idx):
+        """Tablo indekslerinden feature matrisini döndür: (n, 5)"""
+        return self.table[idx]
+
+    def features_for_index(self, index):
+        """DatetimeIndex için feature sütunlarını sözlük olarak döndür"""
+        rows = self.lookup(self.index_from_datetime_index(index))
+        return {name: rows[:, i] for i, name in enumerate(self.COLUMNS)}
+
+
+_calendar_table = None
+
+
+def get_calendar_table():
+    """Paylaşılan takvim tablosunu döndür (ilk çağrıda oluşturulur)"""
+    global _calendar_table
+    if _calendar_table is None:
+        _calendar_table = CalendarTable()
+    return _calendar_table
@@ -1,36 +1,91 @@
+import os
+import sys
 import time
+import queue
+import signal
 import logging
-from datetime import datetime, timezone
+import argparse
+from datetime import datetime, timedelta, timezone
 import traceback
 import warnings
 
-from config.settings import Config
-from data.api_client import APIClient
-from data.sliding_window import SlidingWindow
-from data.data_processor import DataProcessor
-from models.ensemble import EnsemblePredictor
-from trading.signal_generator import SignalGenerator
-from trading.risk_manager import RiskManager
-from utils.logger import setup_logger
-from utils.market_analyzer import MarketAnalyzer
+from config.loader import load_config, set_config, ConfigError
+from utils.metrics import get_metrics
+from utils.profiler import install_signal_handler
+from trading.decision import DecisionRecord, DecisionLog, signal_name, filter_names, REASON_PAUSED, SIGNAL_HOLD
+from config.trading_params import TradingParams
 
 # FutureWarning'leri sustur
 warnings.filterwarnings('ignore', category=FutureWarning)
 
 
 class TradingBot:
-    def __init__(self):
-        self.config = Config()
-        self.logger = setup_logger('trading', 'logs/trading.log')
+    def __init__(self, config, api_client=None):
+        # Ağır bağımlılıklar (pandas, requests, TensorFlow) sadece bot kurulurken yüklenir
+        from data.api_client import APIClient
+        from data.sliding_window import SlidingWindow
+        from data.data_quality import DataQualityGate
+        from data.data_processor import DataProcessor
+        from data.resampler import MultiTimeframeFeed
+        from models.ensemble import EnsemblePredictor
+        from trading.signal_generator import SignalGenerator
+        from trading.risk_manager import RiskManager
+        from trading.position_manager import PositionManager
+        from trading.filter_trace import FilterTrace
+        from utils.logger import setup_logger
+        from utils.market_analyzer import MarketAnalyzer
+        from utils.memory_guard import MemoryGuard
+        from utils.profiler import Profiler
+        from utils.speculation import SpeculativePipeline
+        from utils.checkpoint import Checkpointer
+        from utils.prediction_monitor import PredictionMonitor
+
+        # Başlangıçta bir kez doğrulanmış, değiştirilemez konfigürasyon tüm bileşenlere verilir
+        self.config = config
+        self.logger = setup_logger('trading', 'logs/trading.log', config=config)
 
         # Bileşenleri başlat
-        self.api_client = APIClient()
+        # api_client dışarıdan verilebilir (replay/soak testinde yerel API taklidi)
+        self.api_client = api_client or APIClient(config)
         self.sliding_window = SlidingWindow(window_size=180)
-        self.data_processor = DataProcessor()
-        self.ensemble_predictor = EnsemblePredictor()
-        self.signal_generator = SignalGenerator()
-        self.risk_manager = RiskManager()
-        self.market_analyzer = MarketAnalyzer()
+        self.data_quality = DataQualityGate(self.api_client, config=config) if config.DATA_QUALITY_ENABLED else None
+        self.data_processor = DataProcessor(config)
+        # Üst zaman dilimleri aynı 1m akışından artımlı toplanır (ek API isteği yok)
+        self.timeframes = MultiTimeframeFeed(config) if config.TIMEFRAMES else None
+        self.ensemble_predictor = EnsemblePredictor(config)
+        self.signal_generator = SignalGenerator(config)
+        self.risk_manager = RiskManager(config)
+        self.position_manager = PositionManager(config)
+        self.decision_log = DecisionLog(config.DECISION_LOG_SIZE)
+        self.filter_trace = FilterTrace(config)
+        self.memory_guard = MemoryGuard(config)
+        self.profiler = Profiler(config)
+        self.speculator = (
+            SpeculativePipeline(self.data_processor, self.ensemble_predictor, config)
+            if config.SPECULATIVE_ENABLED else None
+        )
+        self.market_analyzer = MarketAnalyzer(config)
+        # Yeniden başlatmada pencere ve durum diskten yüklenir, sadece kesintide kaçan barlar çekilir
+        self.checkpointer = Checkpointer(config) if config.CHECKPOINT_ENABLED else None
+        self.prediction_monitor = PredictionMonitor(
+            model_names=self.ensemble_predictor.model_order,
+            scaler_X=self.data_processor.scaler_X,
+            config=config
+        )
+
+        # Yönetim komutları (utils/admin_server.py) dakika başında botun kendi thread'inde uygulanır
+        self.commands = queue.SimpleQueue()
+        self.paused = False
+        self.last_minute_ms = None
+        self.model_state = {
+            'configured': list(config.MODEL_ORDER),
+            'loaded': list(self.ensemble_predictor.model_order),
+            'missing': [name for name in config.MODEL_ORDER if name not in self.ensemble_predictor.model_order],
+            'precision': {name: config.MODEL_PRECISION.get(name, 'float32')
+                          for name in self.ensemble_predictor.model_order},
+            'horizons': list(self.ensemble_predictor.horizons),
+            'fused': self.ensemble_predictor.fused_model is not None,
+        }
 
         self.is_running = False
 
@@ -49,18 +104,35 @@ class TradingBot:
         """Trading bot'u durdur"""
         self.is_running = False
         self.logger.info("Trading Bot durduruluyor...")
+        self.profiler.stop()
+        if self.data_processor.feature_cache is not None:
+            self.data_processor.feature_cache.flush()
+        if self.ensemble_predictor.deadline_runner is not None:
+            self.ensemble_predictor.deadline_runner.shutdown()
+        if self.ensemble_predictor.shadow is not None:
+            self.ensemble_predictor.shadow.stop()
 
     def _initialize_data(self):
         """İlk 180 dakikalık veriyi yükle"""
         self.logger.info("İlk veri seti yükleniyor...")
 
         try:
-            # Son 180 dakikalık veriyi çek
-            initial_data = self.api_client.get_historical_data(minutes=180)
+            if self._restore_checkpoint():
+                return
+
+            # Son 180 dakikalık veriyi çek (üst zaman dilimleri varsa pencerelerini dolduracak kadar)
+            minutes = max(180, self.timeframes.history_minutes) if self.timeframes is not None else 180
+            initial_data = self.api_client.get_historical_data(minutes=minutes)
+
+            # Eksik/bozuk barları onar
+            if self.data_quality is not None:
+                initial_data = self.data_quality.repair_window(initial_data)
 
             # Sliding window'u doldur
-            for _, row in initial_data.iterrows():
+            for _, row in initial_data.tail(180).iterrows():
                 self.sliding_window.add_data(row.to_dict())
+            if self.timeframes is not None:
+                self.timeframes.seed(initial_data)
 
             self.logger.info(f"İlk veri seti yüklendi: {len(initial_data)} dakika")
             self.logger.info(f"İlk veri setinin türü: {type(initial_data)}")
@@ -69,14 +141,108 @@ class TradingBot:
             self.logger.error(f"İlk veri yükleme hatası: {e}")
             raise
 
+    def state_dict(self):
+        """Kontrol noktasına yazılan bileşen durumları (pozisyonlar ledger'dan geri yüklenir)"""
+        state = {
+            'window': self.sliding_window.state_dict(),
+            'regime': self.market_analyzer.tracker.state_dict(),
+            'risk': self.risk_manager.state_dict(),
+            'paused': self.paused,
+        }
+        if self.timeframes is not None:
+            state['timeframes'] = self.timeframes.state_dict()
+        return state
+
+    def _save_checkpoint(self, record):
+        """Dakika sonu durumunu ve gönderilecek kararı kontrol noktasına yaz"""
+        horizons = self.ensemble_predictor.last_horizon_predictions or {}
+        pending = {
+            'record': record.as_array(),
+            'horizons': {str(horizon): float(prediction) for horizon, prediction in horizons.items()},
+        }
+        try:
+            self.checkpointer.save(self.state_dict(), pending, saved_at=self.api_client.clock().timestamp())
+        except Exception as e:
+            self.logger.error(f"Kontrol noktası hatası: {e}")
+        self.memory_guard.mark('checkpoint')
+
+    def _restore_checkpoint(self):
+        """Kontrol noktasından devam et; sadece kesinti süresince kaçan barları çek
+
+        Kontrol noktası yoksa, uyumsuzsa, kesinti MAX_BACKFILL_MINUTES'ı aşıyorsa
+        veya saatten ileride ise (saat kayması, geçmiş saatle replay) False döner
+        ve tam geçmiş yüklenir.
+        """
+        if self.checkpointer is None:
+            return False
+        started = time.perf_counter()
+        checkpoint = self.checkpointer.load()
+        if checkpoint is None or 'window' not in checkpoint['state']:
+            return False
+
+        state = checkpoint['state']
+        self.sliding_window.load_state(state['window'])
+        last_timestamp = self.sliding_window.get_last_timestamp()
+        now = self.api_client.clock()
+        gap = None if last_timestamp is None else (now.replace(tzinfo=None) - last_timestamp).total_seconds() / 60
+        if (gap is None or gap < 0 or gap > self.config.MAX_BACKFILL_MINUTES
+                or checkpoint['saved_at'] > now.timestamp()):
+            self.logger.warning(f"Kontrol noktası kullanılmadı: kesinti {gap} dakika, "
+                                f"kayıt {checkpoint['saved_at'] - now.timestamp():+.0f} sn saatin ilerisinde")
+            self.sliding_window.clear()
+            self.checkpointer.published = 0  # Başka zaman çizgisinin gönderim işareti taşınmaz
+            return False
+
+        if not self.market_analyzer.tracker.load_state(state['regime']):
+            self.logger.warning("Rejim penceresi değişmiş; izleyici pencereden yeniden ısınacak")
+        self.risk_manager.load_state(state['risk'])
+        self.paused = bool(state.get('paused', False))
+        if self.timeframes is not None:
+            self.timeframes.load_state(state.get('timeframes', {}))
+
+        # Kesinti süresince kaçan barlar tek aralık isteğiyle
+        missed = self.api_client.get_range_data(last_timestamp + timedelta(minutes=1), now)
+        if missed is None:
+            self.logger.warning("Kaçan barlar çekilemedi; boşluk sonraki barla doldurulacak")
+        elif len(missed) > 0:
+            if self.data_quality is not None:
+                missed = self.data_quality.process(missed, last_timestamp, self.sliding_window.get_latest_price())
+            self.sliding_window.add_data(missed)
+            if self.timeframes is not None:
+                self.timeframes.add(missed)
+
+        self._republish(checkpoint, now.timestamp())
+        self.logger.info(f"Kontrol noktasından devam edildi: {gap:.1f} dakikalık kesinti, "
+                         f"{0 if missed is None else len(missed)} bar çekildi, "
+                         f"{(time.perf_counter() - started) * 1000:.1f} ms")
+        return True
+
+    def _republish(self, checkpoint, now):
+        """Çökmeden önce gönderilemeyen son kararı, hâlâ güncelse gönder"""
+        pending = checkpoint['pending']
+        if 'record' not in pending:
+            return
+        record = DecisionRecord.from_row(pending['record'][0])
+        age = now - checkpoint['saved_at']
+        if record.timestamp <= checkpoint['published'] or age > self.config.CHECKPOINT_PUBLISH_MAX_AGE:
+            return
+        horizons = {int(horizon): prediction for horizon, prediction in pending.get('horizons', {}).items()}
+        self.logger.info(f"Gönderilmemiş karar yeniden gönderiliyor ({age:.0f} sn önce)")
+        try:
+            self._publish(record, horizons)
+        except Exception as e:
+            self.logger.error(f"Bekleyen karar gönderme hatası: {e}")
+
     def _main_loop(self):
         """Ana işlem döngüsü"""
         while self.is_running:
             try:
                 current_time = datetime.now(timezone.utc)
 
-                # Her dakikanın 59. saniyesinde çalış
-                if current_time.second >= 59:
+                # Her dakikanın 59. saniyesinde çalış; spekülatif modda öncesinde ön hesaplama
+                if self.speculator is not None and self.speculator.claim(current_time, self.sliding_window.get_last_timestamp()):
+                    self._speculate()
+                elif current_time.second >= 59:
                     self._process_minute()
                     time.sleep(60 - current_time.second + 1)  # Bir sonraki dakikaya kadar bekle
                 else:
@@ -91,125 +257,324 @@ class TradingBot:
                 traceback.print_exc()
                 time.sleep(5)  # Hata durumunda kısa bir bekleme
 
+    def _speculate(self):
+        """Oluşmakta olan barla feature ve model çıktılarını önceden hesapla"""
+        try:
+            provisional = self.api_client.get_latest_data()
+            self.speculator.prepare(self.sliding_window.get_window(), provisional)
+        except Exception as e:
+            self.logger.error(f"Spekülatif hesaplama hatası: {e}")
+
+    def _apply_commands(self):
+        """Kuyruktaki yönetim komutlarını uygula"""
+        while True:
+            try:
+                command, argument = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                if command == 'pause':
+                    self.paused = True
+                    self.logger.warning("İşlemler duraklatıldı (tahminler hold sinyaliyle gönderilmeye devam eder)")
+                elif command == 'resume':
+                    self.paused = False
+                    self.logger.info("İşlemlere devam ediliyor")
+                elif command == 'reload':
+                    self.reload_params(argument)
+                elif command == 'profile':
+                    self.profiler.request(argument)
+            except Exception as e:
+                self.logger.error(f"Yönetim komutu hatası ({command}): {e}")
+
+    def reload_params(self, fresh_config):
+        """TradingParams değerlerini yeni konfigürasyondan al (ağırlıklar, eşikler, risk)"""
+        names = [key for key in dir(TradingParams) if key.isupper()]
+        changed = {key: getattr(fresh_config, key) for key in names
+                   if getattr(fresh_config, key) != getattr(self.config, key)}
+        if not changed:
+            self.logger.info("Parametre yeniden yükleme: değişiklik yok")
+            return changed
+
+        config = self.config.replace(**changed)
+        self.config = config
+        for component in (self.signal_generator, self.risk_manager, self.risk_manager.sizer, self.position_manager,
+                          self.filter_trace, self.market_analyzer, self.market_analyzer.tracker):
+            component.params = config
+
+        ensemble = self.ensemble_predictor
+        ensemble.config = ensemble.trading_params = config
+        # Ağırlıklar sadece tablo değiştiyse yenilenir; aksi halde öğrenilmiş/online ağırlıklar korunur
+        if 'ENSEMBLE_WEIGHTS' in changed:
+            ensemble.apply_weight_table(config.ENSEMBLE_WEIGHTS)
+            self.logger.warning("ENSEMBLE_WEIGHTS değişti: öğrenilmiş, paket ve online ağırlıklar yerine "
+                                "konfigürasyon tablosu kullanılıyor")
+
+        # Pencere boyları ve iz bayrağı kurulumda okunur; bunlar için yeniden başlatma gerekir
+        restart = [key for key in changed
+                   if key in ('REGIME_VOL_WINDOW', 'REGIME_SLOPE_WINDOW', 'FILTER_TRACE_ENABLED')]
+        self.logger.info(f"Parametreler yeniden yüklendi: {sorted(changed)}")
+        if restart:
+            self.logger.warning(f"Yeniden başlatmadan etkili olmayan parametreler: {restart}")
+        return changed
+
+    def publish_status(self, record):
+        """Yönetim uç noktası için botun anlık durumu (metrik kayıt defteri, token başına)"""
+        feature_cache = self.data_processor.feature_cache
+        shadow = self.ensemble_predictor.shadow
+        get_metrics().publish(f"bot.{self.config.TOKEN_ID}", {
+            'token_id': self.config.TOKEN_ID,
+            'paused': self.paused,
+            'window_size': self.sliding_window.size(),
+            'last_bar': str(self.sliding_window.get_last_timestamp()),
+            'regime': int(record.regime),
+            'prediction': float(record.prediction),
+            'price': float(record.price),
+            'signal': record.signal_name,
+            'reason': record.reason_name,
+            'quantity': float(record.quantity),
+            'dropped_models': list(self.ensemble_predictor.last_dropped),
+            'stage_ms': dict(self.memory_guard.stage_ms),
+            'last_minute_ms': self.last_minute_ms,
+            'models': self.model_state,
+            'open_positions': len(self.position_manager.open_positions),
+            'queues': {
+                'feature_cache_pending': feature_cache.pending_rows() if feature_cache is not None else 0,
+                'shadow_observations': shadow.pending_observations() if shadow is not None else 0,
+                'pending_outcomes': self.ensemble_predictor.pending_outcome_count(),
+            },
+        })
+
     def _process_minute(self):
         """Her dakika çalışan ana işlem"""
+        started = time.perf_counter()
+        self.memory_guard.begin()
+        self.profiler.begin()
         try:
-            print("=== ADIM 1: Yeni veri çekiliyor ===")
-            # 1. Yeni veriyi çek
-            new_data = self.api_client.get_latest_data()
+            new_data = self._fetch_bar()
             if new_data is None:
-                self.logger.warning("Yeni veri alınamadı")
                 return
 
-            print("=== ADIM 2: Sliding window güncelleniyor ===")
-            # 2. Sliding window'u güncelle
+            record = self._decide(new_data)
+            if record is None:
+                return
 
-            self.sliding_window.add_data(new_data)
+            self._publish(record, self.ensemble_predictor.last_horizon_predictions)
+            self.memory_guard.mark('api')
 
-            print(self.sliding_window.data.tail())
+        except Exception as e:
+            self.logger.error(f"Dakikalık işlem hatası: {e}")
+            print(f"GENEL HATA: {e}")
+            print("STACK TRACE:")
+            traceback.print_exc()
+            print("-" * 50)
 
-            print("=== ADIM 3: Window data alınıyor ===")
-            # 3. 180 dakikalık pencereyi al
-            window_data = self.sliding_window.get_window()
+        finally:
+            self.profiler.end()
+            self.memory_guard.end()
+            self.last_minute_ms = (time.perf_counter() - started) * 1000
+
+    def _fetch_bar(self):
+        """Adım 1: yeni barı API'den çek (ağ G/Ç)"""
+        print("=== ADIM 1: Yeni veri çekiliyor ===")
+        new_data = self.api_client.get_latest_data()
+        if new_data is None:
+            self.logger.warning("Yeni veri alınamadı")
+            return None
+        self.memory_guard.mark('fetch')
+        return new_data
+
+    def _decide(self, new_data):
+        """Adım 2-10: pencere, feature, tahmin, sinyal, risk, pozisyon ve log (CPU)
+
+        Karar kaydını döndürür; pencere yetersizse None.
+        """
+        self._apply_commands()
+
+        # Veri kalite kontrolü: tekrar/eski barları at, boşlukları doldur
+        if self.data_quality is not None:
+            last_timestamp = self.sliding_window.get_last_timestamp()
+            last_close = self.sliding_window.get_latest_price() if last_timestamp is not None else None
+            new_data = self.data_quality.process(new_data, last_timestamp, last_close)
+
+        print("=== ADIM 2: Sliding window güncelleniyor ===")
+        # 2. Sliding window'u güncelle
+
+        self.sliding_window.add_data(new_data)
+        if self.timeframes is not None:
+            self.timeframes.add(new_data)
+
+        # DataFrame metne çevirmek dakika başına ~50 ms; sadece DEBUG seviyesinde
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Sliding window son barlar:\n{self.sliding_window.data.tail()}")
+
+        print("=== ADIM 3: Window data alınıyor ===")
+        # 3. 180 dakikalık pencereyi al
+        window_data = self.sliding_window.get_window()
+
+        if len(window_data) < 180:
+            self.logger.warning(f"Yetersiz veri: {len(window_data)} dakika")
+            return None
+
+        bar_timestamp = int(window_data.index[-1].timestamp())
+        current_price = float(window_data['close'].iloc[-1])
+
+        # Online ağırlık güncellemesi ve canlı doğruluk için gerçekleşen fiyatı bildir
+        self.ensemble_predictor.observe_price(bar_timestamp, current_price)
+        self.prediction_monitor.observe(bar_timestamp, current_price)
+
+        self.memory_guard.mark('window')
+
+        print("=== ADIM 4: Feature'lar hesaplanıyor ===")
+        # 4. Feature'ları hesapla
+        inference = None
+        try:
+            if self.speculator is not None:
+                # Geçici bar tolerans içindeyse sadece son satır düzeltilir, çıkarım yeniden kullanılır
+                features_df, inference = self.speculator.resolve(window_data)
+            else:
+                features_df = self.data_processor.calculate_features(window_data)
+            print("Feature hesaplama başarılı")
+            print(f"Feature boyutu: {features_df.shape}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Feature'lar son satırlar:\n{features_df.tail()}")
+        except Exception as e:
+            print(f"FEATURE HESAPLAMA HATASI: {e}")
+            traceback.print_exc()
+            raise
 
-            if len(window_data) < 180:
-                self.logger.warning(f"Yetersiz veri: {len(window_data)} dakika")
-                return
+        if self.timeframes is not None and self.timeframes.updated:
+            # Üst dilim barı tamamlandıysa o dilimin feature'ları (dilim başına en fazla bir kez)
+            self.timeframes.refresh()
 
-            print("=== ADIM 4: Feature'lar hesaplanıyor ===")
-            # 4. Feature'ları hesapla
-            try:
-                features_df = self.data_processor.calculate_features(window_data)
-                print("Feature hesaplama başarılı")
-                print("***********FEATURESDF***************")
-                print(features_df.shape)
-                print(features_df.tail())
-                print("**************************")
-            except Exception as e:
-                print(f"FEATURE HESAPLAMA HATASI: {e}")
-                traceback.print_exc()
-                raise
+        self.memory_guard.mark('features')
 
-            print("=== ADIM 5: Market analizi yapılıyor ===")
-            # 5. Piyasa durumunu analiz et
-            try:
-                market_condition = self.market_analyzer.analyze_market(features_df)
-                print(f"Market analizi başarılı: {market_condition}")
-            except Exception as e:
-                print(f"MARKET ANALİZİ HATASI: {e}")
-                traceback.print_exc()
-                raise
+        print("=== ADIM 5: Market analizi yapılıyor ===")
+        # 5. Piyasa durumunu analiz et
+        try:
+            market_condition = self.market_analyzer.analyze_market(features_df)
+            print(f"Market analizi başarılı: {market_condition}")
+        except Exception as e:
+            print(f"MARKET ANALİZİ HATASI: {e}")
+            traceback.print_exc()
+            raise
 
-            print("=== ADIM 6: Ensemble tahmin yapılıyor ===")
-            # 6. Ensemble tahmin yap
-            try:
-                prediction = self.ensemble_predictor.predict(features_df, market_condition)
-                print(f"Ensemble tahmin başarılı: {prediction}")
-            except Exception as e:
-                print(f"ENSEMBLE TAHMİN HATASI: {e}")
-                traceback.print_exc()
-                raise
+        self.memory_guard.mark('market')
 
-            print("=== ADIM 7: Sinyal üretiliyor ===")
-            # 7. Al/sat sinyali üret
-            try:
-                signal = self.signal_generator.generate_signal(prediction, features_df, market_condition)
-                print(f"Sinyal üretimi başarılı: {signal}")
-            except Exception as e:
-                print(f"SİNYAL ÜRETİMİ HATASI: {e}")
-                traceback.print_exc()
-                raise
+        print("=== ADIM 6: Ensemble tahmin yapılıyor ===")
+        # 6. Ensemble tahmin yap
+        record = DecisionRecord(bar_timestamp, current_price, regime=market_condition)
+        try:
+            predict_started = time.perf_counter()
+            prediction = self.ensemble_predictor.predict(features_df, market_condition, inference)
+            record.predict_ms = (time.perf_counter() - predict_started) * 1000
+            record.dropped = self.ensemble_predictor.dropped_mask()
+            print(f"Ensemble tahmin başarılı: {prediction}")
+            self.ensemble_predictor.record_prediction(bar_timestamp, market_condition, current_price)
+            if prediction is not None:
+                self.prediction_monitor.record(
+                    bar_timestamp, prediction, current_price,
+                    self.ensemble_predictor.last_model_predictions,
+                    features_df[list(self.config.FEATURES_LIST)].iloc[-1].to_numpy()
+                )
+        except Exception as e:
+            print(f"ENSEMBLE TAHMİN HATASI: {e}")
+            traceback.print_exc()
+            raise
 
-            print("=== ADIM 8: Risk kontrolü uygulanıyor ===")
-            # 8. Risk kontrolü
-            try:
-                final_signal = self.risk_manager.apply_risk_controls(signal, features_df)
-                print(f"Risk kontrolü başarılı: {final_signal}")
-            except Exception as e:
-                print(f"RİSK KONTROLÜ HATASI: {e}")
-                traceback.print_exc()
-                raise
+        self.memory_guard.mark('predict')
 
-            print("=== ADIM 9: Sonuçlar loglanıyor ===")
-            # 9. Sonuçları logla
-            try:
-                self._log_results(prediction, signal, final_signal, market_condition)
-                print("Loglama başarılı")
-            except Exception as e:
-                print(f"LOGLAMA HATASI: {e}")
-                traceback.print_exc()
-                raise
+        print("=== ADIM 7: Sinyal üretiliyor ===")
+        # 7. Al/sat sinyali üret
+        try:
+            self.signal_generator.generate_signal(prediction, features_df, market_condition, record)
+            print(f"Sinyal üretimi başarılı: {record.signal_name}")
+        except Exception as e:
+            print(f"SİNYAL ÜRETİMİ HATASI: {e}")
+            traceback.print_exc()
+            raise
 
-            print("=== ADIM 10: API'ye gönderiliyor ===")
-            # 10. API'ye tahmin ve sinyali gönder
-            try:
-                self.api_client.send_prediction(prediction, market_condition, final_signal)
-                print("API gönderimi başarılı")
-            except Exception as e:
-                print(f"API GÖNDERİMİ HATASI: {e}")
-                traceback.print_exc()
-                raise
+        self.memory_guard.mark('signal')
 
+        print("=== ADIM 8: Risk kontrolü uygulanıyor ===")
+        # 8. Risk kontrolü
+        try:
+            self._apply_risk(record, features_df, current_price)
+            self.decision_log.append(record)
+            self.filter_trace.observe(record)
+            self.filter_trace.publish()
+            print(f"Risk kontrolü başarılı: {record}")
         except Exception as e:
-            self.logger.error(f"Dakikalık işlem hatası: {e}")
-            print(f"GENEL HATA: {e}")
-            print("STACK TRACE:")
+            print(f"RİSK KONTROLÜ HATASI: {e}")
             traceback.print_exc()
-            print("-" * 50)
+            raise
 
-    def _log_results(self, prediction, signal, final_signal, market_condition):
-        """Sonuçları logla"""
+        self.memory_guard.mark('risk')
+
+        print("=== ADIM 9: Pozisyon güncelleniyor ===")
+        # 9. Final sinyali pozisyonlara uygula (ledger'a yazılır)
         try:
-            current_price = self.sliding_window.get_latest_price()
+            self.position_manager.execute_decision(record)
+            print(f"Pozisyon: {self.position_manager.get_position_info()['position']}")
+        except Exception as e:
+            print(f"POZİSYON GÜNCELLEME HATASI: {e}")
+            traceback.print_exc()
+            raise
+
+        self.memory_guard.mark('position')
 
+        print("=== ADIM 10: Sonuçlar loglanıyor ===")
+        # 10. Sonuçları logla
+        try:
+            self._log_results(record)
+            print("Loglama başarılı")
+        except Exception as e:
+            print(f"LOGLAMA HATASI: {e}")
+            traceback.print_exc()
+            raise
+
+        self.memory_guard.mark('log')
+        self.publish_status(record)
+        if self.checkpointer is not None:
+            self._save_checkpoint(record)
+        return record
+
+    def _apply_risk(self, record, features_df, current_price):
+        """Risk kontrolleri; duraklatılmışken sinyal kontrollere girmeden veto edilir
+
+        Veto edilen sinyal aşırı işlem tamponuna yazılmaz, devam edildiğinde sayılmaz.
+        """
+        if self.paused and record.signal != SIGNAL_HOLD:
+            return record.veto(REASON_PAUSED)
+        equity = self.position_manager.get_equity({self.config.TOKEN_ID: current_price})
+        return self.risk_manager.apply_risk_controls(record, features_df, equity)
+
+    def _publish(self, record, horizon_predictions=None):
+        """Adım 11: tahmin ve sinyali API'ye gönder (ağ G/Ç)"""
+        print("=== ADIM 11: API'ye gönderiliyor ===")
+        try:
+            sent = self.api_client.send_decision(record, horizon_predictions)
+            if sent and self.checkpointer is not None:
+                self.checkpointer.mark_published(record.timestamp)
+            print("API gönderimi başarılı")
+        except Exception as e:
+            print(f"API GÖNDERİMİ HATASI: {e}")
+            traceback.print_exc()
+            raise
+
+    def _log_results(self, record):
+        """Sonuçları logla"""
+        try:
             log_msg = f"""
             === TAHMIN SONUÇLARI ===
             Zaman: {datetime.now()}
-            Mevcut Fiyat: {current_price:.4f}
-            Tahmin Edilen Fiyat: {prediction:.4f}
-            Piyasa Durumu: {market_condition}
-            İlk Sinyal: {signal}
-            Final Sinyal: {final_signal}
+            Mevcut Fiyat: {record.price:.4f}
+            Tahmin Edilen Fiyat: {record.prediction:.4f}
+            Piyasa Durumu: {record.regime}
+            İlk Sinyal: {signal_name(record.raw_signal)}
+            Final Sinyal: {record.signal_name} ({record.reason_name})
+            Veto Eden Filtre: {', '.join(filter_names(record.filters)) or '-'}
+            Düşen Modeller: {', '.join(self.ensemble_predictor.last_dropped) or '-'}
+            Miktar: {record.quantity:.4f}
             """
 
             self.logger.info(log_msg)
@@ -219,13 +584,118 @@ class TradingBot:
             traceback.print_exc()
 
 
+def check_startup(config, started):
+    """Konfigürasyonu ve artifact paketini doğrula (TensorFlow/pandas yüklemeden)"""
+    from models.artifact_bundle import check_bundle
+
+    print(f"Konfigürasyon profili: {config.PROFILE}")
+    if config.USE_ARTIFACT_BUNDLE:
+        bundle, errors = check_bundle(config.ARTIFACT_BUNDLE_PATH, config=config)
+    else:
+        # Paket kullanılmıyorsa tekil artifact dosyalarının varlığını kontrol et
+        bundle = None
+        paths = list(config.MODEL_PATHS.values()) + [config.SCALER_X_PATH, config.SCALER_Y_PATH]
+        errors = [f"Eksik dosya: {path}" for path in paths if not os.path.isfile(path)]
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if bundle is not None:
+        print(f"Artifact paketi: {config.ARTIFACT_BUNDLE_PATH} (v{bundle.version})")
+        print(f"Modeller: {', '.join(bundle.manifest['models'])}")
+    for error in errors:
+        print(f"❌ {error}")
+
+    if errors:
+        print(f"❌ Kontrol başarısız ({elapsed:.1f} ms)")
+        return False
+
+    print(f"✅ Kontrol başarılı ({elapsed:.1f} ms)")
+    return True
+
+
+def parse_args():
+    """Komut satırı argümanları"""
+    parser = argparse.ArgumentParser(description="MetricTrees Trading Bot")
+    parser.add_argument('--check', action='store_true', help="Konfigürasyonu ve artifact paketini doğrula ve çık")
+    parser.add_argument('--profile', default=None, help="config/profiles altındaki profil adı")
+    parser.add_argument('--config', default=None, help="TOML/YAML/JSON konfigürasyon dosyası")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="asyncio modunda çalıştır (ağ G/Ç ve hesaplama aşamaları örtüşür)")
+    parser.add_argument('--tokens', type=int, nargs='+', default=None,
+                        help="--async ile aynı süreçte çalışacak token ID'leri (her biri modelleri ayrı yükler)")
+    return parser.parse_args()
+
+
+def start_admin(bots, config, args):
+    """ADMIN_ENABLED ise yerel durum/yönetim uç noktasını başlat"""
+    if not config.ADMIN_ENABLED:
+        return None
+    from utils.admin_server import AdminServer
+    return AdminServer(bots, config, reload=lambda: load_config(profile=args.profile, path=args.config)).start()
+
+
+def run_async(config, tokens=None, args=None):
+    """Bir veya daha fazla token için botları tek olay döngüsünde çalıştır"""
+    import asyncio
+    from utils.async_runtime import AsyncRuntime, token_config
+
+    tokens = tokens or [config.TOKEN_ID]
+    configs = [token_config(config, token) for token in tokens] if len(tokens) > 1 else [config]
+    runtime = AsyncRuntime([TradingBot(token_cfg) for token_cfg in configs], config)
+    admin = start_admin(runtime.bots, config, args)
+    try:
+        asyncio.run(runtime.run())
+    finally:
+        if admin is not None:
+            admin.stop()
+
+
 if __name__ == "__main__":
-    bot = TradingBot()
+    args = parse_args()
+    started = time.perf_counter()
+
+    try:
+        config = load_config(profile=args.profile, path=args.config)
+    except ConfigError as e:
+        print(f"❌ Konfigürasyon hatası: {e}")
+        sys.exit(1)
+    set_config(config)
+
+    if args.check:
+        sys.exit(0 if check_startup(config, started) else 1)
+
+    if args.tokens and not args.use_async:
+        print("❌ --tokens sadece --async ile kullanılabilir")
+        sys.exit(1)
+
+    # kill -USR1 <pid>: sonraki PROFILE_MINUTES dakikayı profille
+    install_signal_handler()
+
+    if args.use_async:
+        try:
+            run_async(config, args.tokens, args)
+        except Exception as e:
+            logging.error(f"Asenkron çalışma hatası: {e}")
+            print(f"ASENKRON ÇALIŞMA HATASI: {e}")
+            traceback.print_exc()
+            sys.exit(1)
+        sys.exit(0)
+
+    # SIGTERM (systemd/docker stop) Ctrl+C gibi ana döngüyü keser; kapanış finally'de yapılır
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    bot = TradingBot(config)
+    admin = start_admin([bot], config, args)
     try:
         bot.start()
     except KeyboardInterrupt:
-        bot.stop()
+        pass  # Başlangıç sırasında kesildi
     except Exception as e:
         logging.error(f"Bot başlatma hatası: {e}")
         print(f"BOT BAŞLATMA HATASI: {e}")
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+    finally:
+        # _main_loop KeyboardInterrupt'ı yakalayıp normal döner; cache flush, profil dökümü
+        # ve executor kapanışı her çıkış yolunda çalışmalı
+        bot.stop()
+        if admin is not None:
+            admin.stop()
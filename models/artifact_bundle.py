@@ -0,0 +1,232 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+from config.loader import get_config
+
+# Sadece hafif modüller: --check yolu TensorFlow/pandas/sklearn yüklemeden çalışır
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+SCALER_NAMES = ('scaler_X', 'scaler_y')
+
+
+class BundleError(Exception):
+    """Artifact paketi eksik veya bozuk"""
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Dosyanın SHA-256 özetini parça parça hesapla"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArrayScaler:
+    """StandardScaler eşdeğeri; paketteki (memmap) ortalama/ölçek dizileriyle çalışır"""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.n_features_in_ = len(mean)
+
+    def transform(self, X):
+        import numpy as np
+        return (np.asarray(X, dtype=float) - self.mean_) / self.scale_
+
+    def inverse_transform(self, X):
+        import numpy as np
+        return np.asarray(X, dtype=float) * self.scale_ + self.mean_
+
+
+class ArtifactBundle:
+    """Sürümlü artifact paketi: modeller, scaler parametreleri, feature listesi ve ağırlıklar"""
+
+    def __init__(self, path=None, config=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('artifact_bundle')
+        self.path = path or self.config.ARTIFACT_BUNDLE_PATH
+        self.manifest = self._read_manifest()
+
+    @staticmethod
+    def exists(path=None):
+        """Pakette manifest var mı"""
+        path = path or get_config().ARTIFACT_BUNDLE_PATH
+        return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+    def _read_manifest(self):
+        manifest_path = os.path.join(self.path, MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            raise BundleError(f"Manifest bulunamadı: {manifest_path}")
+        except json.JSONDecodeError as e:
+            raise BundleError(f"Manifest okunamadı: {e}")
+
+        if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise BundleError(f"Desteklenmeyen paket formatı: {manifest.get('format_version')}")
+        return manifest
+
+    @property
+    def version(self):
+        return self.manifest.get('bundle_version')
+
+    @property
+    def features(self):
+        return self.manifest['features']
+
+    @property
+    def weights(self):
+        """Ağırlık tablosu (rejim anahtarları int)"""
+        return {int(regime): w for regime, w in self.manifest.get('weights', {}).items()}
+
+    def model_path(self, name):
+        return os.path.join(self.path, self.manifest['models'][name])
+
+    def model_paths(self):
+        return {name: os.path.join(self.path, rel) for name, rel in self.manifest['models'].items()}
+
+    def load_scaler(self, name):
+        """Scaler parametrelerini memory-map ile yükle"""
+        import numpy as np
+
+        entry = self.manifest['scalers'][name]
+        mean = np.load(os.path.join(self.path, entry['mean']), mmap_mode='r')
+        scale = np.load(os.path.join(self.path, entry['scale']), mmap_mode='r')
+        return ArrayScaler(mean, scale)
+
+    def verify(self, checksums=True):
+        """Dosya varlığını, boyutları ve (istenirse) SHA-256 özetlerini doğrula"""
+        errors = []
+        for rel_path, info in self.manifest.get('files', {}).items():
+            full_path = os.path.join(self.path, rel_path)
+            if not os.path.isfile(full_path):
+                errors.append(f"Eksik dosya: {rel_path}")
+                continue
+            if os.path.getsize(full_path) != info['size']:
+                errors.append(f"Boyut uyuşmazlığı: {rel_path}")
+                continue
+            if checksums and file_sha256(full_path) != info['sha256']:
+                errors.append(f"Checksum uyuşmazlığı: {rel_path}")
+
+        return errors + self.compatibility_errors()
+
+    def compatibility_errors(self):
+        """Manifestin etkin konfigürasyonla uyumu (dosya okumadan; her yüklemede kontrol edilir)"""
+        errors = []
+        if self.manifest.get('features') != list(self.config.FEATURES_LIST):
+            errors.append("Feature listesi Config.FEATURES_LIST ile uyuşmuyor")
+        if self.manifest.get('look_back') != self.config.LOOK_BACK:
+            errors.append(f"LOOK_BACK uyuşmuyor: paket {self.manifest.get('look_back')}, "
+                          f"konfigürasyon {self.config.LOOK_BACK}")
+        if self.manifest.get('step_ahead') != self.config.STEP_AHEAD:
+            errors.append(f"STEP_AHEAD uyuşmuyor: paket {self.manifest.get('step_ahead')}, "
+                          f"konfigürasyon {self.config.STEP_AHEAD}")
+        if set(self.manifest.get('models', {})) != set(self.config.MODEL_PATHS):
+            errors.append(f"Model listesi Config.MODEL_PATHS ile uyuşmuyor: paket {sorted(self.manifest.get('models', {}))}, "
+                          f"konfigürasyon {sorted(self.config.MODEL_PATHS)}")
+        return errors
+
+
+def build_bundle(output_path=None, version=None, weights=None, config=None):
+    """Mevcut artifact'lardan yeni bir paket oluştur (atomik olarak yer değiştirir)"""
+    import pickle
+    import numpy as np
+
+    config = config or get_config()
+    logger = logging.getLogger('artifact_bundle')
+    output_path = output_path or config.ARTIFACT_BUNDLE_PATH
+    version = version or datetime.now().strftime('%Y%m%d%H%M%S')
+
+    tmp_path = f"{output_path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(os.path.join(tmp_path, 'models'))
+    os.makedirs(os.path.join(tmp_path, 'scalers'))
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'bundle_version': version,
+        'created': datetime.now().isoformat(),
+        'look_back': config.LOOK_BACK,
+        'step_ahead': config.STEP_AHEAD,
+        'features': list(config.FEATURES_LIST),
+        'models': {},
+        'scalers': {},
+        'weights': {str(regime): w for regime, w in (weights or {}).items()},
+        'files': {},
+    }
+
+    # Modeller
+    for name, src in config.MODEL_PATHS.items():
+        rel_path = os.path.join('models', f"{name}{os.path.splitext(src)[1]}")
+        shutil.copyfile(src, os.path.join(tmp_path, rel_path))
+        manifest['models'][name] = rel_path
+
+    # Scaler parametreleri (sklearn nesnesi yerine düz .npy dizileri)
+    for name, src in zip(SCALER_NAMES, (config.SCALER_X_PATH, config.SCALER_Y_PATH)):
+        with open(src, 'rb') as f:
+            scaler = pickle.load(f)
+        entry = {}
+        for attr in ('mean', 'scale'):
+            rel_path = os.path.join('scalers', f"{name}_{attr}.npy")
+            np.save(os.path.join(tmp_path, rel_path), np.asarray(getattr(scaler, f"{attr}_"), dtype=np.float64))
+            entry[attr] = rel_path
+        manifest['scalers'][name] = entry
+
+    for group in ('models', 'scalers'):
+        for root, _, files in os.walk(os.path.join(tmp_path, group)):
+            for file_name in files:
+                full_path = os.path.join(root, file_name)
+                rel_path = os.path.relpath(full_path, tmp_path)
+                manifest['files'][rel_path] = {
+                    'sha256': file_sha256(full_path),
+                    'size': os.path.getsize(full_path),
+                }
+
+    with open(os.path.join(tmp_path, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Eski paketi yenisiyle değiştir
+    if os.path.exists(output_path):
+        old_path = f"{output_path}.old-{os.getpid()}"
+        os.replace(output_path, old_path)
+        os.replace(tmp_path, output_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        os.replace(tmp_path, output_path)
+
+    logger.info(f"Artifact paketi oluşturuldu: {output_path} (v{version})")
+    return manifest
+
+
+def check_bundle(path=None, checksums=True, config=None):
+    """Başlangıç kontrolü: paketi doğrula, hata listesini döndür"""
+    try:
+        bundle = ArtifactBundle(path, config=config)
+    except BundleError as e:
+        return None, [str(e)]
+    return bundle, bundle.verify(checksums=checksums)
+
+
+def get_bundle(config=None):
+    """Konfigürasyona göre paketi döndür (yoksa None)
+
+    Eski veya başka konfigürasyonla üretilmiş paket MODEL_PATHS, scaler yolları
+    ve ağırlıkların yerine sessizce geçmesin diye uyumsuzlukta BundleError verir.
+    """
+    config = config or get_config()
+    if not config.USE_ARTIFACT_BUNDLE or not ArtifactBundle.exists(config.ARTIFACT_BUNDLE_PATH):
+        return None
+    bundle = ArtifactBundle(config.ARTIFACT_BUNDLE_PATH, config=config)
+    errors = bundle.compatibility_errors()
+    if errors:
+        raise BundleError(f"Artifact paketi konfigürasyonla uyumsuz ({config.ARTIFACT_BUNDLE_PATH}, "
+                          f"v{bundle.version}): " + "; ".join(errors)
+                          + " — paketi scripts/build_bundle.py ile yeniden oluşturun veya USE_ARTIFACT_BUNDLE = false")
+    return bundle
@@ -0,0 +1,104 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from config.loader import get_config
+from utils.metrics import get_metrics
+
+
+class DeadlineRunner:
+    """Model çağrılarını paralel çalıştır; süre dolunca dönmeyenleri bırak
+
+    Süresi dolan çağrının thread'i iptal edilemez: bitene kadar o model yeniden
+    gönderilmez ve her dakika kaçırmış sayılır. ENSEMBLE_MAX_MISSES ardışık
+    kaçırmada model ENSEMBLE_EXCLUDE_MINUTES boyunca dışlanır; süre sonunda tek
+    deneme hakkıyla geri alınır (tekrar kaçırırsa hemen yeniden dışlanır).
+    """
+
+    def __init__(self, keys, config=None, clock=time.monotonic):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('deadline_runner')
+        self.budget = self.config.ENSEMBLE_DEADLINE_MS / 1000
+        self.clock = clock
+        self.keys = list(keys)
+        # Her model için en fazla bir süren çağrı olduğundan model sayısı kadar thread yeter
+        self.executor = ThreadPoolExecutor(max(len(self.keys), 1), thread_name_prefix='model')
+
+        self._busy = {}  # anahtar -> süresi dolmuş ama süren çağrı
+        self.misses = {key: 0 for key in self.keys}  # ardışık kaçırma
+        self.excluded_until = {}
+        self.stats = {'calls': 0, 'degraded': 0, 'missed': 0, 'exclusions': 0}
+        self.last_dropped = []
+
+    def run(self, jobs):
+        """jobs: {anahtar: çağrılabilir}; süresinde dönenlerin {anahtar: sonuç} sözlüğü"""
+        now = self.clock()
+        deadline = now + self.budget
+        futures = {}
+        dropped = []
+        for key, fn in jobs.items():
+            if self.excluded_until.get(key, 0) > now:
+                dropped.append(key)
+            elif key in self._busy and not self._busy[key].done():
+                dropped.append(key)
+                self._miss(key, now)
+            else:
+                self._busy.pop(key, None)
+                futures[key] = self.executor.submit(fn)
+
+        done, _ = wait(futures.values(), timeout=max(deadline - self.clock(), 0))
+
+        results = {}
+        for key, future in futures.items():
+            if future not in done:
+                self._busy[key] = future
+                dropped.append(key)
+                self._miss(key, now)
+                continue
+            self.misses[key] = 0
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                self.logger.error(f"{self.label(key)} tahmin hatası: {e}")
+                dropped.append(key)
+
+        self.stats['calls'] += 1
+        if dropped:
+            self.stats['degraded'] += 1
+        self.last_dropped = dropped
+        self.publish()
+        return results
+
+    def _miss(self, key, now):
+        self.stats['missed'] += 1
+        self.misses[key] = self.misses.get(key, 0) + 1
+        if self.misses[key] >= self.config.ENSEMBLE_MAX_MISSES:
+            self.excluded_until[key] = now + self.config.ENSEMBLE_EXCLUDE_MINUTES * 60
+            # Geri alındığında tek kaçırma yeniden dışlatır
+            self.misses[key] = self.config.ENSEMBLE_MAX_MISSES - 1
+            self.stats['exclusions'] += 1
+            self.logger.warning(f"{self.label(key)} süre sınırını sürekli aşıyor, "
+                                f"{self.config.ENSEMBLE_EXCLUDE_MINUTES} dakika dışlandı")
+
+    @staticmethod
+    def label(key):
+        """(ufuk, model adı) anahtarının okunur adı"""
+        horizon, name = key
+        return f"{name} ({horizon}dk)"
+
+    def excluded(self):
+        """Şu an dışlanmış modeller"""
+        now = self.clock()
+        return [key for key, until in self.excluded_until.items() if until > now]
+
+    def publish(self):
+        """Sayaçları metrik kayıt defterine yaz"""
+        get_metrics().publish('ensemble_deadline', {
+            **self.stats,
+            'budget_ms': self.config.ENSEMBLE_DEADLINE_MS,
+            'last_dropped': [self.label(key) for key in self.last_dropped],
+            'excluded': [self.label(key) for key in self.excluded()],
+            'busy': len([f for f in self._busy.values() if not f.done()]),
+        })
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
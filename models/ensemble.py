@@ -1,20 +1,26 @@
 import numpy as np
 import logging
+import os
 from models.model_loader import ModelLoader
+from models.quantization import TFLiteModel
+from models.deadline import DeadlineRunner
+from models.weight_optimizer import EnsembleWeightOptimizer, PredictionCache, load_weights_file
+from models.shadow import ShadowEvaluator
+from models.artifact_bundle import get_bundle
 from data.data_processor import DataProcessor
-from config.settings import Config
-from config.trading_params import TradingParams
+from config.loader import get_config, compile_weight_matrix
+from utils.metrics import get_metrics
 
 
 class EnsemblePredictor:
-    def __init__(self):
-        self.config = Config()
-        self.trading_params = TradingParams()
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self.trading_params = self.config
         self.logger = logging.getLogger('ensemble_predictor')
 
         # Model loader'ı başlat
-        self.model_loader = ModelLoader()
-        self.data_processor = DataProcessor()
+        self.model_loader = ModelLoader(self.config)
+        self.data_processor = DataProcessor(self.config)
 
         # Modelleri yükle
         if not self.model_loader.load_all_models():
@@ -23,50 +29,322 @@ class EnsemblePredictor:
         self.models = self.model_loader.get_all_models()
         self.logger.info(f"Ensemble başlatıldı: {list(self.models.keys())}")
 
-    def predict(self, features_df, market_condition):
-        """Ensemble tahmin yap"""
+        # Ağırlıkları yükle (öğrenilmiş dosya varsa statik tabloyu ezer) ve
+        # model sırasına hizalı (rejim x model) matrise derle
+        self.model_order = [name for name in self.config.MODEL_ORDER if name in self.models]
+        self.weights = self.load_weights()
+        self.compile_weights()
+        self.last_model_predictions = {}
+
+        # Ek tahmin ufukları: aynı ölçeklenmiş girdi, tek birleşik model çağrısı
+        self.horizon_models = {self.config.STEP_AHEAD: self.models}
+        self.horizon_models.update(self.model_loader.load_horizon_models())
+        self.horizons = sorted(self.horizon_models)
+        self.horizon_orders = {self.config.STEP_AHEAD: self.model_order}
+        self.horizon_weight_matrices = {}
+        for horizon in self.horizons:
+            if horizon != self.config.STEP_AHEAD:
+                self.horizon_orders[horizon] = list(self.horizon_models[horizon])
+                self.horizon_weight_matrices[horizon] = compile_weight_matrix(
+                    self.config.ENSEMBLE_WEIGHTS, self.horizon_orders[horizon]
+                )
+        # Süre sınırlı modda modeller paralel ve ayrı çağrılır (birleşik çağrı ya hep ya hiç döner)
+        self.deadline_runner = (
+            DeadlineRunner([(h, name) for h in self.horizons for name in self.horizon_orders[h]], self.config)
+            if self.config.ENSEMBLE_DEADLINE_MS > 0 else None
+        )
+        self.build_fused_model()
+        self.last_horizon_predictions = {}
+        self.last_dropped = []
+
+        # Ağırlık optimizasyonu için tahmin cache'i ve online güncelleme
+        self.prediction_cache = PredictionCache(config=self.config) if self.config.RECORD_PREDICTIONS else None
+        self.weight_optimizer = EnsembleWeightOptimizer(config=self.config) if self.config.ONLINE_WEIGHT_UPDATE else None
+        self._pending_outcomes = {}
+        self._online_updates = 0
+
+        # Aday modeller için gölge değerlendirme (üretim yolunu bekletmez)
+        self.shadow = ShadowEvaluator(self.data_processor, config=self.config) if self.config.SHADOW_MODEL_PATHS else None
+        self.last_model_input = None
+        self.last_prediction = None
+
+    def load_weights(self, path=None):
+        """Ensemble ağırlıklarını dosyadan veya TradingParams'tan yükle"""
+        path = path or self.config.ENSEMBLE_WEIGHTS_PATH
+        default_weights = self.trading_params.ENSEMBLE_WEIGHTS
+
+        # Paketle birlikte dağıtılan ağırlıklar statik tablonun yerine geçer
+        bundle = get_bundle(self.config)
+        if bundle is not None and bundle.weights:
+            default_weights = {**default_weights, **bundle.weights}
+
+        if not os.path.exists(path):
+            return {regime: dict(w) for regime, w in default_weights.items()}
+
         try:
-            # Model giriş verilerini hazırla
-            model_input = self.data_processor.prepare_model_input(features_df)
-            if model_input is None:
+            weights = load_weights_file(path, default_weights)
+            self.logger.info(f"Öğrenilmiş ensemble ağırlıkları yüklendi: {path}")
+            return weights
+        except Exception as e:
+            self.logger.error(f"Ağırlık dosyası okunamadı, statik ağırlıklar kullanılıyor: {e}")
+            return {regime: dict(w) for regime, w in default_weights.items()}
+
+    def compile_weights(self):
+        """Ağırlık tablosunu predict'in kullandığı NumPy matrisine çevir"""
+        self.weight_matrix = compile_weight_matrix(self.weights, self.model_order)
+
+    def apply_weight_table(self, table):
+        """Konfigürasyondaki ağırlık tablosunu tüm ufuklara uygula
+
+        Öğrenilmiş dosya, paket ve online güncellenmiş ağırlıkların yerine geçer.
+        """
+        self.weights = {regime: dict(w) for regime, w in table.items()}
+        self.compile_weights()
+        for horizon in self.horizon_weight_matrices:
+            self.horizon_weight_matrices[horizon] = compile_weight_matrix(table, self.horizon_orders[horizon])
+
+    def build_fused_model(self):
+        """Tüm ufuklardaki Keras modellerini tek çok çıkışlı modelde birleştir
+
+        TFLite varyantları birleştirilemez; onlar ayrı ayrı çalıştırılır.
+        """
+        self.fused_model = None
+        self._fused_layout = []
+        self._unfused_layout = []
+        if self.deadline_runner is not None:
+            self._build_deadline_calls()
+            return
+
+        fused_models = []
+        for horizon in self.horizons:
+            for j, model_name in enumerate(self.horizon_orders[horizon]):
+                model = self.horizon_models[horizon][model_name]
+                if isinstance(model, TFLiteModel):
+                    self._unfused_layout.append((horizon, j))
+                else:
+                    self._fused_layout.append((horizon, j))
+                    fused_models.append(model)
+
+        # Tek model için birleştirme kazanç sağlamaz
+        if len(fused_models) > 1:
+            self.fused_model = self.model_loader.fuse_models(fused_models)
+        if self.fused_model is None:
+            self._unfused_layout = self._fused_layout + self._unfused_layout
+            self._fused_layout = []
+
+    def _build_deadline_calls(self):
+        """Süre sınırlı mod: her Keras modeli kendi grafiğinde derlenir (başlangıçta izlenir)
+
+        Derlenmemiş tek model çağrısı grafik çağrısından ~20 kat yavaştır; paralel
+        derlenmiş çağrılar birleşik modele yakın sürede biter.
+        """
+        self._deadline_calls = {}
+        for horizon in self.horizons:
+            for model_name in self.horizon_orders[horizon]:
+                model = self.horizon_models[horizon][model_name]
+                compiled = None if isinstance(model, TFLiteModel) else self.model_loader.fuse_models([model])
+                if compiled is not None:
+                    call = (lambda x, fn=compiled: float(fn(x)[0].numpy()[0][0]))
+                else:
+                    call = (lambda x, model=model: self._call_model(model, x))
+                self._deadline_calls[(horizon, model_name)] = call
+
+        # İlk grafik çalıştırması bütçeden uzun sürer; süre sayılmadan önce bir kez çalıştır
+        warmup = np.zeros((1, self.config.LOOK_BACK, self.config.FEATURES), dtype=np.float32)
+        for key, call in self._deadline_calls.items():
+            try:
+                call(warmup)
+            except Exception as e:
+                self.logger.error(f"{DeadlineRunner.label(key)} ısınma hatası: {e}")
+
+    @staticmethod
+    def _call_model(model, model_input):
+        return float(model(model_input, training=False).numpy()[0][0])
+
+    def _run_models_deadline(self, model_input):
+        """Modelleri ENSEMBLE_DEADLINE_MS içinde paralel çalıştır; dönmeyenler NaN"""
+        model_input = np.asarray(model_input, dtype=np.float32)
+        jobs = {key: (lambda call=call: call(model_input)) for key, call in self._deadline_calls.items()}
+        results = self.deadline_runner.run(jobs)
+        return {
+            horizon: np.array([results.get((horizon, name), np.nan) for name in self.horizon_orders[horizon]])
+            for horizon in self.horizons
+        }
+
+    def _run_models(self, model_input):
+        """Tüm ufuklardaki modelleri aynı girdiyle çalıştır: {ufuk: ölçekli tahmin dizisi}"""
+        if self.deadline_runner is not None:
+            return self._run_models_deadline(model_input)
+
+        preds = {horizon: np.zeros(len(self.horizon_orders[horizon])) for horizon in self.horizons}
+        pending = self._unfused_layout
+
+        if self.fused_model is not None:
+            try:
+                outputs = self.fused_model(np.asarray(model_input, dtype=np.float32))
+                for (horizon, j), output in zip(self._fused_layout, outputs):
+                    preds[horizon][j] = float(output.numpy()[0][0])
+            except Exception as e:
+                self.logger.error(f"Birleşik model tahmin hatası, modeller tek tek çalıştırılıyor: {e}")
+                pending = self._fused_layout + self._unfused_layout
+
+        # model.predict() her çağrıda yeni veri adaptörü/graph çağrısı kurar; tek pencere için doğrudan çağrı
+        model_input = np.asarray(model_input, dtype=np.float32)
+        for horizon, j in pending:
+            model_name = self.horizon_orders[horizon][j]
+            try:
+                preds[horizon][j] = self._call_model(self.horizon_models[horizon][model_name], model_input)
+            except Exception as e:
+                self.logger.error(f"{model_name} ({horizon}dk) tahmin hatası: {e}")
+                # Hata veren model süre aşımındaki gibi düşülür; _combine ağırlıkları yeniden normalize eder
+                preds[horizon][j] = np.nan
+
+        return preds
+
+    @staticmethod
+    def _combine(weight_vector, preds):
+        """Ağırlıklı ortalama tek dot product; ağırlık yoksa basit ortalama
+
+        Süresinde dönmeyen (NaN) modeller düşülür, kalan ağırlıklar yeniden normalize edilir.
+        """
+        valid = np.isfinite(preds)
+        if not valid.all():
+            if not valid.any():
+                return float('nan')
+            weight_vector, preds = weight_vector * valid, np.where(valid, preds, 0.0)
+            if weight_vector.sum() <= 0:
+                return float(preds.sum() / valid.sum())
+        total_weight = weight_vector.sum()
+        if total_weight > 0:
+            return float(weight_vector @ preds) / total_weight
+        # Fallback: tüm tahminlerin ortalaması
+        return float(preds.mean())
+
+    def infer(self, features_df):
+        """Ölçekli girdi ve tüm ufuklardaki model çıktıları (rejimden bağımsız, önceden hesaplanabilir)"""
+        # Model giriş verilerini hazırla (tüm ufuklar için bir kez)
+        model_input = self.data_processor.prepare_model_input(features_df)
+        if model_input is None:
+            return None
+        # Her modelden tahmin al (ufuk başına MODEL_ORDER sırasıyla)
+        return model_input, self._run_models(model_input)
+
+    def predict(self, features_df, market_condition, inference=None):
+        """Ensemble tahmin yap (STEP_AHEAD ufku); diğer ufuklar last_horizon_predictions'ta
+
+        inference: önceden hesaplanmış infer() sonucu (spekülatif mod); verilirse
+        modeller yeniden çalıştırılmaz, sadece rejim ağırlıkları uygulanır.
+        """
+        # Hata yolunda önceki dakikanın model tahminleri bu dakikaya yazılmasın
+        self.last_model_predictions = {}
+        try:
+            if inference is None:
+                inference = self.infer(features_df)
+                if inference is None:
+                    return None
+            model_input, horizon_preds = inference
+            self.last_model_input = model_input
+
+            preds = horizon_preds[self.config.STEP_AHEAD]
+            for model_name, pred in zip(self.model_order, preds):
+                self.logger.debug(f"{model_name} tahmini: {pred}")
+
+            # Süre sınırında düşen modeller: sonuç eksik modellerle (bozulmuş) üretilir
+            self.last_dropped = [name for name, pred in zip(self.model_order, preds) if not np.isfinite(pred)]
+            if self.last_dropped:
+                self.logger.warning(f"Bozulmuş ensemble tahmini, düşen modeller: {self.last_dropped}")
+
+            # Piyasa durumuna göre ağırlık vektörü
+            final_prediction = self._combine(self.weight_matrix[market_condition], preds)
+            if not np.isfinite(final_prediction):
+                self.logger.warning("Hiçbir model süresinde dönmedi, tahmin yok (hold gönderilir)")
                 return None
 
-            # Her modelden tahmin al
-            predictions = {}
-            for model_name, model in self.models.items():
-                try:
-                    pred = model.predict(model_input, verbose=0)[0][0]
-                    predictions[model_name] = pred
-                    self.logger.debug(f"{model_name} tahmini: {pred}")
-                except Exception as e:
-                    self.logger.error(f"{model_name} tahmin hatası: {e}")
-                    predictions[model_name] = 0
-
-            # Piyasa durumuna göre ağırlıkları al
-            weights = self.trading_params.ENSEMBLE_WEIGHTS[market_condition]
-
-            # Ağırlıklı ortalama hesapla
-            weighted_prediction = 0
-            total_weight = 0
-
-            for model_name, weight in weights.items():
-                if model_name in predictions and weight > 0:
-                    weighted_prediction += predictions[model_name] * weight
-                    total_weight += weight
-
-            if total_weight > 0:
-                final_prediction = weighted_prediction / total_weight
-            else:
-                # Fallback: tüm tahminlerin ortalaması
-                final_prediction = np.mean(list(predictions.values()))
+            predictions = {name: pred for name, pred in zip(self.model_order, preds.tolist()) if np.isfinite(pred)}
 
             # Scale'i geri çevir
             original_prediction = self.data_processor.inverse_transform_prediction(final_prediction)
+            self.last_model_predictions = {
+                name: float(self.data_processor.inverse_transform_prediction(pred))
+                for name, pred in predictions.items()
+            }
+            self.last_prediction = original_prediction
+
+            horizon_predictions = {self.config.STEP_AHEAD: float(original_prediction)}
+            for horizon, matrix in self.horizon_weight_matrices.items():
+                combined = self._combine(matrix[market_condition], horizon_preds[horizon])
+                if np.isfinite(combined):
+                    horizon_predictions[horizon] = float(self.data_processor.inverse_transform_prediction(combined))
+            self.last_horizon_predictions = dict(sorted(horizon_predictions.items()))
 
             self.logger.info(f"Ensemble tahmin - Market: {market_condition}, Sonuç: {original_prediction:.4f}")
+            if len(self.horizons) > 1:
+                self.publish_horizons(market_condition)
 
             return original_prediction
 
         except Exception as e:
             self.logger.error(f"Ensemble tahmin hatası: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def dropped_mask(self):
+        """Son tahminde düşen modellerin MODEL_ORDER bit maskesi (DecisionRecord.dropped)"""
+        return sum(1 << j for j, name in enumerate(self.model_order) if name in self.last_dropped)
+
+    def publish_horizons(self, market_condition):
+        """Tüm ufukların tahminlerini tek seferde metrik kayıt defterine yaz"""
+        summary = ", ".join(f"{h}dk: {p:.4f}" for h, p in self.last_horizon_predictions.items())
+        self.logger.info(f"Çoklu ufuk tahmini - {summary}")
+        get_metrics().publish('horizons', {
+            'market_condition': market_condition,
+            'predictions': self.last_horizon_predictions,
+        })
+
+    def record_prediction(self, timestamp, market_condition, current_price):
+        """Son tahmini cache'e yaz ve online güncelleme için beklet"""
+        if not self.last_model_predictions:
+            return
+
+        if self.prediction_cache is not None:
+            self.prediction_cache.append(timestamp, market_condition, current_price, self.last_model_predictions)
+
+        if self.shadow is not None and self.last_model_input is not None:
+            self.shadow.submit(timestamp, self.last_model_input, self.last_prediction, current_price)
+
+        if self.weight_optimizer is not None:
+            target_ts = int(timestamp) + self.config.STEP_AHEAD * 60
+            self._pending_outcomes[target_ts] = (market_condition, dict(self.last_model_predictions))
+
+    def pending_outcome_count(self):
+        """Gerçekleşen fiyatı beklenen (online güncelleme) tahmin sayısı"""
+        return len(self._pending_outcomes)
+
+    def observe_price(self, timestamp, close):
+        """Gerçekleşen fiyatla bekleyen tahminleri eşle (online mod ve gölge puanlama)"""
+        if self.shadow is not None:
+            self.shadow.observe_price(timestamp, close)
+
+        if self.weight_optimizer is None:
+            return
+
+        pending = self._pending_outcomes.pop(int(timestamp), None)
+
+        # Eşleşmesi artık mümkün olmayan eski kayıtları temizle
+        for ts in [ts for ts in self._pending_outcomes if ts < int(timestamp)]:
+            del self._pending_outcomes[ts]
+
+        if pending is None:
+            return
+
+        regime, model_predictions = pending
+        self.weight_optimizer.partial_fit(regime, model_predictions, close)
+        self._online_updates += 1
+
+        if self._online_updates % self.trading_params.ONLINE_WEIGHT_REFIT_EVERY == 0:
+            for regime in self.weights:
+                new_weights = self.weight_optimizer.online_weights(regime)
+                if new_weights is not None:
+                    self.weights[regime] = new_weights
+                    self.logger.info(f"Online ağırlık güncellemesi - Rejim {regime}: {new_weights}")
+            self.compile_weights()
+            self.weight_optimizer.save(self.weights)
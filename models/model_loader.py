@@ -1,26 +1,99 @@
-import tensorflow as tf
 import logging
-from config.settings import Config
+from config.loader import get_config
+from models.artifact_bundle import get_bundle
+from models.quantization import TFLiteModel, variant_path
 
 
 class ModelLoader:
-    def __init__(self):
-        self.config = Config()
+    def __init__(self, config=None):
+        self.config = config or get_config()
         self.logger = logging.getLogger('model_loader')
         self.models = {}
 
+    def get_model_paths(self):
+        """Model dosya yollarını döndür (artifact paketi varsa oradan)"""
+        bundle = get_bundle(self.config)
+        if bundle is not None:
+            self.logger.info(f"Modeller artifact paketinden yükleniyor: v{bundle.version}")
+            return bundle.model_paths()
+        return self.config.MODEL_PATHS
+
     def load_all_models(self):
         """Tüm modelleri yükle"""
-        for model_name, model_path in self.config.MODEL_PATHS.items():
-            try:
-                model = tf.keras.models.load_model(model_path)
+        for model_name, model_path in self.get_model_paths().items():
+            precision = self.config.MODEL_PRECISION.get(model_name, 'float32')
+            if precision != 'float32':
+                model = self._load_variant(model_name, precision)
+                if model is not None:
+                    self.models[model_name] = model
+                    continue
+
+            model = self._load_keras(model_name, model_path)
+            if model is not None:
                 self.models[model_name] = model
-                self.logger.info(f"{model_name} modeli yüklendi: {model_path}")
-            except Exception as e:
-                self.logger.error(f"{model_name} modeli yüklenemedi: {e}")
 
         return len(self.models) == len(self.config.MODEL_PATHS)
 
+    def load_horizon_models(self):
+        """Ek tahmin ufuklarının modellerini yükle: {ufuk: {model_adı: model}}"""
+        horizon_models = {}
+        for horizon, paths in self.config.HORIZON_MODEL_PATHS.items():
+            models = {}
+            for model_name, model_path in paths.items():
+                model = self._load_keras(f"{model_name}@{horizon}m", model_path)
+                if model is not None:
+                    models[model_name] = model
+            if models:
+                horizon_models[horizon] = models
+        return horizon_models
+
+    def fuse_models(self, models):
+        """Aynı girdiyi paylaşan Keras modellerini tek grafik çağrısında birleştir
+
+        Dönen fonksiyon (batch, LOOK_BACK, FEATURES) float32 girdi alır ve
+        modellerin çıktılarını aynı sırayla liste olarak döndürür.
+        """
+        # TensorFlow sadece modeller gerçekten yüklenirken içe aktarılır
+        import tensorflow as tf
+
+        signature = [tf.TensorSpec((None, self.config.LOOK_BACK, self.config.FEATURES), tf.float32)]
+
+        @tf.function(input_signature=signature)
+        def fused(inputs):
+            return [model(inputs, training=False) for model in models]
+
+        try:
+            # Grafiği başlangıçta izle; ilk canlı dakikada derleme gecikmesi olmasın
+            fused.get_concrete_function()
+            self.logger.info(f"{len(models)} model tek grafikte birleştirildi")
+            return fused
+        except Exception as e:
+            self.logger.error(f"Modeller birleştirilemedi, tek tek çalıştırılacak: {e}")
+            return None
+
+    def _load_keras(self, model_name, model_path):
+        """Float32 Keras modelini yükle"""
+        import tensorflow as tf
+
+        try:
+            model = tf.keras.models.load_model(model_path)
+            self.logger.info(f"{model_name} modeli yüklendi: {model_path}")
+            return model
+        except Exception as e:
+            self.logger.error(f"{model_name} modeli yüklenemedi: {e}")
+            return None
+
+    def _load_variant(self, model_name, precision):
+        """Nicelenmiş (TFLite) model varyantını yükle; yoksa float32'ye dön"""
+        path = variant_path(model_name, precision, self.config)
+        try:
+            model = TFLiteModel(path, num_threads=self.config.TFLITE_NUM_THREADS)
+            self.logger.info(f"{model_name} modeli yüklendi ({precision}): {path}")
+            return model
+        except Exception as e:
+            self.logger.error(f"{model_name} {precision} varyantı yüklenemedi, float32 kullanılacak: {e}")
+            return None
+
     def get_model(self, model_name):
         """Belirli bir modeli döndür"""
         return self.models.get(model_name)
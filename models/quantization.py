@@ -0,0 +1,163 @@
+import os
+import time
+import logging
+import numpy as np
+from config.loader import get_config
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+
+def variant_path(model_name, precision, config=None):
+    """Model varyantının dosya yolunu döndür"""
+    config = config or get_config()
+    return os.path.join(config.QUANTIZED_MODEL_DIR, f"{model_name}_{precision}.tflite")
+
+
+def convert_model(keras_model, precision):
+    """Keras modelini TFLite varyantına çevir
+
+    int8: dinamik aralık niceleme (ağırlıklar int8, aktivasyonlar float)
+    float16: ağırlıklar float16
+    """
+    import tensorflow as tf
+
+    if precision not in ('float16', 'int8'):
+        raise ValueError(f"Desteklenmeyen hassasiyet: {precision}")
+
+    def build_converter(select_ops):
+        converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if precision == 'float16':
+            converter.target_spec.supported_types = [tf.float16]
+        if select_ops:
+            # Yerleşik TFLite op'larına indirilemeyen katmanlar (ör. bazı RNN'ler) için
+            converter.target_spec.supported_ops = [
+                tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS
+            ]
+            converter._experimental_lower_tensor_list_ops = False
+        return converter
+
+    try:
+        return build_converter(select_ops=False).convert()
+    except Exception:
+        return build_converter(select_ops=True).convert()
+
+
+class TFLiteModel:
+    """TFLite yorumlayıcısını Keras benzeri predict() arayüzüyle sar"""
+
+    def __init__(self, model_path, num_threads=None):
+        import tensorflow as tf
+
+        self.model_path = model_path
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+
+    def predict(self, x, verbose=0):
+        """(batch, LOOK_BACK, FEATURES) girdisi için (batch, 1) tahmin döndür"""
+        x = np.asarray(x, dtype=self._input['dtype'])
+        outputs = []
+        # Yorumlayıcı sabit batch=1 ile derlenir
+        for i in range(x.shape[0]):
+            self.interpreter.set_tensor(self._input['index'], x[i:i + 1])
+            self.interpreter.invoke()
+            outputs.append(self.interpreter.get_tensor(self._output['index']).copy())
+        return np.concatenate(outputs, axis=0)
+
+    def __call__(self, x, training=False):
+        return _Tensorlike(self.predict(x))
+
+
+class _Tensorlike:
+    """model(x).numpy() çağrılarıyla uyumluluk için"""
+
+    def __init__(self, value):
+        self._value = value
+
+    def numpy(self):
+        return self._value
+
+
+def compiled_call(keras_model, config=None):
+    """Keras modelini canlı yoldaki gibi derlenmiş tf.function grafiğiyle çağıran fonksiyon"""
+    from models.model_loader import ModelLoader
+
+    fused = ModelLoader(config).fuse_models([keras_model])
+    if fused is None:
+        return lambda x: keras_model(x, training=False).numpy()
+    return lambda x: fused(x)[0].numpy()
+
+
+def benchmark_latency(call, sample, runs=50, warmup=5):
+    """Tek pencere tahmin gecikmesini ölç (ms)
+
+    call botun kullandığı çağrı olmalı: Keras için compiled_call(), TFLite için
+    TFLiteModel.predict. model.predict() her çağrıda veri adaptörü kurduğundan
+    float32 süresini birkaç kat şişirir.
+    """
+    for _ in range(warmup):
+        call(sample)
+
+    timings = np.empty(runs)
+    for i in range(runs):
+        started = time.perf_counter()
+        call(sample)
+        timings[i] = (time.perf_counter() - started) * 1000
+
+    return {
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'mean_ms': float(timings.mean()),
+    }
+
+
+def predict_windows(model, windows, batch_size=256):
+    """Pencere setinin tamamı için ölçekli tahminleri döndür"""
+    if isinstance(model, TFLiteModel):
+        return model.predict(windows)[:, 0]
+    return model.predict(windows, batch_size=batch_size, verbose=0)[:, 0]
+
+
+class QuantizationReport:
+    """Float32'ye karşı doğruluk/gecikme karşılaştırması"""
+
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('quantization')
+
+    def compare(self, reference, candidate, scaler_y=None):
+        """Ölçekli tahminleri karşılaştır; scaler verilirse fiyat cinsinden de raporla"""
+        diff = np.abs(candidate - reference)
+        result = {
+            'mae_scaled': float(diff.mean()),
+            'max_abs_diff_scaled': float(diff.max()),
+        }
+        if scaler_y is not None:
+            ref_price = scaler_y.inverse_transform(reference.reshape(-1, 1))[:, 0]
+            cand_price = scaler_y.inverse_transform(candidate.reshape(-1, 1))[:, 0]
+            result['mae_price'] = float(np.abs(cand_price - ref_price).mean())
+            result['mape_price'] = float(np.mean(np.abs(cand_price - ref_price) / np.abs(ref_price)))
+        return result
+
+    def ensemble_comparison(self, reference_preds, candidate_preds, model_order):
+        """Her rejimin ağırlıklarıyla ensemble çıktısını karşılaştır
+
+        reference_preds / candidate_preds: {model_adı: (N,) ölçekli tahmin}
+        """
+        ref = np.stack([reference_preds[name] for name in model_order], axis=1)
+        cand = np.stack([candidate_preds[name] for name in model_order], axis=1)
+
+        result = {}
+        for regime, weights in self.config.ENSEMBLE_WEIGHTS.items():
+            w = np.array([weights.get(name, 0.0) for name in model_order])
+            if w.sum() <= 0:
+                continue
+            w = w / w.sum()
+            diff = np.abs(cand @ w - ref @ w)
+            result[str(regime)] = {
+                'mae_scaled': float(diff.mean()),
+                'max_abs_diff_scaled': float(diff.max()),
+            }
+        return result
@@ -0,0 +1,179 @@
+import os
+import csv
+import time
+import queue
+import logging
+import threading
+import numpy as np
+from config.loader import get_config
+from utils.helpers import ensure_directory
+from utils.metrics import get_metrics
+
+
+class ShadowEvaluator:
+    """Aday modelleri üretim yolunu bekletmeden arka planda çalıştır ve puanla
+
+    Üretim tarafı sadece kuyruğa bırakır (put_nowait); işçi meşgulse en eski
+    istek atılır. İşçi thread düşük öncelikte çalışır ve her çıkarımdan sonra
+    SHADOW_MAX_CPU_SHARE oranını aşmayacak kadar uyur.
+    """
+
+    def __init__(self, data_processor, model_paths=None, config=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('shadow_evaluator')
+        self.data_processor = data_processor
+        self.model_paths = dict(model_paths or self.config.SHADOW_MODEL_PATHS)
+        self.models = {}
+
+        self._requests = queue.Queue(maxsize=1)
+        self._observations = queue.SimpleQueue()
+        self._pending = {}
+        self._abs_errors = {name: 0.0 for name in ['production'] + list(self.model_paths)}
+        self._direction_hits = dict.fromkeys(self._abs_errors, 0)
+        self._counts = dict.fromkeys(self._abs_errors, 0)
+
+        self.dropped = 0
+        self.scores = {}
+
+        self.log_path = self.config.SHADOW_LOG_PATH
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            ensure_directory(directory)
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._worker, name='shadow-evaluator', daemon=True)
+        self._thread.start()
+
+    def submit(self, timestamp, model_input, production_prediction, current_price):
+        """Üretim tahminiyle aynı girdiyi gölge kuyruğa bırak (asla bloklamaz)"""
+        item = (int(timestamp), model_input, float(production_prediction), float(current_price))
+        try:
+            self._requests.put_nowait(item)
+        except queue.Full:
+            # İşçi geride kaldı: eski isteği at, yenisini koy
+            try:
+                self._requests.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            try:
+                self._requests.put_nowait(item)
+            except queue.Full:
+                pass
+
+    def observe_price(self, timestamp, close):
+        """Gerçekleşen fiyatı puanlama için işçiye ilet (asla bloklamaz)"""
+        self._observations.put((int(timestamp), float(close)))
+
+    def pending_observations(self):
+        """İşçinin henüz eşlemediği gerçekleşen fiyat sayısı (yaklaşık)"""
+        return self._observations.qsize()
+
+    def stop(self):
+        """İşçi thread'i durdur"""
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _lower_priority(self):
+        """İşçi thread'in işletim sistemi önceliğini düşür (Linux)"""
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.config.SHADOW_NICE)
+        except (AttributeError, OSError) as e:
+            self.logger.debug(f"Gölge thread önceliği düşürülemedi: {e}")
+
+    def _load_models(self):
+        """Aday modelleri işçi thread'de yükle (başlangıcı geciktirmez)"""
+        import tensorflow as tf
+
+        for name, path in self.model_paths.items():
+            try:
+                self.models[name] = tf.keras.models.load_model(path)
+                self.logger.info(f"Gölge model yüklendi: {name} ({path})")
+            except Exception as e:
+                self.logger.error(f"Gölge model yüklenemedi: {name}: {e}")
+
+    def _worker(self):
+        self._lower_priority()
+        self._load_models()
+        max_share = min(max(self.config.SHADOW_MAX_CPU_SHARE, 0.01), 1.0)
+
+        while not self._stop.is_set():
+            self._drain_observations()
+            try:
+                item = self._requests.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+            started = time.perf_counter()
+            try:
+                self._evaluate(*item)
+            except Exception as e:
+                self.logger.error(f"Gölge değerlendirme hatası: {e}")
+
+            # CPU payı sınırı: çalışılan sürenin (1/pay - 1) katı kadar bekle
+            busy = time.perf_counter() - started
+            self._stop.wait(busy * (1.0 / max_share - 1.0))
+
+    def _evaluate(self, timestamp, model_input, production_prediction, current_price):
+        predictions = {}
+        for name, model in self.models.items():
+            try:
+                scaled = float(model(model_input, training=False).numpy()[0][0])
+                predictions[name] = float(self.data_processor.inverse_transform_prediction(scaled))
+            except Exception as e:
+                self.logger.error(f"Gölge model tahmin hatası: {name}: {e}")
+
+        self._write_log(timestamp, production_prediction, predictions)
+
+        target_ts = timestamp + self.config.STEP_AHEAD * 60
+        self._pending[target_ts] = (current_price, production_prediction, predictions)
+
+    def _write_log(self, timestamp, production_prediction, predictions):
+        names = list(self.model_paths)
+        new_file = not os.path.exists(self.log_path)
+        with open(self.log_path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(['timestamp', 'production'] + names)
+            writer.writerow([timestamp, production_prediction] + [predictions.get(n, np.nan) for n in names])
+
+    def _drain_observations(self):
+        while True:
+            try:
+                timestamp, close = self._observations.get_nowait()
+            except queue.Empty:
+                break
+
+            pending = self._pending.pop(timestamp, None)
+            for ts in [ts for ts in self._pending if ts < timestamp]:
+                del self._pending[ts]
+            if pending is None:
+                continue
+
+            base_price, production_prediction, predictions = pending
+            self._score('production', production_prediction, base_price, close)
+            for name, pred in predictions.items():
+                self._score(name, pred, base_price, close)
+            self._publish_scores()
+
+    def _score(self, name, prediction, base_price, realized):
+        self._abs_errors[name] += abs(prediction - realized)
+        self._counts[name] += 1
+        if np.sign(prediction - base_price) == np.sign(realized - base_price):
+            self._direction_hits[name] += 1
+
+    def _publish_scores(self):
+        # Referans ataması atomiktir; okuyan taraf kilit gerektirmez
+        self.scores = {
+            name: {
+                'mae': self._abs_errors[name] / n,
+                'directional_accuracy': self._direction_hits[name] / n,
+                'samples': n,
+            }
+            for name, n in self._counts.items() if n > 0
+        }
+        get_metrics().publish('shadow', {'scores': self.scores, 'dropped': self.dropped})
+
+    def get_scores(self):
+        """Aday ve üretim modelinin güncel skorlarını döndür"""
+        return self.scores
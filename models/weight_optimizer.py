@@ -0,0 +1,205 @@
+import os
+import csv
+import logging
+import numpy as np
+from datetime import datetime
+from scipy.optimize import nnls
+from config.loader import get_config
+from utils.helpers import ensure_directory, save_json, load_json
+
+
+class PredictionCache:
+    """Model bazlı tahminleri CSV dosyasına ekle (ağırlık optimizasyonu için)"""
+
+    def __init__(self, path=None, model_names=None, config=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('prediction_cache')
+        self.path = path or self.config.PREDICTION_CACHE_PATH
+        self.model_names = list(model_names or self.config.MODEL_PATHS.keys())
+        self.columns = ['timestamp', 'regime', 'close'] + self.model_names
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            ensure_directory(directory)
+
+        # Yeni dosyaya başlık satırı yaz
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, 'w', newline='') as f:
+                csv.writer(f).writerow(self.columns)
+
+    def append(self, timestamp, regime, close, model_predictions):
+        """Tek dakikanın model tahminlerini ekle"""
+        try:
+            row = [int(timestamp), int(regime), float(close)]
+            row += [float(model_predictions.get(name, np.nan)) for name in self.model_names]
+            with open(self.path, 'a', newline='') as f:
+                csv.writer(f).writerow(row)
+        except Exception as e:
+            self.logger.error(f"Tahmin cache yazma hatası: {e}")
+
+
+class EnsembleWeightOptimizer:
+    """Piyasa rejimi bazında negatif olmayan ensemble ağırlıklarını öğren"""
+
+    def __init__(self, model_names=None, config=None):
+        self.config = config or get_config()
+        self.params = self.config
+        self.logger = logging.getLogger('weight_optimizer')
+        self.model_names = list(model_names or self.config.MODEL_PATHS.keys())
+
+        # Online mod için rejim bazlı hata Gram matrisleri (E^T E)
+        k = len(self.model_names)
+        self._gram = {regime: np.zeros((k, k)) for regime in self.params.ENSEMBLE_WEIGHTS}
+        self._counts = {regime: 0.0 for regime in self.params.ENSEMBLE_WEIGHTS}
+
+    @staticmethod
+    def _solve_simplex(errors_factor):
+        """min ||A w||  (w >= 0, sum(w) = 1) problemini NNLS ile çöz
+
+        Toplam kısıtı, büyük ağırlıklı bir birler satırı eklenerek uygulanır.
+        """
+        k = errors_factor.shape[1]
+        scale = np.linalg.norm(errors_factor) / np.sqrt(max(errors_factor.shape[0], 1))
+        lam = 1e3 * (scale + 1e-12)
+
+        A = np.vstack([errors_factor, np.full((1, k), lam)])
+        b = np.zeros(A.shape[0])
+        b[-1] = lam
+
+        w, _ = nnls(A, b)
+        total = w.sum()
+        if total <= 0:
+            return np.full(k, 1.0 / k)
+        return w / total
+
+    def build_dataset(self, df, step_ahead=None):
+        """Cache'den (tahminler, gerçekleşen fiyat, rejim) dizilerini oluştur"""
+        step_ahead = step_ahead or self.config.STEP_AHEAD
+
+        df = df.sort_values('timestamp').drop_duplicates('timestamp', keep='last')
+        timestamps = df['timestamp'].to_numpy(dtype=np.int64)
+        closes = df['close'].to_numpy(dtype=float)
+
+        # STEP_AHEAD dakika sonraki kapanışı zaman damgası üzerinden eşle
+        target_ts = timestamps + step_ahead * 60
+        idx = np.searchsorted(timestamps, target_ts)
+        idx_clipped = np.minimum(idx, len(timestamps) - 1)
+        matched = (idx < len(timestamps)) & (timestamps[idx_clipped] == target_ts)
+
+        predictions = df[self.model_names].to_numpy(dtype=float)[matched]
+        realized = closes[idx_clipped][matched]
+        regimes = df['regime'].to_numpy(dtype=int)[matched]
+
+        # Eksik tahmin içeren satırları at
+        valid = np.isfinite(predictions).all(axis=1) & np.isfinite(realized)
+        return predictions[valid], realized[valid], regimes[valid]
+
+    def fit(self, predictions, realized, regimes, window=None, step=None):
+        """Rejim bazında kayan pencerelerde ağırlıkları öğren"""
+        window = window or self.params.WEIGHT_FIT_WINDOW
+        step = step or self.params.WEIGHT_FIT_STEP
+
+        weights = {}
+        report = {}
+
+        for regime, static in self.params.ENSEMBLE_WEIGHTS.items():
+            mask = regimes == regime
+            n = int(mask.sum())
+            static_w = np.array([static.get(name, 0.0) for name in self.model_names])
+
+            if n < self.params.WEIGHT_MIN_SAMPLES:
+                self.logger.warning(f"Rejim {regime} için yetersiz örnek: {n}, statik ağırlıklar korunuyor")
+                weights[regime] = dict(zip(self.model_names, static_w.tolist()))
+                report[regime] = {'samples': n, 'fitted': False}
+                continue
+
+            # Hata matrisi: her modelin tahmininden gerçekleşen fiyatın farkı
+            errors = predictions[mask] - realized[mask][:, None]
+
+            w_len = min(window, n)
+            starts = np.arange(0, n - w_len + 1, step) if n > w_len else np.array([0])
+            window_weights = np.array([self._solve_simplex(errors[s:s + w_len]) for s in starts])
+
+            # Pencere dışı (bir sonraki pencere) MAE karşılaştırması
+            oos_fitted, oos_static = [], []
+            for s, w in zip(starts[:-1], window_weights[:-1]):
+                nxt = errors[s + w_len:s + w_len + step]
+                if len(nxt) == 0:
+                    continue
+                oos_fitted.append(np.abs(nxt @ w).mean())
+                oos_static.append(np.abs(nxt @ (static_w / max(static_w.sum(), 1e-12))).mean())
+
+            # Son pencerelere daha fazla ağırlık veren ortalama
+            decay = np.linspace(0.5, 1.0, len(window_weights))
+            final_w = (window_weights * decay[:, None]).sum(axis=0)
+            final_w /= final_w.sum()
+
+            weights[regime] = dict(zip(self.model_names, np.round(final_w, 6).tolist()))
+            report[regime] = {
+                'samples': n,
+                'fitted': True,
+                'windows': int(len(starts)),
+                'in_sample_mae': float(np.abs(errors @ final_w).mean()),
+                'static_mae': float(np.abs(errors @ (static_w / max(static_w.sum(), 1e-12))).mean()),
+                'oos_mae': float(np.mean(oos_fitted)) if oos_fitted else None,
+                'oos_static_mae': float(np.mean(oos_static)) if oos_static else None,
+            }
+            self.logger.info(f"Rejim {regime} ağırlıkları: {weights[regime]}")
+
+        return weights, report
+
+    def partial_fit(self, regime, model_predictions, realized_price):
+        """Online mod: tek gözlemle rejimin hata istatistiklerini güncelle"""
+        if regime not in self._gram:
+            return
+        e = np.array([model_predictions.get(name, np.nan) for name in self.model_names]) - realized_price
+        if not np.isfinite(e).all():
+            return
+
+        decay = self.params.ONLINE_WEIGHT_DECAY
+        self._gram[regime] = decay * self._gram[regime] + np.outer(e, e)
+        self._counts[regime] = decay * self._counts[regime] + 1.0
+
+    def online_weights(self, regime):
+        """Online istatistiklerden güncel ağırlıkları çöz"""
+        if self._counts.get(regime, 0) < self.params.WEIGHT_MIN_SAMPLES:
+            return None
+        gram = self._gram[regime]
+        k = gram.shape[0]
+        # ||E w||^2 = w^T G w = ||L^T w||^2
+        L = np.linalg.cholesky(gram + 1e-12 * (np.trace(gram) + 1.0) * np.eye(k))
+        w = self._solve_simplex(L.T)
+        return dict(zip(self.model_names, w.tolist()))
+
+    def save(self, weights, path=None, report=None):
+        """Ağırlıkları EnsemblePredictor'ın okuyacağı dosyaya yaz"""
+        path = path or self.config.ENSEMBLE_WEIGHTS_PATH
+        directory = os.path.dirname(path)
+        if directory:
+            ensure_directory(directory)
+
+        payload = {
+            'version': 1,
+            'created': datetime.now().isoformat(),
+            'step_ahead': self.config.STEP_AHEAD,
+            'models': self.model_names,
+            'weights': {str(regime): w for regime, w in weights.items()},
+            'report': {str(regime): r for regime, r in (report or {}).items()},
+        }
+        tmp_path = path + '.tmp'
+        save_json(payload, tmp_path)
+        os.replace(tmp_path, path)
+        self.logger.info(f"Ensemble ağırlıkları kaydedildi: {path}")
+
+
+def load_weights_file(path, default_weights):
+    """Ağırlık dosyasını oku, eksik rejimler için varsayılanı kullan"""
+    payload = load_json(path)
+    weights = {regime: dict(w) for regime, w in default_weights.items()}
+
+    for regime, w in payload.get('weights', {}).items():
+        regime = int(regime)
+        if regime in weights and all(v >= 0 for v in w.values()):
+            weights[regime] = {name: float(v) for name, v in w.items()}
+
+    return weights
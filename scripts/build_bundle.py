@@ -0,0 +1,54 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.loader import get_config
+from models.artifact_bundle import build_bundle, check_bundle
+from models.weight_optimizer import load_weights_file
+
+
+def parse_args():
+    """Komut satırı argümanları"""
+    config = get_config()
+    parser = argparse.ArgumentParser(description="Artifact paketi oluştur")
+    parser.add_argument('--output', default=config.ARTIFACT_BUNDLE_PATH, help="Paket dizini")
+    parser.add_argument('--version', default=None, help="Paket sürümü (varsayılan: zaman damgası)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = get_config()
+
+    print("📦 Artifact Paketi Oluşturma")
+    print("=" * 50)
+
+    # Öğrenilmiş ağırlık dosyası varsa pakete onu koy
+    weights = config.ENSEMBLE_WEIGHTS
+    if os.path.exists(config.ENSEMBLE_WEIGHTS_PATH):
+        weights = load_weights_file(config.ENSEMBLE_WEIGHTS_PATH, weights)
+        print(f"✓ Ağırlıklar: {config.ENSEMBLE_WEIGHTS_PATH}")
+    else:
+        print("✓ Ağırlıklar: ENSEMBLE_WEIGHTS (konfigürasyon)")
+
+    weights = {regime: dict(w) for regime, w in weights.items()}
+    manifest = build_bundle(args.output, version=args.version, weights=weights, config=config)
+    print(f"✓ {len(manifest['files'])} dosya paketlendi (v{manifest['bundle_version']})")
+
+    _, errors = check_bundle(args.output, config=config)
+    for error in errors:
+        print(f"❌ {error}")
+
+    if errors:
+        return False
+
+    print(f"\n✅ Paket hazır: {args.output}")
+    print("Doğrulamak için: python main.py --check")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
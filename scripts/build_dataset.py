@@ -0,0 +1,76 @@
+import sys
+import os
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.loader import load_config, set_config, ConfigError
+
+
+def parse_args():
+    """Komut satırı argümanları"""
+    parser = argparse.ArgumentParser(description="Saklanan geçmişten canlı feature koduyla eğitim veri seti üret")
+    parser.add_argument('history', help="Dakikalık barlar: .csv/.parquet ('time' unix saniye) veya API kaydı .jsonl")
+    parser.add_argument('--output', default=None, help="Veri seti dizini (varsayılan: DATASET_PATH)")
+    parser.add_argument('--chunk', type=int, default=None, help="Parça başına örnek (varsayılan: DATASET_CHUNK_SAMPLES)")
+    parser.add_argument('--verify', type=int, default=20,
+                        help="Canlı yolla karşılaştırılacak rastgele örnek sayısı (0: karşılaştırma yok)")
+    parser.add_argument('--tolerance', type=float, default=1e-3, help="Ölçeklenmiş birimde izin verilen en büyük fark")
+    parser.add_argument('--profile', default=None, help="config/profiles altındaki profil adı")
+    parser.add_argument('--config', default=None, help="TOML/YAML/JSON konfigürasyon dosyası")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    try:
+        config = load_config(profile=args.profile, path=args.config)
+    except ConfigError as e:
+        print(f"❌ Konfigürasyon hatası: {e}")
+        return False
+    set_config(config)
+
+    from data.dataset_builder import DatasetBuilder, load_history
+
+    print("🧱 Eğitim Veri Seti Oluşturma")
+    print("=" * 50)
+
+    if not os.path.exists(args.history):
+        print(f"❌ Geçmiş dosyası bulunamadı: {args.history}")
+        return False
+
+    history = load_history(args.history)
+    print(f"✓ {len(history)} bar okundu: {history.index[0]} - {history.index[-1]}")
+
+    output = args.output or config.DATASET_PATH
+    builder = DatasetBuilder(config)
+    started = time.perf_counter()
+    try:
+        meta = builder.build(history, output, chunk_samples=args.chunk, source=os.path.abspath(args.history))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    elapsed = time.perf_counter() - started
+
+    stats = meta['stats']
+    print(f"✓ {meta['samples']} örnek ({elapsed:.1f} sn, {stats['chunks']} parça)")
+    print(f"   X: ({meta['samples']}, {meta['look_back']}, {len(meta['features'])})  y: {meta['step_ahead']} dakika ilerisi")
+    print(f"   NaN satır nedeniyle kaydırılan: {stats['shifted']}, atılan: {stats['dropped']}")
+
+    if args.verify > 0:
+        max_diff = builder.verify(history, output, samples=args.verify)
+        print(f"✓ Canlı yol karşılaştırması: {args.verify} örnek, en büyük fark {max_diff:.2e}")
+        if max_diff > args.tolerance:
+            print(f"❌ Eğitim/canlı feature farkı toleransı aşıyor ({args.tolerance})")
+            return False
+
+    print(f"\n✅ Veri seti hazır: {output}")
+    print("Yeni scaler'lar: scaler_X.pkl, scaler_y.pkl (SCALER_X_PATH/SCALER_Y_PATH ile kullanılabilir)")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,70 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from config.loader import get_config
+from models.weight_optimizer import EnsembleWeightOptimizer
+from utils.market_analyzer import label_regimes
+
+
+def parse_args():
+    """Komut satırı argümanları"""
+    config = get_config()
+    parser = argparse.ArgumentParser(description="Rejim bazlı ensemble ağırlık optimizasyonu")
+    parser.add_argument('--cache', default=config.PREDICTION_CACHE_PATH, help="Model tahmin cache dosyası")
+    parser.add_argument('--output', default=config.ENSEMBLE_WEIGHTS_PATH, help="Ağırlık dosyası")
+    parser.add_argument('--window', type=int, default=None, help="Kayan pencere uzunluğu")
+    parser.add_argument('--step', type=int, default=None, help="Pencere kayma adımı")
+    parser.add_argument('--relabel', action='store_true',
+                        help="Rejimleri cache'teki kapanışlardan güncel histerezis ayarlarıyla yeniden etiketle")
+    parser.add_argument('--dry-run', action='store_true', help="Dosyaya yazmadan sonuçları göster")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("⚖️  Ensemble Ağırlık Optimizasyonu")
+    print("=" * 50)
+
+    if not os.path.exists(args.cache):
+        print(f"❌ Tahmin cache dosyası bulunamadı: {args.cache}")
+        return False
+
+    optimizer = EnsembleWeightOptimizer()
+    cache_df = pd.read_csv(args.cache)
+    if args.relabel:
+        cache_df = cache_df.sort_values('timestamp').drop_duplicates('timestamp', keep='last')
+        cache_df['regime'] = label_regimes(cache_df)
+        print(f"✓ Rejimler yeniden etiketlendi: {cache_df['regime'].value_counts().sort_index().to_dict()}")
+    predictions, realized, regimes = optimizer.build_dataset(cache_df)
+    print(f"✓ {len(cache_df)} kayıt okundu, {len(realized)} eşleşmiş örnek")
+
+    weights, report = optimizer.fit(predictions, realized, regimes, window=args.window, step=args.step)
+
+    for regime, w in weights.items():
+        info = report[regime]
+        print(f"\nRejim {regime} ({info['samples']} örnek)")
+        for name, value in w.items():
+            print(f"   {name:18s} {value:.4f}")
+        if info.get('fitted'):
+            print(f"   MAE: {info['in_sample_mae']:.6f} (statik: {info['static_mae']:.6f})")
+            if info['oos_mae'] is not None:
+                print(f"   Pencere dışı MAE: {info['oos_mae']:.6f} (statik: {info['oos_static_mae']:.6f})")
+
+    if args.dry_run:
+        print("\nℹ️  Dry-run: dosya yazılmadı")
+    else:
+        optimizer.save(weights, path=args.output, report=report)
+        print(f"\n✅ Ağırlıklar kaydedildi: {args.output}")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,145 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from config.loader import load_config, set_config, ConfigError
+from data.data_processor import DataProcessor
+from models.model_loader import ModelLoader
+from models.quantization import (
+    QuantizationReport, TFLiteModel, benchmark_latency, compiled_call, convert_model, predict_windows, variant_path
+)
+from utils.memory_guard import current_rss_mb
+from utils.helpers import ensure_directory, save_json
+
+
+def parse_args():
+    """Komut satırı argümanları"""
+    parser = argparse.ArgumentParser(description="Float16/int8 model varyantları ve doğruluk-gecikme raporu")
+    parser.add_argument('--precisions', nargs='+', default=['int8', 'float16'], choices=['int8', 'float16'])
+    parser.add_argument('--windows', default=None,
+                        help="Ölçeklenmiş test pencereleri (.npy, şekil: N x LOOK_BACK x FEATURES)")
+    parser.add_argument('--samples', type=int, default=256, help="--windows yoksa sentetik pencere sayısı")
+    parser.add_argument('--runs', type=int, default=50, help="Gecikme ölçümü tekrar sayısı")
+    parser.add_argument('--skip-convert', action='store_true', help="Var olan varyantları kullan")
+    parser.add_argument('--profile', default=None, help="config/profiles altındaki profil adı")
+    parser.add_argument('--config', default=None, help="TOML/YAML/JSON konfigürasyon dosyası")
+    return parser.parse_args()
+
+
+def load_windows(args, config):
+    """Değerlendirme pencerelerini yükle"""
+    if args.windows:
+        windows = np.load(args.windows, mmap_mode='r')
+        print(f"✓ Test pencereleri: {args.windows} {windows.shape}")
+        return np.asarray(windows, dtype=np.float32), args.windows
+
+    # Ölçeklenmiş uzayda girdiler ~N(0, 1); gerçek veri yoksa yaklaşık bir set
+    rng = np.random.default_rng(42)
+    windows = rng.standard_normal((args.samples, config.LOOK_BACK, config.FEATURES)).astype(np.float32)
+    print(f"⚠️  --windows verilmedi, {args.samples} sentetik pencere kullanılıyor")
+    return windows, 'synthetic'
+
+
+def main():
+    args = parse_args()
+
+    try:
+        config = load_config(profile=args.profile, path=args.config)
+    except ConfigError as e:
+        print(f"❌ Konfigürasyon hatası: {e}")
+        return False
+    set_config(config)
+
+    import tensorflow as tf
+
+    print("🗜️  Model Niceleme ve Kıyaslama")
+    print("=" * 50)
+
+    ensure_directory(config.QUANTIZED_MODEL_DIR)
+    windows, windows_source = load_windows(args, config)
+    sample = windows[:1]
+    scaler_y = DataProcessor(config).scaler_y
+    reporter = QuantizationReport(config)
+
+    report = {'windows': windows_source, 'n_windows': int(len(windows)), 'models': {}, 'ensemble': {}}
+    reference = {}
+    candidates = {precision: {} for precision in args.precisions}
+
+    # Bot ile aynı dosyalar: artifact paketi varsa paketteki modeller
+    for name, path in ModelLoader(config).get_model_paths().items():
+        try:
+            rss_before = current_rss_mb()
+            keras_model = tf.keras.models.load_model(path)
+            rss_keras = current_rss_mb() - rss_before
+        except Exception as e:
+            print(f"❌ {name} yüklenemedi: {e}")
+            continue
+
+        reference[name] = predict_windows(keras_model, windows)
+        entry = {
+            'float32': {
+                'size_kb': os.path.getsize(path) / 1024,
+                'rss_delta_mb': rss_keras,
+                # Canlı yoldaki gibi derlenmiş grafik (model.predict() adaptör yükü ölçülmez)
+                **benchmark_latency(compiled_call(keras_model, config), sample, runs=args.runs),
+            }
+        }
+
+        for precision in args.precisions:
+            out_path = variant_path(name, precision, config)
+            try:
+                if not args.skip_convert or not os.path.exists(out_path):
+                    with open(out_path, 'wb') as f:
+                        f.write(convert_model(keras_model, precision))
+
+                rss_before = current_rss_mb()
+                variant = TFLiteModel(out_path, num_threads=config.TFLITE_NUM_THREADS)
+                rss_variant = current_rss_mb() - rss_before
+
+                candidates[precision][name] = predict_windows(variant, windows)
+                entry[precision] = {
+                    'path': out_path,
+                    'size_kb': os.path.getsize(out_path) / 1024,
+                    'rss_delta_mb': rss_variant,
+                    **benchmark_latency(variant.predict, sample, runs=args.runs),
+                    **reporter.compare(reference[name], candidates[precision][name], scaler_y),
+                }
+            except Exception as e:
+                print(f"❌ {name} {precision} dönüştürülemedi: {e}")
+
+        report['models'][name] = entry
+
+        print(f"\n{name}")
+        for precision, info in entry.items():
+            line = f"   {precision:8s} {info['size_kb']:8.1f} KB  p50 {info['p50_ms']:7.2f} ms  p95 {info['p95_ms']:7.2f} ms"
+            if 'mae_price' in info:
+                line += f"  MAE(fiyat) {info['mae_price']:.6f}"
+            print(line)
+
+    # Ensemble: tüm modeller aynı hassasiyetteyken float32 ensemble'a göre sapma
+    for precision, preds in candidates.items():
+        model_order = [name for name in config.MODEL_ORDER if name in preds and name in reference]
+        if not model_order:
+            continue
+        report['ensemble'][precision] = reporter.ensemble_comparison(reference, preds, model_order)
+
+    report_path = os.path.join(config.QUANTIZED_MODEL_DIR, 'report.json')
+    save_json(report, report_path)
+
+    print("\nEnsemble sapması (ölçekli, rejim bazında MAE):")
+    for precision, regimes in report['ensemble'].items():
+        summary = ", ".join(f"{regime}: {info['mae_scaled']:.5f}" for regime, info in regimes.items())
+        print(f"   {precision:8s} {summary}")
+
+    print(f"\n✅ Rapor kaydedildi: {report_path}")
+    print("Varyant seçmek için: MODEL_PRECISION = {'lstm': 'int8', ...}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,236 @@
+import sys
+import os
+import io
+import time
+import logging
+import argparse
+import tempfile
+import contextlib
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from config.loader import load_config, set_config, ConfigError
+from utils.helpers import ensure_directory, save_json
+from utils.memory_guard import current_rss_mb
+from utils.replay import BarTape, ReplayServer, SimulatedClock
+
+
+def parse_args():
+    """Komut satırı argümanları"""
+    parser = argparse.ArgumentParser(description="Kayıtlı oturumu yerel API taklidiyle hızlandırılmış tekrar oynat (soak testi)")
+    parser.add_argument('--recording', default=None, help="API_RECORD_PATH ile kaydedilmiş JSONL dosyası")
+    parser.add_argument('--synthetic-minutes', type=int, default=2000, help="--recording yoksa sentetik bar sayısı")
+    parser.add_argument('--minutes', type=int, default=None, help="Simüle edilecek dakika sayısı (varsayılan: bandın tamamı)")
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help="Hızlandırma katsayısı (ör. 600: 1 dakika = 0.1 sn); 0 = olabildiğince hızlı")
+    parser.add_argument('--profile', default=None, help="config/profiles altındaki profil adı")
+    parser.add_argument('--config', default=None, help="TOML/YAML/JSON konfigürasyon dosyası")
+    parser.add_argument('--output', default=None, help="Rapor ve çalışma dosyalarının dizini (varsayılan: geçici dizin)")
+    parser.add_argument('--speculative', action='store_true', help="Spekülatif ön hesaplamayı aç (45. saniyede geçici bar)")
+    parser.add_argument('--provisional-noise', type=float, default=0.0002,
+                        help="Geçici barın kapanış barından göreli sapması (standart sapma)")
+    parser.add_argument('--verbose', action='store_true', help="Botun terminal çıktısını göster")
+    return parser.parse_args()
+
+
+class ErrorCounter(logging.Handler):
+    """ERROR ve üzeri log kayıtlarını say"""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+        self.last = None
+
+    def emit(self, record):
+        self.count += 1
+        self.last = record.getMessage()
+
+
+def percentiles(values):
+    """p50/p95/p99/max (ms)"""
+    if len(values) == 0:
+        return {}
+    values = np.asarray(values, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99), 'max_ms': float(values.max())}
+
+
+def memory_growth(minutes, rss):
+    """RSS örneklerinden 1000 dakika başına büyüme (MB, doğrusal eğim)"""
+    if len(minutes) < 2:
+        return 0.0
+    slope = np.polyfit(np.asarray(minutes, dtype=np.float64), np.asarray(rss, dtype=np.float64), 1)[0]
+    return float(slope * 1000)
+
+
+def main():
+    args = parse_args()
+
+    try:
+        config = load_config(profile=args.profile, path=args.config)
+    except ConfigError as e:
+        print(f"❌ Konfigürasyon hatası: {e}")
+        return False
+
+    print("🔁 Replay / Soak Testi")
+    print("=" * 50)
+
+    if args.recording:
+        tape = BarTape.from_recording(args.recording)
+        print(f"✓ Kayıt: {args.recording} ({len(tape)} bar)")
+    else:
+        tape = BarTape.synthetic(args.synthetic_minutes)
+        print(f"⚠️  --recording verilmedi, {len(tape)} sentetik bar kullanılıyor")
+
+    warmup = 180  # _initialize_data'nın çektiği pencere
+    if len(tape) <= warmup:
+        print(f"❌ Bant çok kısa: {len(tape)} bar (en az {warmup + 1} gerekli)")
+        return False
+    minutes = min(args.minutes or len(tape) - warmup, len(tape) - warmup)
+
+    output_dir = args.output or tempfile.mkdtemp(prefix='soak_')
+    ensure_directory(output_dir)
+
+    server = ReplayServer(tape, provisional_noise=args.provisional_noise).start()
+    # Bot canlı dosyalara dokunmasın: API, ledger, cache, feature cache ve kontrol noktası yolları soak dizinine
+    config = config.replace(
+        API_BASE_URL=server.base_url,
+        API_RECORD_PATH='',
+        LEDGER_PATH=os.path.join(output_dir, 'trades.bin'),
+        PREDICTION_CACHE_PATH=os.path.join(output_dir, 'model_predictions.csv'),
+        SHADOW_LOG_PATH=os.path.join(output_dir, 'shadow_predictions.csv'),
+        FEATURE_CACHE_PATH=os.path.join(output_dir, 'features'),
+        CHECKPOINT_PATH=os.path.join(output_dir, 'state.npz'),
+        SPECULATIVE_ENABLED=args.speculative or config.SPECULATIVE_ENABLED,
+    )
+    set_config(config)
+
+    from data.api_client import APIClient
+    from main import TradingBot
+
+    # Saat her dakika barın 59. saniyesinde durur (canlı döngüyle aynı)
+    clock = SimulatedClock(int(tape.times[warmup - 1]) + 59)
+    server.advance_to(tape.times[warmup - 1])
+
+    errors = ErrorCounter()
+    logging.getLogger().addHandler(errors)
+
+    rss_start = current_rss_mb()
+    bot = TradingBot(config, api_client=APIClient(config, clock=clock))
+    bot._initialize_data()
+    rss_ready = current_rss_mb()
+    print(f"✓ Bot hazır ({rss_ready:.1f} MB RSS, model yükleme +{rss_ready - rss_start:.1f} MB)")
+
+    interval = 60.0 / args.speed if args.speed > 0 else 0.0
+    latencies = np.zeros(minutes)
+    rss_minutes, rss_samples = [], []
+    sample_every = max(1, minutes // 200)
+    sink = None if args.verbose else io.StringIO()
+
+    speculate_ms = np.zeros(minutes)
+
+    def run(step):
+        if sink is None:
+            return step()
+        with contextlib.redirect_stdout(sink):
+            step()
+        sink.seek(0)
+        sink.truncate()
+
+    started = time.perf_counter()
+    for i in range(minutes):
+        bar_ts = int(tape.times[warmup + i])
+        minute_started = time.perf_counter()
+
+        if bot.speculator is not None:
+            # Bar kapanmadan önce geçici barla ön hesaplama (kapanış gecikmesine dahil değil)
+            server.advance_to(bar_ts, provisional=True)
+            clock.set(bar_ts + config.SPECULATIVE_START_SECOND)
+            if bot.speculator.claim(clock.now(), bot.sliding_window.get_last_timestamp()):
+                run(bot._speculate)
+            speculate_ms[i] = (time.perf_counter() - minute_started) * 1000
+
+        server.advance_to(bar_ts)
+        clock.set(bar_ts + 59)
+
+        close_started = time.perf_counter()
+        run(bot._process_minute)
+        latencies[i] = (time.perf_counter() - close_started) * 1000
+
+        if i % sample_every == 0 or i == minutes - 1:
+            rss_minutes.append(i)
+            rss_samples.append(current_rss_mb())
+        if (i + 1) % 500 == 0:
+            print(f"   {i + 1}/{minutes} dakika, RSS {rss_samples[-1]:.1f} MB, hata {errors.count}")
+
+        if interval:
+            remaining = interval - (time.perf_counter() - minute_started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    elapsed = time.perf_counter() - started
+    server.stop()
+    logging.getLogger().removeHandler(errors)
+
+    decisions = bot.decision_log.to_array()
+    report = {
+        'tape': args.recording or 'synthetic',
+        'minutes': minutes,
+        'elapsed_s': elapsed,
+        'minutes_per_s': minutes / elapsed if elapsed > 0 else 0.0,
+        'latency': percentiles(latencies),
+        'stages': {
+            stage: percentiles(decisions[f'{stage}_ms'])
+            for stage in ('predict', 'signal', 'risk')
+        },
+        'memory': {
+            'rss_start_mb': rss_start,
+            'rss_ready_mb': rss_ready,
+            'rss_end_mb': rss_samples[-1],
+            'growth_mb_per_1000_min': memory_growth(rss_minutes, rss_samples),
+            'stages': bot.memory_guard.summary()['stages'],
+        },
+        'speculation': None if bot.speculator is None else {
+            'hits': bot.speculator.hits,
+            'misses': bot.speculator.misses,
+            'precompute': percentiles(speculate_ms),
+        },
+        'api': dict(server.stats),
+        'decisions': int(len(decisions)),
+        'degraded': int((decisions['dropped'] != 0).sum()),
+        'errors': errors.count,
+        'last_error': errors.last,
+    }
+
+    report_path = os.path.join(output_dir, 'soak_report.json')
+    save_json(report, report_path)
+
+    latency = report['latency']
+    print(f"\nDakika: {minutes} ({report['minutes_per_s']:.1f} dakika/sn, {elapsed:.1f} sn)")
+    print(f"Gecikme: p50 {latency['p50_ms']:.1f} ms  p95 {latency['p95_ms']:.1f} ms  "
+          f"p99 {latency['p99_ms']:.1f} ms  max {latency['max_ms']:.1f} ms")
+    for stage, info in report['stages'].items():
+        if info:
+            print(f"   {stage:8s} p50 {info['p50_ms']:.2f} ms  p95 {info['p95_ms']:.2f} ms")
+    memory = report['memory']
+    print(f"Bellek: {memory['rss_ready_mb']:.1f} -> {memory['rss_end_mb']:.1f} MB "
+          f"({memory['growth_mb_per_1000_min']:+.2f} MB / 1000 dakika)")
+    if report['speculation']:
+        speculation = report['speculation']
+        print(f"Spekülatif: {speculation['hits']} isabet, {speculation['misses']} ıska, "
+              f"ön hesaplama p50 {speculation['precompute']['p50_ms']:.1f} ms")
+    if report['degraded']:
+        print(f"Bozulmuş ensemble: {report['degraded']}/{report['decisions']} karar (süre sınırında düşen model)")
+    print(f"API: {server.stats['getinterval']} getinterval, {server.stats['predictions']} tahmin")
+    print(f"Hata: {errors.count}" + (f" (son: {errors.last})" if errors.last else ""))
+    print(f"\n✅ Rapor kaydedildi: {report_path}")
+
+    # Her dakika bir tahmin gönderilmiş olmalı
+    return errors.count == 0 and server.stats['predictions'] == minutes
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -10,10 +10,31 @@ from datetime import datetime, timedelta
 # Test imports
 from data.api_client import APIClient
 from data.sliding_window import SlidingWindow
+from data.data_quality import DataQualityGate
 from data.data_processor import DataProcessor
 from models.ensemble import EnsemblePredictor
-from utils.market_analyzer import MarketAnalyzer
+from models.deadline import DeadlineRunner
+from models.shadow import ShadowEvaluator
+from utils.market_analyzer import MarketAnalyzer, RegimeTracker, label_regimes
 from trading.signal_generator import SignalGenerator
+from models.weight_optimizer import EnsembleWeightOptimizer
+from trading.ledger import TradeLedger
+from trading.position_manager import PositionManager
+from trading.position_sizing import PositionSizer
+from trading.decision import SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD, REASON_PAUSED, DecisionRecord, DecisionLog
+from trading.risk_manager import RiskManager
+from trading.filter_trace import FilterTrace
+from utils.memory_guard import MemoryGuard
+from utils.prediction_monitor import PredictionMonitor
+from utils.profiler import Profiler
+from utils.admin_server import AdminServer
+from utils.checkpoint import Checkpointer
+from utils.speculation import SpeculativePipeline
+from utils.async_runtime import AsyncRuntime
+from data.dataset_builder import DatasetBuilder, RunningMoments
+from data.feature_cache import FeatureCache
+from data.resampler import BarAggregator, MultiTimeframeFeed
+from utils.replay import ApiRecorder, BarTape, ReplayServer, SimulatedClock
 
 
 def test_api_client():
@@ -56,6 +77,45 @@ def test_sliding_window():
         return False
 
 
+def test_data_quality():
+    """Veri Kalite Kontrolü testi"""
+    print("🩺 Veri Kalite Kontrolü testi...")
+    try:
+        gate = DataQualityGate()
+        start = datetime(2024, 1, 1)
+        rows = []
+        for i in range(10):
+            if i in (3, 4):
+                continue  # Eksik barlar
+            rows.append({
+                'timestamp': start + timedelta(minutes=i),
+                'open': 100, 'high': 101, 'low': 99, 'close': 100 + i, 'volumeTo': 1000
+            })
+        df = pd.DataFrame(rows).set_index('timestamp')
+        df['close'] = df['close'].astype(object)
+        df.iloc[1, df.columns.get_loc('close')] = 'n/a'  # Sayısal olmayan alan
+
+        repaired = gate.repair_window(df)
+        stats = gate.get_stats()
+
+        assert len(repaired) == 10, f"Boşluklar doldurulamadı: {len(repaired)} != 10"
+        assert repaired.index.is_monotonic_increasing, "Sıralama hatası"
+        assert stats['non_numeric'] == 1 and stats['gaps_forward_filled'] == 3, f"Sayaç hatası: {stats}"
+
+        # Eski ve tekrar eden barlar atılmalı
+        new_bars = pd.DataFrame(
+            [{'open': 1, 'high': 1, 'low': 1, 'close': 1, 'volumeTo': 1}] * 2,
+            index=pd.DatetimeIndex([repaired.index[-1], repaired.index[-1]])
+        )
+        processed = gate.process(new_bars, repaired.index[-1], repaired['close'].iloc[-1])
+        assert len(processed) == 0, "Eski bar kabul edildi"
+        print("✓ Veri Kalite Kontrolü testi başarılı")
+        return True
+    except Exception as e:
+        print(f"❌ Veri Kalite Kontrolü hatası: {e}")
+        return False
+
+
 def test_data_processor():
     """Data Processor testi"""
     print("⚙️ Data Processor testi...")
@@ -75,6 +135,12 @@ def test_data_processor():
         processor = DataProcessor()
         features_df = processor.calculate_features(df)
 
+        # Son bar feature'larda yer almalı (hedef kaydırması yok)
+        assert features_df.index[-1] == df.index[-1], "Son bar feature'lardan düştü"
+        # Vektörel kayan eğim np.polyfit ile aynı olmalı
+        expected_slope = np.polyfit(np.arange(60), df['close'].to_numpy()[-60:], 1)[0]
+        assert np.isclose(features_df['close_slope_60'].iloc[-1], expected_slope), "Eğim farkı"
+
         print(f"✓ Feature hesaplama başarılı: {len(features_df)} satır")
         return True
     except Exception as e:
@@ -82,6 +148,1229 @@ def test_data_processor():
         return False
 
 
+def test_calendar_table():
+    """Takvim tablosu testi: ns, ns dışı ve saat dilimli index'lerde eski trigonometrik formüllerle aynı olmalı"""
+    print("📅 Takvim Tablosu testi...")
+    try:
+        from data.time_features import get_calendar_table
+
+        calendar = get_calendar_table()
+        base = pd.date_range('2024-01-05 21:00', periods=3 * 1440, freq='min')  # Cuma -> Pazar -> Pazartesi
+        indexes = {
+            'ns': base,
+            's': base.as_unit('s'),
+            'ms': base.as_unit('ms'),
+            'tz': base.tz_localize('UTC').tz_convert('Europe/Istanbul'),
+        }
+        for name, index in indexes.items():
+            h = index.hour + index.minute / 60
+            wd = index.weekday
+            expected = {
+                'hour_sin': np.sin(2 * np.pi * h / 24),
+                'hour_cos': np.cos(2 * np.pi * h / 24),
+                'dow_sin': np.sin(2 * np.pi * wd / 7),
+                'dow_cos': np.cos(2 * np.pi * wd / 7),
+                'is_weekend': (wd >= 5).astype(float),
+            }
+            features = calendar.features_for_index(index)
+            for column, values in expected.items():
+                assert np.allclose(features[column], values), f"{name} index: {column} farklı"
+
+        print(f"✓ Takvim Tablosu testi başarılı: {', '.join(indexes)}")
+        return True
+    except Exception as e:
+        print(f"❌ Takvim Tablosu hatası: {e}")
+        return False
+
+
+def test_weight_optimizer():
+    """Ağırlık optimizasyonu testi"""
+    print("⚖️ Ağırlık Optimizasyonu testi...")
+    try:
+        optimizer = EnsembleWeightOptimizer()
+        n = 500
+        realized = np.random.uniform(100, 110, n)
+        # İlk model en az hatalı, son model en çok hatalı
+        noise = np.array([0.1, 0.5, 1.0, 2.0, 4.0])
+        predictions = realized[:, None] + np.random.normal(0, 1, (n, 5)) * noise
+        regimes = np.ones(n, dtype=int)
+
+        weights, report = optimizer.fit(predictions, realized, regimes, window=200, step=100)
+        w = np.array(list(weights[1].values()))
+
+        assert abs(w.sum() - 1) < 1e-4, f"Ağırlık toplamı hatası: {w.sum()}"
+        assert (w >= 0).all(), "Negatif ağırlık"
+        assert w.argmax() == 0, f"En iyi model seçilemedi: {weights[1]}"
+        assert report[1]['in_sample_mae'] <= report[1]['static_mae'], "Öğrenilmiş ağırlıklar statikten kötü"
+        print("✓ Ağırlık Optimizasyonu testi başarılı")
+        return True
+    except Exception as e:
+        print(f"❌ Ağırlık Optimizasyonu hatası: {e}")
+        return False
+
+
+def test_shadow_evaluator():
+    """Gölge değerlendirme testi: submit bloklamamalı, en eski istek atılmalı, skorlar gerçekleşen fiyatla eşleşmeli"""
+    print("👥 Gölge Değerlendirme testi...")
+    try:
+        import time
+        import tempfile
+        import threading
+        from config.loader import get_config
+
+        entered, release = threading.Event(), threading.Event()
+
+        class Output:
+            def __init__(self, value):
+                self.value = value
+
+            def numpy(self):
+                return np.array([[self.value]])
+
+        def candidate(model_input, training=False):
+            entered.set()
+            release.wait(5)
+            return Output(99.0)
+
+        class StubShadow(ShadowEvaluator):
+            def _load_models(self):
+                self.models = {'candidate': candidate}
+
+        processor = type('Processor', (), {'inverse_transform_prediction': staticmethod(lambda value: value)})()
+        config = get_config().replace(SHADOW_MAX_CPU_SHARE=1.0, STEP_AHEAD=1,
+                                      SHADOW_LOG_PATH=os.path.join(tempfile.mkdtemp(), 'shadow.csv'))
+        shadow = StubShadow(processor, model_paths={'candidate': ''}, config=config)
+
+        # İşçi ilk istekte meşgulken sonraki istekler beklemeden en eskisini düşürür
+        shadow.submit(0, None, 101.0, 100.0)
+        assert entered.wait(5), "İşçi isteği almadı"
+        started = time.perf_counter()
+        for timestamp in (60, 120, 180):
+            shadow.submit(timestamp, None, 101.0, 100.0)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        assert elapsed_ms < 50, f"submit bloklandı: {elapsed_ms:.1f} ms"
+        assert shadow.dropped == 2 and shadow._requests.queue[0][0] == 180, "En eski istek atılmadı"
+
+        release.set()
+        deadline = time.time() + 5
+        while len(shadow._pending) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        # Gerçekleşen fiyat 102: üretim (101) yön doğru, MAE 1; aday (99) yön yanlış, MAE 3
+        shadow.observe_price(60, 102.0)
+        shadow.observe_price(240, 102.0)
+        while shadow.get_scores().get('production', {}).get('samples', 0) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        scores = shadow.get_scores()
+        shadow.stop()
+
+        assert scores['production'] == {'mae': 1.0, 'directional_accuracy': 1.0, 'samples': 2}, scores
+        assert scores['candidate'] == {'mae': 3.0, 'directional_accuracy': 0.0, 'samples': 2}, scores
+        assert not shadow._thread.is_alive(), "İşçi thread durmadı"
+        print(f"✓ Gölge Değerlendirme testi başarılı: submit {elapsed_ms:.2f} ms, {shadow.dropped} istek atıldı")
+        return True
+    except Exception as e:
+        print(f"❌ Gölge Değerlendirme hatası: {e}")
+        return False
+
+
+def test_prediction_monitor():
+    """Canlı doğruluk testi: halka tampon eşleşmesi/süre aşımı, kayan MAE ve yön doğruluğu, drift z-skorları"""
+    print("🎯 Tahmin İzleme testi...")
+    try:
+        from sklearn.preprocessing import StandardScaler
+        from config.loader import get_config
+
+        rng = np.random.default_rng(7)
+        config = get_config().replace(STEP_AHEAD=2, DRIFT_EW_ALPHA=0.1)
+        train = rng.normal(5, 2, (500, 3))
+        scaler = StandardScaler().fit(train)
+        monitor = PredictionMonitor(model_names=['a', 'b'], scaler_X=scaler, window=5, config=config)
+
+        # Canlı döngüdeki sıra: önce gerçekleşen fiyat, sonra yeni tahmin
+        n, horizon = 40, 2
+        closes = 100 + np.cumsum(rng.normal(0, 1, n))
+        preds = closes + rng.normal(0, 1, n)
+        model_a = closes + rng.normal(0, 1, n)
+        model_b = closes + rng.normal(0, 2, n)
+        rows = rng.normal(6, 3, (n, 3))
+        for t in range(n):
+            monitor.observe(t * 60, closes[t])
+            b = model_b[t] if t % 3 else float('nan')  # b bazı dakikalarda tahmin üretmedi
+            monitor.record(t * 60, preds[t], closes[t], {'a': model_a[t], 'b': b}, rows[t])
+
+        # Kaba kuvvet: son 5 değerlendirme (köken t, gerçekleşen t + horizon)
+        origins = np.arange(n - horizon)[-5:]
+        realized = closes[origins + horizon]
+        metrics = monitor.get_metrics()
+        assert metrics['evaluated'] == n - horizon and metrics['expired'] == 0
+        assert np.isclose(metrics['mae'], np.abs(preds[origins] - realized).mean())
+        expected_hits = np.sign(preds[origins] - closes[origins]) == np.sign(realized - closes[origins])
+        assert np.isclose(metrics['directional_accuracy'], expected_hits.mean())
+        assert np.isclose(metrics['model_mae']['a'], np.abs(model_a[origins] - realized).mean())
+        valid = origins[origins % 3 != 0]
+        assert np.isclose(metrics['model_mae']['b'], np.abs(model_b[valid] - closes[valid + horizon]).mean())
+
+        # Drift: eğitim ortalaması/ölçeğine göre üstel ortalamanın z-skoru
+        ew = rows[0].copy()
+        for row in rows[1:]:
+            ew += 0.1 * (row - ew)
+        z, _ = monitor.drift_stats()
+        assert np.allclose(z, (ew - scaler.mean_) / scaler.scale_), "Drift z-skoru farklı"
+        assert np.isclose(metrics['drift_max_z'], np.abs(z).max())
+        assert metrics['drift_worst_feature'] == config.FEATURES_LIST[int(np.argmax(np.abs(z)))]
+
+        # Eşleşmeden üzerine yazılan tahmin süresi dolmuş sayılır, geç gelen fiyat eşleşmez
+        capacity_minutes = monitor.capacity
+        before = monitor.total_evaluated
+        monitor.record(100 * 60, 1.0, 1.0)
+        monitor.record((100 + capacity_minutes) * 60, 1.0, 1.0)
+        monitor.observe((100 + horizon) * 60, 1.0)
+        assert monitor.total_expired == 1 and monitor.total_evaluated == before, "Süre aşımı işlenmedi"
+
+        print(f"✓ Tahmin İzleme testi başarılı: MAE {metrics['mae']:.3f}, max z {metrics['drift_max_z']:.2f}")
+        return True
+    except Exception as e:
+        print(f"❌ Tahmin İzleme hatası: {e}")
+        return False
+
+
+def test_artifact_bundle():
+    """Artifact paketi testi: oluşturma/doğrulama, bozuk dosya, konfigürasyon uyumsuzluğu ve ArrayScaler eşdeğerliği"""
+    print("📦 Artifact Paketi testi...")
+    try:
+        import pickle
+        import tempfile
+        from sklearn.preprocessing import StandardScaler
+        from config.loader import get_config
+        from models.artifact_bundle import build_bundle, check_bundle, get_bundle, BundleError
+
+        tmp = tempfile.mkdtemp()
+        config = get_config()
+        rng = np.random.default_rng(3)
+
+        # Model dosyaları paketlenirken yüklenmez; içerik yeterli
+        model_paths = {}
+        for name in config.MODEL_PATHS:
+            model_paths[name] = os.path.join(tmp, f"{name}.h5")
+            with open(model_paths[name], 'wb') as f:
+                f.write(rng.bytes(256))
+        scalers = {'scaler_X': StandardScaler().fit(rng.normal(3, 2, (200, config.FEATURES))),
+                   'scaler_y': StandardScaler().fit(rng.normal(100, 5, (200, 1)))}
+        for name, scaler in scalers.items():
+            with open(os.path.join(tmp, f"{name}.pkl"), 'wb') as f:
+                pickle.dump(scaler, f)
+
+        bundle_path = os.path.join(tmp, 'bundle')
+        config = config.replace(MODEL_PATHS=model_paths, USE_ARTIFACT_BUNDLE=True, ARTIFACT_BUNDLE_PATH=bundle_path,
+                                SCALER_X_PATH=os.path.join(tmp, 'scaler_X.pkl'),
+                                SCALER_Y_PATH=os.path.join(tmp, 'scaler_y.pkl'))
+        manifest = build_bundle(bundle_path, version='t1', weights={1: {'lstm': 1.0}}, config=config)
+        bundle, errors = check_bundle(bundle_path, config=config)
+        assert errors == [] and bundle.version == 't1' and bundle.weights == {1: {'lstm': 1.0}}, errors
+        assert set(bundle.model_paths()) == set(model_paths)
+
+        # Paketteki düz diziler sklearn StandardScaler ile aynı dönüşümü verir
+        X = rng.normal(3, 2, (50, config.FEATURES))
+        array_scaler = get_bundle(config).load_scaler('scaler_X')
+        assert np.allclose(array_scaler.transform(X), scalers['scaler_X'].transform(X))
+        assert np.allclose(array_scaler.inverse_transform(X), scalers['scaler_X'].inverse_transform(X))
+        y_scaler = bundle.load_scaler('scaler_y')
+        assert np.allclose(y_scaler.inverse_transform([[0.5]]), scalers['scaler_y'].inverse_transform([[0.5]]))
+
+        # Aynı boyutta bozulan dosya checksum ile, kısalan dosya boyutla yakalanır
+        model_file = os.path.join(bundle_path, manifest['models']['lstm'])
+        with open(model_file, 'r+b') as f:
+            f.write(b'\x00' * 8)
+        assert any('Checksum' in e for e in check_bundle(bundle_path, config=config)[1])
+        assert check_bundle(bundle_path, checksums=False, config=config)[1] == []
+        with open(model_file, 'ab') as f:
+            f.write(b'\x00')
+        assert any('Boyut' in e for e in check_bundle(bundle_path, config=config)[1])
+
+        # Yüklemede konfigürasyonla uyumsuz paket sessizce kullanılmaz
+        extra_model = {**model_paths, 'candidate': model_paths['lstm']}
+        for mismatch in ({'LOOK_BACK': 30}, {'STEP_AHEAD': 5},
+                         {'FEATURES_LIST': list(reversed(config.FEATURES_LIST))},
+                         {'MODEL_PATHS': extra_model}):
+            try:
+                get_bundle(config.replace(**mismatch))
+                raise AssertionError(f"Uyumsuz paket kabul edildi: {sorted(mismatch)}")
+            except BundleError:
+                pass
+        assert get_bundle(config.replace(USE_ARTIFACT_BUNDLE=False)) is None
+
+        print(f"✓ Artifact Paketi testi başarılı: {len(manifest['files'])} dosya")
+        return True
+    except Exception as e:
+        print(f"❌ Artifact Paketi hatası: {e}")
+        return False
+
+
+def test_config_loader():
+    """Konfigürasyon testi: varsayılan < profil < ortam önceliği, tip doğrulaması, değiştirilemezlik, ağırlık matrisi"""
+    print("🔧 Konfigürasyon testi...")
+    try:
+        import tempfile
+        from config.loader import load_config, compile_weight_matrix, ConfigError
+        from config.settings import Config
+
+        path = os.path.join(tempfile.mkdtemp(), 'test.toml')
+        with open(path, 'w') as f:
+            f.write('MONITOR_WINDOW = 90\nDRIFT_Z_THRESHOLD = 2.5\nCHECKPOINT_PATH = "state/test.npz"\n')
+        environ = {'METRICTREES_MONITOR_WINDOW': '120', 'METRICTREES_ADMIN_ENABLED': 'yes',
+                   'METRICTREES_TIMEFRAMES': '[5, 15]', 'METRICTREES_ADMIN_HOST': 'localhost', 'OTHER_KEY': 'x'}
+        config = load_config(path=path, environ=environ)
+        assert config.MONITOR_WINDOW == 120, "Ortam değişkeni profili ezmeli"
+        assert config.DRIFT_Z_THRESHOLD == 2.5, "Profil varsayılanı ezmeli"
+        assert config.LOOK_BACK == Config.LOOK_BACK, "Varsayılan kullanılmalı"
+        assert config.ADMIN_ENABLED is True and config.TIMEFRAMES == (5, 15) and config.ADMIN_HOST == 'localhost'
+        assert config.CHECKPOINT_PATH == os.path.join(config.BASE_DIR, 'state', 'test.npz'), "Göreli yol çözülmedi"
+        assert config.PROFILE == 'test.toml'
+
+        # Profil adı ortamdan da seçilebilir
+        production = load_config(environ={'METRICTREES_PROFILE': 'production'})
+        assert production.PROFILE == 'production' and production.USE_ARTIFACT_BUNDLE is True
+
+        # Hatalı değerler başlangıçta reddedilir
+        invalid = [
+            ('LOOK_BACK = "60"', {}),
+            ('NOT_A_KEY = 1', {}),
+            ('', {'METRICTREES_LOOK_BACK': 'sixty'}),
+            ('', {'METRICTREES_STEP_AHEAD': '0'}),
+            ('MIN_POSITION_SIZE = 1e9', {}),
+        ]
+        for content, env in invalid:
+            with open(path, 'w') as f:
+                f.write(content + '\n')
+            try:
+                load_config(path=path, environ=env)
+                raise AssertionError(f"Hatalı konfigürasyon kabul edildi: {content or env}")
+            except ConfigError:
+                pass
+
+        # Değiştirilemezlik: alanlar, iç içe sözlükler ve listeler
+        for mutate in (lambda: setattr(config, 'LOOK_BACK', 1),
+                       lambda: config.ENSEMBLE_WEIGHTS[1].__setitem__('lstm', 9.0),
+                       lambda: config.MODEL_PATHS.__setitem__('x', 'y'),
+                       lambda: config.WEIGHT_MATRIX.__setitem__((1, 0), 9.0)):
+            try:
+                mutate()
+                raise AssertionError("Konfigürasyon değiştirilebildi")
+            except (AttributeError, TypeError, ValueError):
+                pass
+        assert isinstance(config.FEATURES_LIST, tuple)
+        changed = config.replace(MONITOR_WINDOW=30)
+        assert changed.MONITOR_WINDOW == 30 and config.MONITOR_WINDOW == 120
+
+        # Ağırlık matrisi sütunları MODEL_ORDER sırasıyla hizalı; model sırası değişince sütunlar da değişir
+        for order in (config.MODEL_ORDER, tuple(reversed(config.MODEL_ORDER))):
+            reordered = config.replace(MODEL_PATHS={name: config.MODEL_PATHS[name] for name in order})
+            assert reordered.MODEL_ORDER == order
+            for regime, weights in reordered.ENSEMBLE_WEIGHTS.items():
+                expected = [weights.get(name, 0.0) for name in order]
+                assert np.array_equal(reordered.WEIGHT_MATRIX[regime], expected), f"Rejim {regime} hizalı değil"
+        matrix = compile_weight_matrix({3: {'b': 0.5}}, ('a', 'b'))
+        assert matrix.shape == (4, 2) and matrix[3, 1] == 0.5 and not matrix[:3].any()
+
+        print(f"✓ Konfigürasyon testi başarılı: {len(config.as_dict())} alan")
+        return True
+    except Exception as e:
+        print(f"❌ Konfigürasyon hatası: {e}")
+        return False
+
+
+def test_quantization():
+    """Niceleme testi: TFLite varyantları Keras'a yakın olmalı, varyant yoksa float32'ye dönülmeli"""
+    print("🗜️  Model Niceleme testi...")
+    try:
+        import tempfile
+        import tensorflow as tf
+        from config.loader import get_config
+        from models.model_loader import ModelLoader
+        from models.quantization import TFLiteModel, benchmark_latency, compiled_call, convert_model, variant_path
+
+        tmp = tempfile.mkdtemp()
+        config = get_config()
+        tf.keras.utils.set_random_seed(0)
+        keras_model = tf.keras.Sequential([
+            tf.keras.layers.Input((config.LOOK_BACK, config.FEATURES)),
+            tf.keras.layers.Flatten(),
+            tf.keras.layers.Dense(8, activation='relu'),
+            tf.keras.layers.Dense(1),
+        ])
+        keras_path = os.path.join(tmp, 'tiny.h5')
+        keras_model.save(keras_path)
+
+        config = config.replace(USE_ARTIFACT_BUNDLE=False, QUANTIZED_MODEL_DIR=tmp,
+                                MODEL_PATHS={name: keras_path for name in config.MODEL_PATHS},
+                                MODEL_PRECISION={'lstm': 'int8'})
+        windows = np.random.default_rng(0).standard_normal((16, config.LOOK_BACK, config.FEATURES)).astype(np.float32)
+        reference = keras_model(windows, training=False).numpy()
+
+        # Varyant dosyası yokken int8 istenen model float32 Keras olarak yüklenir
+        loader = ModelLoader(config)
+        assert loader.load_all_models() and not isinstance(loader.get_model('lstm'), TFLiteModel)
+
+        for precision, tolerance in (('float16', 1e-2), ('int8', 0.1)):
+            with open(variant_path('lstm', precision, config), 'wb') as f:
+                f.write(convert_model(keras_model, precision))
+            variant = TFLiteModel(variant_path('lstm', precision, config))
+            # Yorumlayıcı batch=1 derlenir; predict pencereleri tek tek çalıştırır
+            output = variant.predict(windows)
+            assert output.shape == (16, 1) and np.allclose(variant(windows[:1]).numpy(), output[:1])
+            error = np.abs(output - reference).max() / (np.abs(reference).max() + 1e-9)
+            assert error < tolerance, f"{precision} sapması yüksek: {error:.4f}"
+
+        loader = ModelLoader(config)
+        assert loader.load_all_models() and isinstance(loader.get_model('lstm'), TFLiteModel), "int8 varyantı yüklenmedi"
+        assert not isinstance(loader.get_model('cnn_lstm'), TFLiteModel)
+
+        # Float32 gecikmesi canlı yoldaki derlenmiş grafikle ölçülür
+        call = compiled_call(keras_model, config)
+        assert np.allclose(call(windows[:1]), reference[:1], atol=1e-5)
+        latency = benchmark_latency(call, windows[:1], runs=5, warmup=1)
+        assert latency['p50_ms'] > 0
+
+        print(f"✓ Model Niceleme testi başarılı: float32 derlenmiş p50 {latency['p50_ms']:.2f} ms")
+        return True
+    except Exception as e:
+        print(f"❌ Model Niceleme hatası: {e}")
+        return False
+
+
+def test_multi_horizon_ensemble():
+    """Çoklu ufuk testi: birleşik çağrı tek tek model çağrılarıyla aynı olmalı, ufuklar kendi ağırlıklarıyla birleşmeli"""
+    print("🔭 Çoklu Ufuk Ensemble testi...")
+    try:
+        import logging
+        import tempfile
+        import tensorflow as tf
+        from main import TradingBot
+        from config.loader import get_config
+        from utils.metrics import get_metrics
+
+        tmp = tempfile.mkdtemp()
+        config = get_config()
+
+        def stub_model(name, seed):
+            # Her ufuk/model için farklı ağırlıklı küçük model
+            tf.keras.utils.set_random_seed(seed)
+            model = tf.keras.Sequential([
+                tf.keras.layers.Input((config.LOOK_BACK, config.FEATURES)),
+                tf.keras.layers.Flatten(),
+                tf.keras.layers.Dense(1),
+            ])
+            path = os.path.join(tmp, f'{name}.h5')
+            model.save(path)
+            return path
+
+        model_paths = {name: stub_model(name, seed) for seed, name in enumerate(config.MODEL_PATHS)}
+        horizon_paths = {
+            5: {'lstm': stub_model('lstm_5', 10), 'attention_gru': stub_model('attention_gru_5', 11)},
+            60: {'cnn_lstm': stub_model('cnn_lstm_60', 12)},
+        }
+        config = config.replace(USE_ARTIFACT_BUNDLE=False, RECORD_PREDICTIONS=False,
+                                MODEL_PATHS=model_paths, HORIZON_MODEL_PATHS=horizon_paths)
+        predictor = EnsemblePredictor(config)
+        assert predictor.horizons == [5, config.STEP_AHEAD, 60] and predictor.fused_model is not None
+        assert not predictor._unfused_layout and len(predictor._fused_layout) == len(model_paths) + 3
+
+        # Birleşik grafik çıktıları her modelin kendi çağrısıyla eşleşmeli
+        window = np.random.default_rng(0).standard_normal((1, config.LOOK_BACK, config.FEATURES)).astype(np.float32)
+        preds = predictor._run_models(window)
+        for horizon in predictor.horizons:
+            expected = [predictor._call_model(predictor.horizon_models[horizon][name], window)
+                        for name in predictor.horizon_orders[horizon]]
+            assert np.allclose(preds[horizon], expected, atol=1e-5), f"{horizon}dk birleşik çıktı farklı"
+
+        # Her ufuk ENSEMBLE_WEIGHTS'ten kendi modellerinin ağırlıklarını alır
+        regime = 2
+        result = predictor.predict(None, regime, inference=(window, preds))
+        inverse = predictor.data_processor.inverse_transform_prediction
+        expected = {config.STEP_AHEAD: float(inverse(predictor._combine(predictor.weight_matrix[regime],
+                                                                          preds[config.STEP_AHEAD])))}
+        for horizon in (5, 60):
+            names = predictor.horizon_orders[horizon]
+            weights = np.array([config.ENSEMBLE_WEIGHTS[regime].get(name, 0.0) for name in names])
+            combined = (weights @ preds[horizon]) / weights.sum() if weights.sum() > 0 else preds[horizon].mean()
+            expected[horizon] = float(inverse(combined))
+        assert np.isclose(result, expected[config.STEP_AHEAD])
+        assert list(predictor.last_horizon_predictions) == [5, config.STEP_AHEAD, 60]
+        for horizon, value in expected.items():
+            assert np.isclose(predictor.last_horizon_predictions[horizon], value), f"{horizon}dk ağırlıklandırma hatalı"
+
+        # Yayınlanan yük aynı ufuk tahminlerini taşımalı
+        payload = get_metrics().get('horizons')
+        assert payload['market_condition'] == regime and payload['predictions'] == predictor.last_horizon_predictions
+
+        # Yeniden yükleme: ağırlık dışı değişiklik online ağırlıkları korur, yeni tablo tüm ufuklara uygulanır
+        def stub():
+            return type('Component', (), {})()
+
+        bot = stub()
+        bot.config, bot.logger, bot.ensemble_predictor = config, logging.getLogger('test'), predictor
+        bot.signal_generator, bot.position_manager, bot.filter_trace = stub(), stub(), stub()
+        bot.risk_manager, bot.market_analyzer = stub(), stub()
+        bot.risk_manager.sizer, bot.market_analyzer.tracker = stub(), stub()
+        predictor.weights[regime] = dict.fromkeys(predictor.model_order, 1.0)  # Online güncellenmiş gibi
+        predictor.compile_weights()
+        online = predictor.weight_matrix.copy()
+        TradingBot.reload_params(bot, config.replace(TREND_THRESHOLD=config.TREND_THRESHOLD * 2))
+        assert np.array_equal(predictor.weight_matrix, online), "Online ağırlıklar atıldı"
+
+        table = {r: dict(w) for r, w in config.ENSEMBLE_WEIGHTS.items()}
+        table[regime] = {'lstm': 1.0}
+        assert TradingBot.reload_params(bot, bot.config.replace(ENSEMBLE_WEIGHTS=table)) == {'ENSEMBLE_WEIGHTS': table}
+        predictor.predict(None, regime, inference=(window, preds))
+        for horizon in (config.STEP_AHEAD, 5):
+            lstm = preds[horizon][predictor.horizon_orders[horizon].index('lstm')]
+            assert np.isclose(predictor.last_horizon_predictions[horizon], inverse(lstm)), f"{horizon}dk yeni tabloyu kullanmıyor"
+
+        # Birleşik olmayan yolda hata veren model NaN döner, ağırlığı kalan modellere dağıtılır
+        def failing(model_input, training=False):
+            raise RuntimeError("model hatası")
+
+        predictor.fused_model = None
+        predictor._unfused_layout, predictor._fused_layout = predictor._fused_layout + predictor._unfused_layout, []
+        predictor.horizon_models[5] = {**predictor.horizon_models[5], 'lstm': failing}
+        preds = predictor._run_models(window)
+        failed, other = predictor.horizon_orders[5].index('lstm'), predictor.horizon_orders[5].index('attention_gru')
+        assert np.isnan(preds[5][failed]), "Hata veren model 0 ile birleşiyor"
+        predictor.predict(None, regime, inference=(window, preds))
+        assert np.isclose(predictor.last_horizon_predictions[5], inverse(preds[5][other]))
+
+        print(f"✓ Çoklu Ufuk Ensemble testi başarılı: {predictor.last_horizon_predictions}")
+        return True
+    except Exception as e:
+        print(f"❌ Çoklu Ufuk Ensemble hatası: {e}")
+        return False
+
+
+def test_trade_ledger():
+    """İşlem günlüğü ve pozisyon yöneticisi testi"""
+    print("📒 İşlem Günlüğü testi...")
+    import tempfile
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trades.bin')
+            manager = PositionManager(ledger=TradeLedger(path))
+            manager.execute_signal(SIGNAL_BUY, 100.0, timestamp=60)
+            manager.execute_signal(SIGNAL_SELL, 103.0, timestamp=120)  # long +3 kapanır, short açılır
+            manager.execute_signal(SIGNAL_BUY, 101.0, timestamp=180)   # short +2 kapanır, long açılır
+            manager.ledger.close()
+
+            # Yeniden başlatma: durum günlükten kurulmalı
+            restored = PositionManager(ledger=TradeLedger(path))
+            info = restored.get_position_info()
+            summary = restored.get_analytics({restored.token_id: 104.0})
+
+            assert len(restored.ledger) == 5, f"Olay sayısı hatası: {len(restored.ledger)}"
+            assert info['position'] == 'long' and info['entry_price'] == 101.0, f"Açık pozisyon hatası: {info}"
+            assert abs(summary['realized_pnl'] - 5.0) < 1e-9, f"Gerçekleşmiş PnL hatası: {summary}"
+            assert abs(summary['unrealized_pnl'] - 3.0) < 1e-9, f"Gerçekleşmemiş PnL hatası: {summary}"
+
+            curve = restored.analytics.mark_to_market(restored.token_id, [60, 120, 180, 240], [100.0, 103.0, 101.0, 104.0])
+            assert np.allclose(curve['pnl'], [0.0, 3.0, 5.0, 8.0]), f"PnL eğrisi hatası: {curve['pnl']}"
+            restored.ledger.close()
+
+        print("✓ İşlem Günlüğü testi başarılı")
+        return True
+    except Exception as e:
+        print(f"❌ İşlem Günlüğü hatası: {e}")
+        return False
+
+
+def test_position_sizing():
+    """Pozisyon boyutlandırma testi"""
+    print("📐 Pozisyon Boyutlandırma testi...")
+    try:
+        sizer = PositionSizer()
+        n = 1000
+        signals = np.random.choice([SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD], n).astype(np.int8)
+        prices = np.random.uniform(0.4, 0.6, n)
+        atrs = np.random.uniform(0, 0.01, n)
+        atrs[::50] = np.nan
+        equities = np.random.uniform(100, 20000, n)
+
+        batch = sizer.size_batch(signals, prices, atrs, equities)
+        for i in range(n):
+            decision = sizer.size(signals[i], prices[i], atrs[i], equities[i])
+            assert decision.reason == batch['reason'][i], f"Gerekçe farkı: {decision} != {batch[i]}"
+            assert abs(decision.quantity - batch['quantity'][i]) < 1e-9, f"Miktar farkı: {decision} != {batch[i]}"
+
+        traded = batch['quantity'] > 0
+        assert (batch['notional'][traded] <= sizer.params.MAX_POSITION_SIZE + 1e-9).all(), "Maksimum aşıldı"
+        assert (batch['notional'][traded] >= sizer.params.MIN_POSITION_SIZE).all(), "Minimumun altında işlem"
+        assert (batch['risk_amount'][traded] <= equities[traded] * sizer.params.RISK_PER_TRADE + 1e-9).all(), "Risk bütçesi aşıldı"
+        print("✓ Pozisyon Boyutlandırma testi başarılı")
+        return True
+    except Exception as e:
+        print(f"❌ Pozisyon Boyutlandırma hatası: {e}")
+        return False
+
+
+def test_filter_trace():
+    """Filtre izi testi: dakikalık ve vektörel yol aynı kararı vermeli"""
+    print("🔎 Filtre İzi testi...")
+    try:
+        n = 600
+        close = 0.5 + np.cumsum(np.random.normal(0, 0.002, n))
+        features = pd.DataFrame({
+            'close': close,
+            'atr_14': np.random.uniform(0.0005, 0.008, n),
+            'rsi_7': np.random.uniform(0, 100, n),
+            'macd_hist': np.random.normal(0, 1, n),
+            'volumeTo': np.random.uniform(100, 2000, n),
+        }, index=pd.date_range('2024-01-01', periods=n, freq='T'))
+        predictions = close * (1 + np.random.normal(0, 0.01, n))
+        regimes = np.random.randint(1, 5, n)
+
+        generator, risk = SignalGenerator(), RiskManager()
+        trace, log = FilterTrace(), DecisionLog(n)
+        for i in range(n):
+            window = features.iloc[max(0, i - 59):i + 1]
+            record = DecisionRecord(price=close[i])
+            generator.generate_signal(predictions[i], window, regimes[i], record)
+            risk.apply_risk_controls(record, window)
+            trace.observe(record)
+            log.append(record)
+        scalar = log.to_array()
+
+        batch = SignalGenerator().generate_signals_batch(predictions, features, regimes)
+        RiskManager().apply_risk_controls_batch(batch, features)
+        batch_trace = FilterTrace()
+        batch_trace.observe_batch(batch)
+
+        for field in ('raw_signal', 'signal', 'reason', 'filters', 'evaluated'):
+            assert (scalar[field] == batch[field]).all(), f"{field} farkı"
+        assert np.allclose(scalar['quantity'], batch['quantity']), "Miktar farkı"
+        assert (trace.veto_counts == batch_trace.veto_counts).all(), "Veto sayıları farkı"
+        assert trace.raw_trades - trace.passed == sum(
+            1 for r in scalar if r['raw_signal'] != SIGNAL_HOLD and r['signal'] == SIGNAL_HOLD
+        )
+        print(f"✓ Filtre İzi testi başarılı: {batch_trace.summary()['passed']}/{batch_trace.summary()['raw_trades']} sinyal geçti")
+        return True
+    except Exception as e:
+        print(f"❌ Filtre İzi hatası: {e}")
+        return False
+
+
+def test_replay_server():
+    """Replay testi: yerel API taklidi simüle saate göre bar sunmalı, kayıt geri okunabilmeli"""
+    print("🔁 Replay testi...")
+    server = None
+    try:
+        import tempfile
+        from config.loader import get_config
+
+        tape = BarTape.synthetic(300)
+        server = ReplayServer(tape).start()
+        cursor = int(tape.times[199])
+        server.advance_to(cursor)
+
+        record_path = os.path.join(tempfile.mkdtemp(), 'session.jsonl')
+        client = APIClient(get_config().replace(API_BASE_URL=server.base_url),
+                           clock=SimulatedClock(cursor + 59), recorder=ApiRecorder(record_path))
+
+        history = client.get_historical_data(minutes=180)
+        assert len(history) == 180, f"Geçmiş bar sayısı: {len(history)}"
+        assert int(history['time'].iloc[-1]) == cursor, "Saatin ilerisindeki bar sunuldu"
+        latest = client.get_latest_data()
+        assert int(latest['time'].iloc[0]) == cursor, "Son bar hatalı"
+        assert client.send_prediction(0.5, 1, SIGNAL_BUY)
+        assert server.predictions[-1]['timestamp'] == cursor + 59
+
+        replayed = BarTape.from_recording(record_path)
+        assert (replayed.times == tape.times[20:200]).all(), "Kayıttan okunan barlar farklı"
+        print(f"✓ Replay testi başarılı: {server.stats}")
+        return True
+    except Exception as e:
+        print(f"❌ Replay hatası: {e}")
+        return False
+    finally:
+        if server is not None:
+            server.stop()
+
+
+def test_memory_guard():
+    """Bellek izleme testi: büyüyen aşama ve büyüme eğimi yakalanmalı"""
+    print("🧠 Bellek İzleme testi...")
+    try:
+        import logging
+        import tempfile
+        from config.loader import get_config
+        from utils.logger import setup_logger
+
+        config = get_config().replace(MEMORY_SNAPSHOT_INTERVAL=1, MEMORY_WARMUP_MINUTES=0,
+                                      MEMORY_TRACEMALLOC=True, MEMORY_GROWTH_ALERT_MB_PER_DAY=1.0)
+        guard = MemoryGuard(config)
+        logging.getLogger('memory_guard').disabled = True
+        retained = []
+        for _ in range(5):
+            guard.begin()
+            retained.append(np.ones(100_000))  # ~780 KB tutulan bellek
+            guard.mark('leaky')
+            np.ones(100_000).sum()
+            guard.mark('clean')
+            guard.end()
+        logging.getLogger('memory_guard').disabled = False
+
+        summary = guard.summary()
+        assert summary['stages']['leaky']['mean_kb'] > 700, "Büyüyen aşama yakalanmadı"
+        assert abs(summary['stages']['clean']['mean_kb']) < 50, "Temiz aşamada fark var"
+        assert summary['alerts'] > 0 and summary['growth_mb_per_day'] > 0
+
+        log_file = os.path.join(tempfile.mkdtemp(), 'test.log')
+        logger = setup_logger('memory_guard_test', log_file, config=config)
+        setup_logger('memory_guard_test', log_file, config=config)
+        assert len(logger.handlers) == 2, f"Handler çoğaldı: {len(logger.handlers)}"
+        print(f"✓ Bellek İzleme testi başarılı: {summary['growth_mb_per_day']:.0f} MB/gün, {summary['alerts']} uyarı")
+        return True
+    except Exception as e:
+        print(f"❌ Bellek İzleme hatası: {e}")
+        return False
+
+
+def test_market_regimes():
+    """Rejim testi: artımlı izleyici ile vektörel etiketleme aynı olmalı, histerezis geçişleri azaltmalı"""
+    print("🧭 Rejim Tespiti testi...")
+    try:
+        from config.loader import get_config
+
+        n = 5000
+        rng = np.random.default_rng(7)
+        volatility = np.where((np.arange(n) // 1000) % 2 == 0, 0.004, 0.015)
+        close = 0.5 * np.exp(np.cumsum(rng.normal(0, 1, n) * volatility))
+
+        labels = label_regimes(close)
+        tracker = RegimeTracker()
+        streamed = np.array([tracker.update(c) for c in close])
+        assert (labels == streamed).all(), "İzleyici ve toplu etiketleme farklı"
+
+        # O(1) güncellemeler tam hesapla aynı olmalı
+        expected = np.log(close[1:] / close[:-1])[-20:].std(ddof=1)
+        assert np.isclose(tracker.volatility, expected), "Volatilite farkı"
+        assert np.isclose(tracker.trend_strength, abs(np.polyfit(np.arange(60), close[-60:], 1)[0])), "Eğim farkı"
+
+        raw = label_regimes(close, get_config().replace(REGIME_HYSTERESIS=0.0, REGIME_MIN_DWELL=1))
+        for config in (get_config().replace(REGIME_HYSTERESIS=0.0, REGIME_MIN_DWELL=1),
+                       get_config().replace(REGIME_MIN_DWELL=7)):
+            tracker = RegimeTracker(config)
+            streamed = np.array([tracker.update(c) for c in close])
+            assert (label_regimes(close, config) == streamed).all(), \
+                f"Bekleme süresi {config.REGIME_MIN_DWELL} için toplu etiketleme farklı"
+        switches, raw_switches = (np.diff(labels) != 0).sum(), (np.diff(raw) != 0).sum()
+        assert switches < raw_switches, "Histerezis geçişleri azaltmadı"
+
+        features = pd.DataFrame({'close': close}, index=pd.date_range('2024-01-01', periods=n, freq='T'))
+        analyzer = MarketAnalyzer()
+        for end in range(200, n, 37):
+            condition = analyzer.analyze_market(features.iloc[end - 120:end])
+        assert condition == labels[end - 1], "MarketAnalyzer rejimi farklı"
+        print(f"✓ Rejim Tespiti testi başarılı: {switches} geçiş (histerezissiz {raw_switches})")
+        return True
+    except Exception as e:
+        print(f"❌ Rejim Tespiti hatası: {e}")
+        return False
+
+
+def test_speculation():
+    """Spekülatif mod testi: tolerans içi kapanışta çıkarım yeniden kullanılmalı, dışında yeniden hesaplanmalı"""
+    print("⏩ Spekülatif Hesaplama testi...")
+    try:
+        class CountingEnsemble:
+            calls = 0
+
+            def infer(self, features_df):
+                self.calls += 1
+                return features_df['close'].to_numpy()[-1:], {}
+
+        n = 180
+        index = pd.date_range('2024-01-01', periods=n + 1, freq='T')
+        close = 0.5 + np.cumsum(np.random.normal(0, 0.001, n + 1))
+        bars = pd.DataFrame({'open': close, 'high': close * 1.001, 'low': close * 0.999, 'close': close,
+                             'volumeTo': np.random.uniform(1000, 2000, n + 1)}, index=index)
+        window, final = bars.iloc[:n], bars.iloc[1:]
+
+        processor, ensemble = DataProcessor(), CountingEnsemble()
+        speculator = SpeculativePipeline(processor, ensemble)
+
+        # Geçici bar kesin bara çok yakın: son satır yeniden hesaplanır, çıkarım tekrar çalışmaz
+        provisional = bars.iloc[-1:].copy()
+        provisional['close'] *= 1.0001
+        provisional['volumeTo'] *= 0.9
+        speculator.prepare(window, provisional)
+        features_df, inference = speculator.resolve(final)
+        assert inference is not None and ensemble.calls == 1 and speculator.hits == 1
+        expected = processor.calculate_features(final)
+        assert features_df.index.equals(expected.index) and list(features_df.columns) == list(expected.columns)
+        assert (features_df.dtypes == expected.dtypes).all(), "Sütun tipleri değişti"
+        assert np.allclose(features_df.to_numpy(dtype=float), expected.to_numpy(dtype=float), rtol=1e-9, atol=1e-12), \
+            "Son satırın feature'ları kesin barla aynı değil"
+
+        # Fark tolerans dışında: feature'lar kesin pencereyle yeniden hesaplanır
+        provisional['close'] = close[-1] * 1.01
+        speculator.prepare(window, provisional)
+        features_df, inference = speculator.resolve(final)
+        assert inference is None and speculator.misses == 1
+        assert np.allclose(features_df.to_numpy(dtype=float), expected.to_numpy(dtype=float)), "Yeniden hesaplama farkı"
+        print(f"✓ Spekülatif Hesaplama testi başarılı: {speculator.hits} isabet, {speculator.misses} ıska")
+        return True
+    except Exception as e:
+        print(f"❌ Spekülatif Hesaplama hatası: {e}")
+        return False
+
+
+def test_async_runtime():
+    """asyncio modu testi: token'ların G/Ç'si örtüşmeli, zaman aşımına uğrayan aşama dakikayı atlatmalı"""
+    print("🔀 Asenkron Çalışma testi...")
+    try:
+        import asyncio
+        import time
+        from config.loader import get_config
+
+        class SlowBot:
+            def __init__(self, config, compute_s=0.0):
+                self.config = config
+                self.compute_s = compute_s
+                self.memory_guard = MemoryGuard(config)
+                self.profiler = Profiler(config)
+                self.ensemble_predictor = type('Ensemble', (), {'last_horizon_predictions': {}})()
+                self.published = []
+
+            def _fetch_bar(self):
+                time.sleep(0.2)
+                return pd.DataFrame({'close': [1.0]})
+
+            def _decide(self, new_data):
+                time.sleep(self.compute_s)
+                return DecisionRecord(0, float(new_data['close'].iloc[-1]))
+
+            def _publish(self, record, horizon_predictions=None):
+                time.sleep(0.2)
+                self.published.append(record)
+
+            def stop(self):
+                pass
+
+        config = get_config().replace(ASYNC_COMPUTE_TIMEOUT=0.1, ASYNC_FETCH_TIMEOUT=0.1)
+        fast = [SlowBot(config.replace(TOKEN_ID=token)) for token in (1, 2, 3)]
+        slow = SlowBot(config.replace(TOKEN_ID=4), compute_s=0.5)
+
+        async def scenario():
+            runtime = AsyncRuntime(fast, config.replace(ASYNC_FETCH_TIMEOUT=1.0))
+            started = time.perf_counter()
+            await asyncio.gather(*(runtime.process_minute(bot) for bot in fast))
+            await runtime.shutdown()
+            elapsed = time.perf_counter() - started
+            assert all(len(bot.published) == 1 for bot in fast), "Gönderim eksik"
+            # Seri çalışsa 3 x (0.2 + 0.2) = 1.2 sn sürerdi
+            assert elapsed < 0.8, f"G/Ç örtüşmedi: {elapsed:.2f} sn"
+
+            runtime = AsyncRuntime([slow], config.replace(ASYNC_FETCH_TIMEOUT=1.0))
+            assert await runtime.process_minute(slow) is None
+            runtime.params = config  # Süren işi 0.1 sn bekleyip dakikayı atla
+            assert await runtime.process_minute(slow) is None
+            await runtime.shutdown()
+            return runtime.stats, elapsed
+
+        stats, elapsed = asyncio.run(scenario())
+        assert stats['timeouts']['compute'] == 1 and stats['skipped'] == 1, f"Beklenmeyen sayaçlar: {stats}"
+        print(f"✓ Asenkron Çalışma testi başarılı: 3 token {elapsed:.2f} sn, zaman aşımı sonrası dakika atlandı")
+        return True
+    except Exception as e:
+        print(f"❌ Asenkron Çalışma hatası: {e}")
+        return False
+
+
+def test_dataset_builder():
+    """Veri seti testi: parça parça üretilen örnekler canlı feature yoluyla aynı, scaler akışla öğrenilmiş olmalı"""
+    print("🧱 Veri Seti Oluşturma testi...")
+    try:
+        import pickle
+        import tempfile
+
+        values = np.random.normal(0, 1, (1000, 3))
+        moments = RunningMoments(3)
+        for chunk in np.array_split(values, 7):
+            moments.update(chunk)
+        assert np.allclose(moments.mean, values.mean(axis=0)) and np.allclose(moments.var, values.var(axis=0))
+
+        history = pd.DataFrame(BarTape.synthetic(600).bars)
+        history.index = pd.to_datetime(history['time'], unit='s')
+        builder = DatasetBuilder()
+        output = os.path.join(tempfile.mkdtemp(prefix='dataset_'), 'dataset')
+        meta = builder.build(history, output, chunk_samples=100)
+
+        X = np.load(os.path.join(output, 'X.npy'), mmap_mode='r')
+        y = np.load(os.path.join(output, 'y.npy'))
+        assert X.shape == (meta['samples'], builder.look_back, len(builder.features)) and len(y) == len(X)
+        assert meta['samples'] == 600 - 179 - builder.step_ahead - meta['stats']['dropped']
+        assert np.allclose(X.reshape(-1, X.shape[2]).mean(axis=0), 0, atol=1e-3), "Scaler ortalaması sıfırlamadı"
+        max_diff = builder.verify(history, output, samples=10)
+        assert max_diff < 1e-3, f"Canlı yoldan fark: {max_diff}"
+
+        # Bir günden kısa geçmiş (çarşamba): dow_sin/dow_cos sabit, yuvarlama artığıyla ölçeklenmemeli
+        history = pd.DataFrame(BarTape.synthetic(600, start_ts=1704240000).bars)
+        history.index = pd.to_datetime(history['time'], unit='s')
+        output = os.path.join(tempfile.mkdtemp(prefix='dataset_'), 'dataset')
+        builder.build(history, output, chunk_samples=100)
+        with open(os.path.join(output, 'scaler_X.pkl'), 'rb') as f:
+            scale = dict(zip(builder.features, pickle.load(f).scale_))
+        assert scale['dow_sin'] == scale['dow_cos'] == 1.0, f"Sabit sütun ölçeklendi: {scale['dow_sin']}"
+        day_diff = builder.verify(history, output, samples=10)
+        assert day_diff < 1e-3, f"Tek günlük geçmişte canlı yoldan fark: {day_diff}"
+        print(f"✓ Veri Seti Oluşturma testi başarılı: {X.shape}, canlı yoldan en büyük fark {max_diff:.1e}")
+        return True
+    except Exception as e:
+        print(f"❌ Veri Seti Oluşturma hatası: {e}")
+        return False
+
+
+def test_feature_cache():
+    """Feature cache testi: cache'li sonuç aynı olmalı, değişen bar ve sonrası yeniden hesaplanmalı"""
+    print("🗄️  Feature Cache testi...")
+    try:
+        import tempfile
+        from config.loader import get_config
+
+        config = get_config().replace(FEATURE_CACHE_ENABLED=True, FEATURE_CACHE_PATH=tempfile.mkdtemp(prefix='features_'))
+        bars = pd.DataFrame(BarTape.synthetic(600).bars)
+        bars.index = pd.to_datetime(bars['time'], unit='s')
+        plain, cached = DataProcessor(config.replace(FEATURE_CACHE_ENABLED=False)), DataProcessor(config)
+
+        def max_diff(a, b):
+            assert a.index.equals(b.index) and set(a.columns) == set(b.columns), "Satır/sütun farkı"
+            return float(np.nanmax(np.abs(a.to_numpy(dtype=float) - b[a.columns].to_numpy(dtype=float))))
+
+        # Kayan canlı pencereler: her dakika sadece yeni satır hesaplanır
+        diff = max(max_diff(plain.compute_features(bars.iloc[t - 180:t]), cached.compute_features(bars.iloc[t - 180:t]))
+                   for t in range(180, 240))
+        cache = cached.feature_cache
+        assert diff < 1e-9 and cache.stats['hits'] > cache.stats['misses'], f"Beklenmeyen: {diff}, {cache.stats}"
+
+        # Düzeltilen bar: o satır ve geriye bakışında bu bar olan sonraki satırlar yeniden hesaplanır
+        window = bars.iloc[60:240].copy()
+        window.iloc[170, window.columns.get_loc('close')] *= 1.01
+        misses = cache.stats['misses']
+        assert max_diff(plain.compute_features(window), cached.compute_features(window)) < 1e-9
+        assert cache.stats['misses'] - misses == 10, "Değişen barın etkilediği satırlar yeniden hesaplanmadı"
+
+        # Diskten yeniden yükleme ve boyut sınırı
+        cache.flush()
+        reloaded = FeatureCache(config)
+        assert reloaded.lookup(bars['time'].to_numpy()[120:240])[0].all(), "Kalıcı satırlar okunamadı"
+        reloaded.max_bytes = 1
+        reloaded._evict()
+        assert reloaded.stats['evicted'] >= 1 and not any(n.endswith('.npz') for n in os.listdir(reloaded.path))
+        print(f"✓ Feature Cache testi başarılı: {cache.stats['hits']} isabet, {cache.stats['misses']} hesaplama")
+        return True
+    except Exception as e:
+        print(f"❌ Feature Cache hatası: {e}")
+        return False
+
+
+def test_resampler():
+    """Zaman dilimi testi: artımlı toplama pandas resample ile aynı olmalı, eksik dakikalar ve düzeltmeler işlenmeli"""
+    print("🕯️  Çoklu Zaman Dilimi testi...")
+    try:
+        from config.loader import get_config
+
+        bars = pd.DataFrame(BarTape.synthetic(1200).bars)
+        bars.index = pd.to_datetime(bars['time'], unit='s')
+        bars = bars.drop(bars.index[[100, 101, 299, 700]])  # Kova içi ve kova sonu boşlukları
+        columns = ['open', 'high', 'low', 'close', 'volumeTo']
+
+        feed = MultiTimeframeFeed(get_config().replace(TIMEFRAMES=[5, 15, 60], TIMEFRAME_WINDOW_SIZE=1000))
+        for t in range(len(bars)):
+            feed.add(bars.iloc[t:t + 1])
+
+        rules = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volumeTo': 'sum'}
+        for minutes in feed.timeframes:
+            expected = bars[columns].resample(f"{minutes}min").agg(rules).dropna()
+            window = feed.windows[minutes].get_window()
+            # Son kova henüz tamamlanmamış olabilir
+            expected = expected.iloc[:len(window)]
+            assert window.index.equals(expected.index), f"{minutes}m kova zamanları farklı"
+            assert np.allclose(window[columns].to_numpy(), expected.to_numpy()), f"{minutes}m OHLCV farklı"
+
+        # Kovanın son dakikası gelince bar hemen kapanır; düzeltilen dakika kovayı yeniden toplar
+        aggregator = BarAggregator(5)
+        assert aggregator.add(0, 1, 2, 0.5, 1.5, 10) == [] and aggregator.add(60, 1.5, 3, 1, 2, 10) == []
+        assert aggregator.add(60, 1.5, 2.5, 1, 2.2, 4) == []
+        assert aggregator.partial()['high'] == 2.5 and aggregator.partial()['volumeTo'] == 14
+        closed = aggregator.add(240, 2.2, 2.4, 2, 2.3, 1)
+        assert len(closed) == 1 and closed[0]['close'] == 2.3 and closed[0]['minutes'] == 3
+        assert aggregator.add(180, 9, 9, 9, 9, 9) == [], "Kapanmış kovaya gelen bar yok sayılmalı"
+
+        feed.refresh()
+        assert all(feed.features[m] is not None and len(feed.features[m]) for m in (5, 15)), "Dilim feature'ları yok"
+        print(f"✓ Çoklu Zaman Dilimi testi başarılı: " + ", ".join(
+            f"{m}m={feed.windows[m].size()} bar" for m in feed.timeframes))
+        return True
+    except Exception as e:
+        print(f"❌ Çoklu Zaman Dilimi hatası: {e}")
+        return False
+
+
+def test_ensemble_deadline():
+    """Süre sınırı testi: geciken model düşmeli, ağırlıklar yeniden normalize edilmeli, sürekli geciken dışlanmalı"""
+    print("⏱️  Süre Sınırlı Ensemble testi...")
+    try:
+        import time
+        from config.loader import get_config
+
+        config = get_config().replace(ENSEMBLE_DEADLINE_MS=50.0, ENSEMBLE_MAX_MISSES=2, ENSEMBLE_EXCLUDE_MINUTES=10)
+        offset = [0.0]
+        runner = DeadlineRunner([(15, 'a'), (15, 'b'), (15, 'slow')], config,
+                                clock=lambda: time.monotonic() + offset[0])
+        delay = [0.3]
+
+        def slow():
+            time.sleep(delay[0])
+            return 3.0
+
+        jobs = {(15, 'a'): lambda: 1.0, (15, 'b'): lambda: 2.0, (15, 'slow'): slow}
+        started = time.perf_counter()
+        results = runner.run(jobs)
+        elapsed = time.perf_counter() - started
+        assert results == {(15, 'a'): 1.0, (15, 'b'): 2.0} and elapsed < 0.2, f"Süre sınırı uygulanmadı: {elapsed:.2f} sn"
+
+        # Hâlâ süren çağrı yeniden gönderilmez; ikinci kaçırmada model dışlanır
+        runner.run(jobs)
+        assert runner.excluded() == [(15, 'slow')] and runner.stats['exclusions'] == 1
+        assert runner.last_dropped == [(15, 'slow')]
+
+        # Dışlanma süresi sonunda tek deneme: süresinde dönerse sayaç sıfırlanır
+        time.sleep(0.3)
+        offset[0] += config.ENSEMBLE_EXCLUDE_MINUTES * 60 + 1
+        delay[0] = 0.0
+        assert runner.run(jobs)[(15, 'slow')] == 3.0 and runner.misses[(15, 'slow')] == 0
+        runner.shutdown()
+
+        # Düşen modelin ağırlığı kalanlara dağıtılır
+        combined = EnsemblePredictor._combine(np.array([0.5, 0.3, 0.2]), np.array([1.0, 2.0, np.nan]))
+        assert abs(combined - (0.5 * 1.0 + 0.3 * 2.0) / 0.8) < 1e-12, f"Yeniden normalizasyon hatalı: {combined}"
+        assert np.isnan(EnsemblePredictor._combine(np.array([1.0]), np.array([np.nan])))
+        print(f"✓ Süre Sınırlı Ensemble testi başarılı: {elapsed * 1000:.0f} ms, {runner.stats}")
+        return True
+    except Exception as e:
+        print(f"❌ Süre Sınırlı Ensemble hatası: {e}")
+        return False
+
+
+def test_profiler():
+    """Profilleme testi: kapalıyken iz bırakmamalı, tetiklenince N dakika ölçüp pstats/folded yazmalı"""
+    print("🔬 Profilleme testi...")
+    try:
+        import time
+        import signal
+        import pstats
+        import tempfile
+        from config.loader import get_config
+        from utils.profiler import install_signal_handler
+
+        output = tempfile.mkdtemp(prefix='profiles_')
+        trigger = os.path.join(output, 'trigger')
+        config = get_config().replace(PROFILE_PATH=output, PROFILE_TRIGGER_PATH=trigger, PROFILE_MINUTES=1,
+                                      PROFILE_SAMPLE_INTERVAL_MS=1.0)
+        profiler = Profiler(config)
+
+        def minute():
+            profiler.begin()
+            try:
+                deadline = time.perf_counter() + 0.05
+                while time.perf_counter() < deadline:
+                    sum(i * i for i in range(1000))
+            finally:
+                profiler.end()
+
+        minute()
+        assert not profiler.active and os.listdir(output) == [], "Tetiklenmeden profil açıldı"
+
+        # Dosya tetiklemesi: içerik dakika sayısı, dosya tüketilir
+        with open(trigger, 'w') as f:
+            f.write('2')
+        minute()
+        assert profiler.active and profiler.remaining == 1 and not os.path.exists(trigger)
+        minute()
+        assert not profiler.active and profiler.sessions == 1
+        stats = pstats.Stats(profiler.last_output + '.pstats')
+        assert any(func[2] == '<genexpr>' for func in stats.stats), "Profil ölçülen fonksiyonu içermiyor"
+        with open(profiler.last_output + '.folded') as f:
+            lines = f.read().splitlines()
+        assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines), "Folded çıktı hatalı"
+
+        # Sinyal tetiklemesi (Unix)
+        if install_signal_handler():
+            os.kill(os.getpid(), signal.SIGUSR1)
+            time.sleep(0.01)
+            minute()
+            assert profiler.sessions == 2, "Sinyal profillemeyi tetiklemedi"
+        print(f"✓ Profilleme testi başarılı: {profiler.sessions} oturum, {len(lines)} farklı yığın")
+        return True
+    except Exception as e:
+        print(f"❌ Profilleme hatası: {e}")
+        return False
+
+
+def test_admin_server():
+    """Yönetim uç noktası testi: durum kayıt defterinden okunmalı, komutlar kuyruktan botun thread'inde uygulanmalı"""
+    print("🛠️  Yönetim Uç Noktası testi...")
+    try:
+        import json
+        import queue
+        import logging
+        import tempfile
+        import urllib.request
+        import urllib.error
+        from config.loader import get_config
+        from utils.metrics import get_metrics
+        from main import TradingBot
+
+        config = get_config().replace(ADMIN_PORT=0, ADMIN_TOKEN='secret', TOKEN_ID=77)
+        bot = type('Bot', (), {})()
+        bot.config, bot.commands, bot.paused = config, queue.SimpleQueue(), False
+        bot.logger, bot.profiler = logging.getLogger('test'), Profiler(config)
+        get_metrics().publish('bot.77', {'window_size': 180, 'regime': 2, 'queues': {'shadow_observations': 0}})
+
+        admin = AdminServer([bot], config).start()
+        base = f"http://127.0.0.1:{admin.address[1]}"
+
+        def call(path, method='GET', token=None):
+            request = urllib.request.Request(base + path, method=method, headers={'X-Admin-Token': token or ''})
+            try:
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+
+        status, body = call('/status')
+        assert status == 200 and body['bots']['77']['window_size'] == 180, f"Durum okunamadı: {body}"
+        assert call('/health')[0] == 200
+
+        assert call('/pause', 'POST')[0] == 403, "Token olmadan komut kabul edildi"
+        assert call('/reload', 'POST', 'secret')[0] == 400, "Yeniden yükleme kaynağı yokken kabul edildi"
+        assert call('/profile?minutes=0', 'POST', 'secret')[0] == 400
+        assert call('/pause', 'POST', 'secret')[0] == 202 and call('/profile?minutes=2', 'POST', 'secret')[0] == 202
+        assert call('/status')[1]['bots']['77']['queues']['admin_commands'] == 2
+        admin.stop()
+
+        # Komutlar bir sonraki dakikada botun kendi thread'inde uygulanır
+        TradingBot._apply_commands(bot)
+        assert bot.paused and bot.profiler._request == 2 and bot.commands.empty()
+
+        # Duraklatılmışken veto edilen sinyaller aşırı işlem tamponuna girmez
+        ledger = TradeLedger(os.path.join(tempfile.mkdtemp(), 'trades.bin'), config)
+        bot.risk_manager, bot.position_manager = RiskManager(config), PositionManager(config, ledger=ledger)
+        features_df = pd.DataFrame({'close': [1.0], 'atr_14': [0.001]})
+        for _ in range(3):
+            record = DecisionRecord(price=1.0)
+            record.signal = SIGNAL_BUY
+            TradingBot._apply_risk(bot, record, features_df, 1.0)
+            assert record.signal == SIGNAL_HOLD and record.reason == REASON_PAUSED
+        assert bot.risk_manager._signal_count == 0, "Veto edilen sinyaller sayıldı"
+        bot.paused = False
+        record = DecisionRecord(price=1.0)
+        record.signal = SIGNAL_BUY
+        TradingBot._apply_risk(bot, record, features_df, 1.0)
+        assert record.signal == SIGNAL_BUY and bot.risk_manager._signal_count == 1
+        print(f"✓ Yönetim Uç Noktası testi başarılı: {base}")
+        return True
+    except Exception as e:
+        print(f"❌ Yönetim Uç Noktası hatası: {e}")
+        return False
+
+
+def test_checkpoint():
+    """Kontrol noktası testi: geri yüklenen bileşenler kesintisiz akışla aynı sonuca varmalı, kayıt atomik olmalı"""
+    print("💾 Kontrol Noktası testi...")
+    try:
+        import tempfile
+        import logging
+        from config.loader import get_config
+        from main import TradingBot
+
+        bars = pd.DataFrame(BarTape.synthetic(600).bars)
+        bars.index = pd.to_datetime(bars['time'], unit='s')
+        bars.index.name = 'timestamp'
+        path = os.path.join(tempfile.mkdtemp(), 'state.npz')
+        config = get_config().replace(TIMEFRAMES=[5, 15], TIMEFRAME_WINDOW_SIZE=50, CHECKPOINT_PATH=path)
+
+        def make_bot():
+            bot = type('Bot', (), {})()
+            bot.config, bot.paused, bot.logger = config, False, logging.getLogger('test')
+            bot.sliding_window = SlidingWindow(window_size=180)
+            bot.market_analyzer = MarketAnalyzer(config)
+            bot.risk_manager = RiskManager(config)
+            bot.timeframes = MultiTimeframeFeed(config)
+            return bot
+
+        def feed(bot, chunk):
+            bot.sliding_window.add_data(chunk.copy())
+            bot.timeframes.add(chunk)
+            bot.market_analyzer.analyze_market(bot.sliding_window.get_window())
+
+        # Kesintisiz akış ve 400. dakikada kaydedilip yeni bileşenlerle devam eden akış
+        continuous = make_bot()
+        for t in range(400):
+            feed(continuous, bars.iloc[t:t + 1])
+        continuous.paused = True
+        record = DecisionRecord(int(bars['time'].iloc[399]), 101.5, prediction=102.0, regime=2)
+        record.signal = SIGNAL_BUY
+        checkpointer = Checkpointer(config)
+        assert checkpointer.save(TradingBot.state_dict(continuous), {'record': record.as_array(), 'horizons': {'15': 102.0}})
+        assert not os.path.exists(path + '.tmp'), "Geçici dosya kaldı"
+
+        loaded = Checkpointer(config).load()
+        assert loaded['published'] == 0 and loaded['pending']['horizons'] == {'15': 102.0}
+        restored_record = DecisionRecord.from_row(loaded['pending']['record'][0])
+        assert restored_record.as_tuple() == record.as_tuple(), "Bekleyen karar farklı"
+
+        # Saatin ilerisindeki kayıt (saat kayması, geçmiş saatle replay) başka zaman çizgisidir, kullanılmaz
+        last_ts = int(bars['time'].iloc[399])
+        for clock_ts, saved_at in ((int(bars['time'].iloc[300]), last_ts + 59), (last_ts + 59, last_ts + 3600)):
+            future_config = config.replace(CHECKPOINT_PATH=os.path.join(tempfile.mkdtemp(), 'state.npz'))
+            Checkpointer(future_config).save(TradingBot.state_dict(continuous), saved_at=saved_at)
+            bot = make_bot()
+            bot.config, bot.checkpointer = future_config, Checkpointer(future_config)
+            now = pd.Timestamp(clock_ts, unit='s', tz='UTC').to_pydatetime()
+            bot.api_client = type('Api', (), {'clock': staticmethod(lambda now=now: now)})()
+            assert not TradingBot._restore_checkpoint(bot), f"Saatin ilerisindeki kayıt yüklendi: {clock_ts}"
+            assert bot.sliding_window.size() == 0 and not bot.paused and bot.risk_manager._signal_count == 0
+
+        restored = make_bot()
+        state = loaded['state']
+        restored.sliding_window.load_state(state['window'])
+        assert restored.market_analyzer.tracker.load_state(state['regime'])
+        restored.risk_manager.load_state(state['risk'])
+        restored.timeframes.load_state(state['timeframes'])
+        assert state['paused'] is True
+
+        for t in range(400, 600):
+            feed(continuous, bars.iloc[t:t + 1])
+            feed(restored, bars.iloc[t:t + 1])
+        columns = ['open', 'high', 'low', 'close', 'volumeTo']
+        assert np.allclose(restored.sliding_window.get_window()[columns], continuous.sliding_window.get_window()[columns])
+        a, b = continuous.market_analyzer.tracker, restored.market_analyzer.tracker
+        assert a.regime == b.regime and np.isclose(a.volatility, b.volatility) and np.isclose(a.trend_strength, b.trend_strength)
+        for minutes in (5, 15):
+            window_a, window_b = continuous.timeframes.windows[minutes].get_window(), restored.timeframes.windows[minutes].get_window()
+            assert window_a.index.equals(window_b.index) and np.allclose(window_a[columns], window_b[columns]), f"{minutes}m farklı"
+
+        # Gönderim işareti .npz yeniden yazılmadan yan dosyaya yazılır; başka token'ın kaydı yüklenmez
+        saves, modified = checkpointer.saves, os.stat(checkpointer.path).st_mtime_ns
+        assert checkpointer.mark_published(record.timestamp)
+        assert checkpointer.saves == saves and os.stat(checkpointer.path).st_mtime_ns == modified, "Kontrol noktası yeniden yazıldı"
+        assert Checkpointer(config).load()['published'] == record.timestamp
+        assert Checkpointer(config.replace(TOKEN_ID=config.TOKEN_ID + 1)).load() is None
+        print(f"✓ Kontrol Noktası testi başarılı: {checkpointer.last_bytes} bayt, {checkpointer.last_save_ms:.1f} ms")
+        return True
+    except Exception as e:
+        print(f"❌ Kontrol Noktası hatası: {e}")
+        return False
+
+
 def run_all_tests():
     """Tüm testleri çalıştır"""
     print("🧪 Sistem Testleri Başlatılıyor")
@@ -90,7 +1379,31 @@ def run_all_tests():
     tests = [
         test_api_client,
         test_sliding_window,
+        test_data_quality,
         test_data_processor,
+        test_calendar_table,
+        test_weight_optimizer,
+        test_shadow_evaluator,
+        test_prediction_monitor,
+        test_artifact_bundle,
+        test_config_loader,
+        test_quantization,
+        test_multi_horizon_ensemble,
+        test_trade_ledger,
+        test_position_sizing,
+        test_filter_trace,
+        test_replay_server,
+        test_memory_guard,
+        test_market_regimes,
+        test_speculation,
+        test_async_runtime,
+        test_dataset_builder,
+        test_feature_cache,
+        test_resampler,
+        test_ensemble_deadline,
+        test_profiler,
+        test_admin_server,
+        test_checkpoint,
     ]
 
     passed = 0
@@ -0,0 +1,191 @@
+import numpy as np
+
+# Sinyal kodları (int8); işaret pozisyon yönüyle aynıdır (ledger LONG=1, SHORT=-1)
+SIGNAL_SELL = -1
+SIGNAL_HOLD = 0
+SIGNAL_BUY = 1
+
+SIGNAL_NAMES = {SIGNAL_SELL: 'sell', SIGNAL_HOLD: 'hold', SIGNAL_BUY: 'buy'}
+SIGNAL_CODES = {name: code for code, name in SIGNAL_NAMES.items()}
+
+# API signalId eşlemesi: indeks = kod + 1 (sell=3, hold=2, buy=1)
+API_SIGNAL_IDS = np.array([3, 2, 1], dtype=np.int8)
+
+# Karar gerekçe kodları
+REASON_OK = 0
+REASON_HOLD = 1
+REASON_NO_ATR = 2
+REASON_BELOW_MIN = 3
+REASON_CAPPED = 4
+REASON_STOP_LOSS = 5
+REASON_OVERTRADING = 6
+REASON_ERROR = 7
+REASON_PAUSED = 8
+
+REASON_NAMES = ('ok', 'hold', 'no_atr', 'below_min', 'capped', 'stop_loss', 'overtrading', 'error', 'paused')
+
+# Filtre bitleri: record.evaluated çalışan filtreleri, record.filters sinyali
+# hold'a çeviren (veto eden) filtreyi işaretler
+FILTER_HIGH_VOLATILITY = 1 << 0
+FILTER_RSI = 1 << 1
+FILTER_MACD = 1 << 2
+FILTER_VOLUME = 1 << 3
+FILTER_STOP_LOSS = 1 << 4
+FILTER_SIZING = 1 << 5
+FILTER_OVERTRADING = 1 << 6
+
+# Filtre grupları (SignalGenerator metodları)
+FILTER_MARKET_CONDITION = FILTER_HIGH_VOLATILITY | FILTER_RSI
+FILTER_TECHNICAL = FILTER_MACD | FILTER_VOLUME
+
+FILTER_NAMES = {
+    FILTER_HIGH_VOLATILITY: 'high_volatility',
+    FILTER_RSI: 'rsi',
+    FILTER_MACD: 'macd',
+    FILTER_VOLUME: 'volume',
+    FILTER_STOP_LOSS: 'stop_loss',
+    FILTER_SIZING: 'sizing',
+    FILTER_OVERTRADING: 'overtrading',
+}
+
+# Düz dizilerde (backtest, kayıt) tutulan karar satırı
+DECISION_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('price', '<f8'),
+    ('prediction', '<f8'),
+    ('regime', 'i1'),
+    ('raw_signal', 'i1'),
+    ('signal', 'i1'),
+    ('reason', 'i1'),
+    ('filters', '<u2'),
+    ('evaluated', '<u2'),
+    ('dropped', '<u2'),
+    ('quantity', '<f8'),
+    ('notional', '<f8'),
+    ('risk_amount', '<f8'),
+    ('stop_distance', '<f8'),
+    ('predict_ms', '<f4'),
+    ('signal_ms', '<f4'),
+    ('risk_ms', '<f4'),
+])
+
+
+def signal_code(signal):
+    """'buy'/'sell'/'hold' veya kodu int8 koda çevir"""
+    if isinstance(signal, str):
+        return SIGNAL_CODES[signal]
+    return int(signal)
+
+
+def signal_name(code):
+    """Kodun okunur adı"""
+    return SIGNAL_NAMES[int(code)]
+
+
+def filter_names(mask):
+    """Bit maskesindeki filtre adları"""
+    return [name for bit, name in FILTER_NAMES.items() if mask & bit]
+
+
+class DecisionRecord:
+    """Bir dakikanın kararı: tahmin, rejim, sinyal, miktar, filtreler ve süreler
+
+    Alanlar DECISION_DTYPE ile birebir aynıdır; as_tuple() düz diziye yazmak içindir.
+    """
+
+    __slots__ = DECISION_DTYPE.names
+
+    def __init__(self, timestamp=0, price=0.0, prediction=float('nan'), regime=0):
+        self.timestamp = timestamp
+        self.price = price
+        self.prediction = prediction
+        self.regime = regime
+        self.raw_signal = SIGNAL_HOLD
+        self.signal = SIGNAL_HOLD
+        self.reason = REASON_HOLD
+        self.filters = 0
+        self.evaluated = 0
+        self.dropped = 0  # Süre sınırında düşen modeller (MODEL_ORDER bit maskesi); 0 = tam ensemble
+        self.quantity = 0.0
+        self.notional = 0.0
+        self.risk_amount = 0.0
+        self.stop_distance = 0.0
+        self.predict_ms = 0.0
+        self.signal_ms = 0.0
+        self.risk_ms = 0.0
+
+    def veto(self, reason, filter_bit=0):
+        """Sinyali hold'a çevir ve gerekçeyi kaydet"""
+        self.signal = SIGNAL_HOLD
+        self.reason = reason
+        self.filters |= filter_bit
+        self.quantity = 0.0
+        self.notional = 0.0
+        self.risk_amount = 0.0
+        return self
+
+    @property
+    def signal_name(self):
+        return SIGNAL_NAMES[self.signal]
+
+    @property
+    def degraded(self):
+        """Tahmin eksik modellerle üretildi"""
+        return self.dropped != 0
+
+    @property
+    def reason_name(self):
+        return REASON_NAMES[self.reason]
+
+    def as_tuple(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def as_array(self):
+        """Tek satırlık DECISION_DTYPE dizisi (kontrol noktası)"""
+        return np.array([self.as_tuple()], dtype=DECISION_DTYPE)
+
+    @classmethod
+    def from_row(cls, row):
+        """DECISION_DTYPE satırından kaydı geri kur"""
+        record = cls()
+        for name in cls.__slots__:
+            setattr(record, name, row[name].item())
+        return record
+
+    def as_dict(self):
+        """Loglama/API için okunur sözlük"""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values['raw_signal'] = SIGNAL_NAMES[self.raw_signal]
+        values['signal'] = self.signal_name
+        values['reason'] = self.reason_name
+        values['filters'] = filter_names(self.filters)
+        values['evaluated'] = filter_names(self.evaluated)
+        return values
+
+    def __repr__(self):
+        return (f"DecisionRecord(signal={self.signal_name}, quantity={self.quantity:.4f}, "
+                f"notional={self.notional:.2f}, reason={self.reason_name}, filters={filter_names(self.filters)})")
+
+
+class DecisionLog:
+    """Sabit kapasiteli halka tampon: son kararlar tek bir yapılı dizide"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.records = np.zeros(capacity, dtype=DECISION_DTYPE)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, record):
+        self.records[self._next] = record.as_tuple()
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def to_array(self):
+        """Eskiden yeniye sıralı kopya"""
+        if self._count < self.capacity:
+            return self.records[:self._count].copy()
+        return np.concatenate([self.records[self._next:], self.records[:self._next]])
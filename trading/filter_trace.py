@@ -0,0 +1,78 @@
+import numpy as np
+from config.loader import get_config
+from trading.decision import FILTER_NAMES, SIGNAL_HOLD
+from utils.metrics import get_metrics
+
+FILTER_BITS = np.array(list(FILTER_NAMES), dtype=np.uint16)
+
+
+def filter_counts(masks):
+    """Bit maskesi dizisinde her filtrenin kaç kez işaretlendiği (FILTER_NAMES sırasıyla)"""
+    masks = np.asarray(masks, dtype=np.uint16)
+    return ((masks[:, None] & FILTER_BITS) != 0).sum(axis=0)
+
+
+class FilterTrace:
+    """Filtre kararlarının zaman içindeki toplamları
+
+    Her dakikanın DecisionRecord'u (veya backtest'te DECISION_DTYPE dizisi)
+    sayaçlara eklenir: filtre kaç kez çalıştı, kaç işlem sinyalini durdurdu.
+    FILTER_TRACE_ENABLED kapalıyken observe() hiçbir şey yapmaz.
+    """
+
+    def __init__(self, config=None):
+        self.params = config or get_config()
+        self.enabled = self.params.FILTER_TRACE_ENABLED
+        self.reset()
+
+    def reset(self):
+        self.minutes = 0
+        self.raw_trades = 0  # Filtrelerden önce al/sat olan dakikalar
+        self.passed = 0  # Tüm filtrelerden geçen dakikalar
+        self.evaluated_counts = np.zeros(len(FILTER_BITS), dtype=np.int64)
+        self.veto_counts = np.zeros(len(FILTER_BITS), dtype=np.int64)
+
+    def observe(self, record):
+        """Dakikalık kararı sayaçlara ekle"""
+        if not self.enabled:
+            return
+        self.minutes += 1
+        self.raw_trades += record.raw_signal != SIGNAL_HOLD
+        self.passed += record.signal != SIGNAL_HOLD
+        if record.evaluated:
+            self.evaluated_counts += (record.evaluated & FILTER_BITS) != 0
+        if record.filters:
+            self.veto_counts += (record.filters & FILTER_BITS) != 0
+
+    def observe_batch(self, decisions):
+        """Backtest karar dizisini sayaçlara ekle"""
+        if not self.enabled:
+            return
+        self.minutes += len(decisions)
+        self.raw_trades += int(np.count_nonzero(decisions['raw_signal'] != SIGNAL_HOLD))
+        self.passed += int(np.count_nonzero(decisions['signal'] != SIGNAL_HOLD))
+        self.evaluated_counts += filter_counts(decisions['evaluated'])
+        self.veto_counts += filter_counts(decisions['filters'])
+
+    def summary(self):
+        """Filtre bazında çalışma/veto sayıları ve veto oranı"""
+        filters = {}
+        for i, name in enumerate(FILTER_NAMES.values()):
+            evaluated = int(self.evaluated_counts[i])
+            vetoed = int(self.veto_counts[i])
+            filters[name] = {
+                'evaluated': evaluated,
+                'vetoed': vetoed,
+                'veto_rate': vetoed / evaluated if evaluated else 0.0,
+            }
+        return {
+            'minutes': self.minutes,
+            'raw_trades': int(self.raw_trades),
+            'passed': int(self.passed),
+            'filters': filters,
+        }
+
+    def publish(self):
+        """Özeti metrik kayıt defterine yaz"""
+        if self.enabled:
+            get_metrics().publish('filter_trace', self.summary())
@@ -0,0 +1,294 @@
+import os
+import logging
+import numpy as np
+from config.loader import get_config
+
+# Olay tipleri
+EVENT_OPEN = 1
+EVENT_CLOSE = 2
+
+# Pozisyon yönü
+LONG = 1
+SHORT = -1
+
+LEDGER_MAGIC = b'MTLEDG01'
+
+# Diskteki sabit genişlikli kayıt; bellekte her alan ayrı bir dizidir (sütunsal)
+RECORD_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('event', 'i1'),
+    ('side', 'i1'),
+    ('token_id', '<i4'),
+    ('position_id', '<i8'),
+    ('qty', '<f8'),
+    ('price', '<f8'),
+    ('fee', '<f8'),
+])
+
+
+class LedgerError(Exception):
+    """Ledger dosyası okunamadı veya bozuk"""
+
+
+class TradeLedger:
+    """Yalnızca eklemeli, sütunsal işlem günlüğü
+
+    Her olay diske sabit genişlikli bir kayıt olarak eklenir; yeniden başlatmada
+    dosya tek okumayla NumPy dizilerine açılır. Pozisyon numaraları 0'dan
+    ardışık verilir, böylece analizler doğrudan dizi indekslemesiyle yapılır.
+    """
+
+    def __init__(self, path=None, config=None, initial_capacity=1024):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('trade_ledger')
+        self.path = path
+        self.next_position_id = 0
+        self._size = 0
+        self._columns = {
+            name: np.empty(initial_capacity, dtype=RECORD_DTYPE[name])
+            for name in RECORD_DTYPE.names
+        }
+        self._file = None
+
+        if path:
+            self._replay()
+            self._file = open(path, 'ab')
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, size):
+        """Kapasite yetmiyorsa sütunları iki katına büyüt"""
+        capacity = len(self._columns['ts'])
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _replay(self):
+        """Günlük dosyasını tek seferde belleğe yükle"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'wb') as f:
+                f.write(LEDGER_MAGIC)
+            return
+
+        with open(self.path, 'rb') as f:
+            if f.read(len(LEDGER_MAGIC)) != LEDGER_MAGIC:
+                raise LedgerError(f"Geçersiz ledger dosyası: {self.path}")
+            raw = f.read()
+
+        n = len(raw) // RECORD_DTYPE.itemsize
+        if len(raw) % RECORD_DTYPE.itemsize:
+            # Yarım kalmış son yazım: kaydı at, dosyayı hizala
+            self.logger.warning(f"Ledger sonunda yarım kayıt atlandı: {self.path}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(len(LEDGER_MAGIC) + n * RECORD_DTYPE.itemsize)
+
+        records = np.frombuffer(raw, dtype=RECORD_DTYPE, count=n)
+        self._reserve(n)
+        for name in RECORD_DTYPE.names:
+            self._columns[name][:n] = records[name]
+        self._size = n
+
+        opens = records['event'] == EVENT_OPEN
+        if opens.any():
+            self.next_position_id = int(records['position_id'][opens].max()) + 1
+
+        self.logger.info(f"Ledger yüklendi: {n} olay ({self.path})")
+
+    def append(self, ts, event, position_id, token_id, side, qty, price, fee=0.0):
+        """Olayı önce diske, sonra belleğe ekle; olay indeksini döndür"""
+        record = np.array(
+            [(ts, event, side, token_id, position_id, qty, price, fee)], dtype=RECORD_DTYPE
+        )
+        if self._file is not None:
+            self._file.write(record.tobytes())
+            self._file.flush()
+
+        self._reserve(self._size + 1)
+        for name in RECORD_DTYPE.names:
+            self._columns[name][self._size] = record[name][0]
+        self._size += 1
+
+        if event == EVENT_OPEN:
+            self.next_position_id = max(self.next_position_id, int(position_id) + 1)
+        return self._size - 1
+
+    def column(self, name):
+        """Bir sütunun salt okunur görünümü"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def close(self):
+        """Dosyayı kapat"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LedgerAnalytics:
+    """Ledger üzerinde vektörel PnL, drawdown, pozisyon büyüklüğü (exposure) ve turnover"""
+
+    def __init__(self, ledger, config=None):
+        self.ledger = ledger
+        self.config = config or get_config()
+
+    def position_table(self):
+        """Pozisyon numarasına göre indekslenmiş giriş bilgileri ve kalan miktar"""
+        ledger = self.ledger
+        event = ledger.column('event')
+        position_id = ledger.column('position_id')
+        qty = ledger.column('qty')
+
+        opens = event == EVENT_OPEN
+        closes = event == EVENT_CLOSE
+        n_positions = ledger.next_position_id
+
+        table = {
+            'token_id': np.zeros(n_positions, dtype=np.int32),
+            'side': np.zeros(n_positions, dtype=np.int8),
+            'qty': np.zeros(n_positions),
+            'entry_price': np.zeros(n_positions),
+            'entry_ts': np.zeros(n_positions, dtype=np.int64),
+        }
+        open_ids = position_id[opens]
+        table['token_id'][open_ids] = ledger.column('token_id')[opens]
+        table['side'][open_ids] = ledger.column('side')[opens]
+        table['qty'][open_ids] = qty[opens]
+        table['entry_price'][open_ids] = ledger.column('price')[opens]
+        table['entry_ts'][open_ids] = ledger.column('ts')[opens]
+
+        closed_qty = np.bincount(position_id[closes], weights=qty[closes], minlength=n_positions)
+        table['remaining'] = table['qty'] - closed_qty[:n_positions]
+        return table
+
+    def event_pnl(self, table=None):
+        """Olay başına net gerçekleşmiş PnL (kapanışlarda brüt kar/zarar, her olayda komisyon)"""
+        ledger = self.ledger
+        table = table if table is not None else self.position_table()
+        event = ledger.column('event')
+        closes = event == EVENT_CLOSE
+
+        pnl = -ledger.column('fee').astype(np.float64)
+        close_ids = ledger.column('position_id')[closes]
+        pnl[closes] += (
+            table['side'][close_ids] * ledger.column('qty')[closes]
+            * (ledger.column('price')[closes] - table['entry_price'][close_ids])
+        )
+        return pnl
+
+    def unrealized_pnl(self, marks, table=None):
+        """Açık pozisyonların güncel fiyatlarla ({token_id: fiyat}) gerçekleşmemiş PnL'i"""
+        table = table if table is not None else self.position_table()
+        mark = np.full(len(table['side']), np.nan)
+        for token_id, price in marks.items():
+            mark[table['token_id'] == token_id] = price
+
+        open_mask = (table['remaining'] > 1e-12) & ~np.isnan(mark)
+        pnl = table['side'] * table['remaining'] * (mark - table['entry_price'])
+        return float(pnl[open_mask].sum())
+
+    def mark_to_market(self, token_id, bar_ts, bar_close):
+        """Bar zaman damgalarında net pozisyon, toplam pozisyon değeri ve PnL eğrisi
+
+        Nakit ve pozisyon değişimleri kümülatif toplanır; her bar için son olay
+        searchsorted ile bulunur. PnL = nakit + net_pozisyon * kapanış.
+        """
+        ledger = self.ledger
+        mask = ledger.column('token_id') == token_id
+        ts = ledger.column('ts')[mask]
+        order = np.argsort(ts, kind='stable')
+        ts = ts[order]
+
+        direction = np.where(ledger.column('event')[mask] == EVENT_OPEN, 1.0, -1.0)[order]
+        qty = ledger.column('qty')[mask][order]
+        signed = ledger.column('side')[mask][order] * qty * direction
+
+        position = np.cumsum(signed)
+        gross = np.cumsum(qty * direction)
+        cash = np.cumsum(-signed * ledger.column('price')[mask][order] - ledger.column('fee')[mask][order])
+
+        bar_ts = np.asarray(bar_ts, dtype=np.int64)
+        bar_close = np.asarray(bar_close, dtype=np.float64)
+        idx = np.searchsorted(ts, bar_ts, side='right') - 1
+        valid = idx >= 0
+        idx = np.clip(idx, 0, None)
+
+        def at_bars(values):
+            if len(values) == 0:
+                return np.zeros(len(bar_ts))
+            return np.where(valid, values[idx], 0.0)
+
+        net_position = at_bars(position)
+        pnl = at_bars(cash) + net_position * bar_close
+        return {
+            'position': net_position,
+            'exposure': at_bars(gross) * bar_close,
+            'pnl': pnl,
+            'equity': self.config.INITIAL_CAPITAL + pnl,
+        }
+
+    @staticmethod
+    def drawdown(equity):
+        """Zirveden düşüş serisi (oran) ve maksimum drawdown"""
+        equity = np.asarray(equity, dtype=np.float64)
+        if len(equity) == 0:
+            return np.zeros(0), 0.0
+        peak = np.maximum.accumulate(equity)
+        drawdown = np.where(peak > 0, (equity - peak) / peak, 0.0)
+        return drawdown, float(-drawdown.min())
+
+    def turnover(self, period_seconds=86400):
+        """Dönem başına işlem hacminin sermayeye oranı: (dönem başlangıçları, turnover)"""
+        ts = self.ledger.column('ts')
+        if len(ts) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        notional = self.ledger.column('qty') * self.ledger.column('price')
+        periods = ts // period_seconds
+        first = periods.min()
+        per_period = np.bincount(periods - first, weights=notional)
+        starts = (np.arange(len(per_period)) + first) * period_seconds
+        return starts, per_period / self.config.INITIAL_CAPITAL
+
+    def summary(self, marks=None):
+        """Tüm günlüğün özet istatistikleri"""
+        ledger = self.ledger
+        table = self.position_table()
+        pnl = self.event_pnl(table)
+        closes = ledger.column('event') == EVENT_CLOSE
+        close_pnl = pnl[closes]
+
+        # Gerçekleşmiş özsermaye eğrisi olay sırasıyla
+        equity = self.config.INITIAL_CAPITAL + np.cumsum(pnl)
+        _, max_drawdown = self.drawdown(equity)
+
+        open_mask = table['remaining'] > 1e-12
+        notional = float((ledger.column('qty') * ledger.column('price')).sum())
+        exposure = 0.0
+        unrealized = 0.0
+        if marks:
+            unrealized = self.unrealized_pnl(marks, table)
+            mark = np.zeros(len(table['side']))
+            for token_id, price in marks.items():
+                mark[table['token_id'] == token_id] = price
+            exposure = float((table['remaining'][open_mask] * mark[open_mask]).sum())
+
+        return {
+            'events': len(ledger),
+            'closed_trades': int(closes.sum()),
+            'open_positions': int(open_mask.sum()),
+            'realized_pnl': float(pnl.sum()),
+            'unrealized_pnl': unrealized,
+            'fees': float(ledger.column('fee').sum()),
+            'win_rate': float((close_pnl > 0).mean()) if len(close_pnl) else None,
+            'max_drawdown': max_drawdown,
+            'exposure': exposure,
+            'notional_traded': notional,
+            'turnover': notional / self.config.INITIAL_CAPITAL,
+        }
@@ -1,76 +1,160 @@
+import time
 import logging
-from datetime import datetime
-from config.trading_params import TradingParams
+from datetime import datetime, timezone
+from config.loader import get_config
+from trading.ledger import TradeLedger, LedgerAnalytics, EVENT_OPEN, EVENT_CLOSE, LONG, SHORT
+from trading.decision import SIGNAL_BUY, SIGNAL_SELL
+from utils.metrics import get_metrics
 
 
 class PositionManager:
-    def __init__(self):
-        self.params = TradingParams()
+    def __init__(self, config=None, ledger=None):
+        self.params = config or get_config()
         self.logger = logging.getLogger('position_manager')
-        self.current_position = None
-        self.entry_price = None
-        self.entry_time = None
+        self.token_id = self.params.TOKEN_ID
 
-    def execute_signal(self, signal, current_price):
-        """Sinyali işleme al"""
+        # Tüm açılış/kapanışlar ledger'a yazılır; durum yeniden başlatmada oradan kurulur
+        self.ledger = ledger if ledger is not None else TradeLedger(self.params.LEDGER_PATH, self.params)
+        self.analytics = LedgerAnalytics(self.ledger, self.params)
+        self.open_positions = {}  # position_id -> pozisyon bilgisi
+        self._summary = None
+        self._summary_events = -1
+        self._restore()
+
+    def _restore(self):
+        """Açık pozisyonları ledger'dan geri yükle"""
+        table = self.analytics.position_table()
+        for position_id in (table['remaining'] > 1e-12).nonzero()[0]:
+            self.open_positions[int(position_id)] = {
+                'token_id': int(table['token_id'][position_id]),
+                'side': int(table['side'][position_id]),
+                'qty': float(table['remaining'][position_id]),
+                'entry_price': float(table['entry_price'][position_id]),
+                'entry_ts': int(table['entry_ts'][position_id]),
+            }
+
+        if len(self.ledger):
+            self.logger.info(
+                f"Ledger'dan {len(self.open_positions)} açık pozisyon geri yüklendi ({len(self.ledger)} olay)"
+            )
+
+    def execute_signal(self, signal, current_price, timestamp=None, quantity=1.0, token_id=None):
+        """Sinyali (int8 kod) işleme al"""
         try:
-            if signal == 'buy' and self.current_position != 'long':
-                self._open_long_position(current_price)
-            elif signal == 'sell' and self.current_position != 'short':
-                self._open_short_position(current_price)
-            elif signal == 'hold':
-                # Mevcut pozisyonu koru
-                pass
+            token_id = self.token_id if token_id is None else token_id
+            timestamp = int(timestamp if timestamp is not None else time.time())
+
+            if signal == SIGNAL_BUY:
+                self._enter(LONG, current_price, timestamp, quantity, token_id)
+            elif signal == SIGNAL_SELL:
+                self._enter(SHORT, current_price, timestamp, quantity, token_id)
+            # SIGNAL_HOLD: mevcut pozisyonu koru
+
+            self.publish_metrics({token_id: current_price})
 
         except Exception as e:
             self.logger.error(f"Sinyal işleme hatası: {e}")
 
-    def _open_long_position(self, price):
-        """Long pozisyon aç"""
-        self._close_current_position(price)
-
-        self.current_position = 'long'
-        self.entry_price = price
-        self.entry_time = datetime.now()
+    def execute_decision(self, record, token_id=None):
+        """Risk kontrolünden geçmiş DecisionRecord'u uygula"""
+        self.execute_signal(record.signal, record.price, record.timestamp, record.quantity, token_id)
 
-        self.logger.info(f"LONG pozisyon açıldı: {price:.4f}")
+    def _enter(self, side, price, timestamp, quantity, token_id):
+        """Ters yöndeki pozisyonları kapat; limit dolmadıysa yeni pozisyon aç"""
+        same_side = 0
+        for position_id, position in list(self.open_positions.items()):
+            if position['token_id'] != token_id:
+                continue
+            if position['side'] == side:
+                same_side += 1
+            else:
+                self._close_position(position_id, price, timestamp)
 
-    def _open_short_position(self, price):
-        """Short pozisyon aç"""
-        self._close_current_position(price)
+        if same_side < self.params.MAX_POSITIONS_PER_TOKEN:
+            self._open_position(side, price, timestamp, quantity, token_id)
 
-        self.current_position = 'short'
-        self.entry_price = price
-        self.entry_time = datetime.now()
+    def _open_position(self, side, price, timestamp, quantity, token_id):
+        """Yeni pozisyon aç ve ledger'a yaz"""
+        position_id = self.ledger.next_position_id
+        fee = quantity * price * self.params.TRADE_FEE_RATE
+        self.ledger.append(timestamp, EVENT_OPEN, position_id, token_id, side, quantity, price, fee)
 
-        self.logger.info(f"SHORT pozisyon açıldı: {price:.4f}")
+        self.open_positions[position_id] = {
+            'token_id': token_id,
+            'side': side,
+            'qty': quantity,
+            'entry_price': price,
+            'entry_ts': timestamp,
+        }
+        self.logger.info(f"{self._side_name(side).upper()} pozisyon açıldı (#{position_id}): {price:.4f}")
 
-    def _close_current_position(self, current_price):
-        """Mevcut pozisyonu kapat"""
-        if self.current_position and self.entry_price:
-            pnl = self._calculate_pnl(current_price)
-            self.logger.info(f"{self.current_position.upper()} pozisyon kapatıldı. PnL: {pnl:.4f}")
+    def _close_position(self, position_id, price, timestamp):
+        """Pozisyonu kapat ve ledger'a yaz"""
+        position = self.open_positions.pop(position_id)
+        fee = position['qty'] * price * self.params.TRADE_FEE_RATE
+        self.ledger.append(
+            timestamp, EVENT_CLOSE, position_id, position['token_id'], position['side'],
+            position['qty'], price, fee
+        )
 
-        self.current_position = None
-        self.entry_price = None
-        self.entry_time = None
+        pnl = position['side'] * position['qty'] * (price - position['entry_price']) - fee
+        self.logger.info(f"{self._side_name(position['side']).upper()} pozisyon kapatıldı (#{position_id}). PnL: {pnl:.4f}")
 
-    def _calculate_pnl(self, current_price):
-        """Kar/zarar hesapla"""
-        if not self.entry_price:
-            return 0
+    def close_all(self, current_price, timestamp=None, token_id=None):
+        """Token'ın tüm açık pozisyonlarını kapat"""
+        token_id = self.token_id if token_id is None else token_id
+        timestamp = int(timestamp if timestamp is not None else time.time())
+        for position_id, position in list(self.open_positions.items()):
+            if position['token_id'] == token_id:
+                self._close_position(position_id, current_price, timestamp)
 
-        if self.current_position == 'long':
-            return current_price - self.entry_price
-        elif self.current_position == 'short':
-            return self.entry_price - current_price
-        else:
-            return 0
+    @staticmethod
+    def _side_name(side):
+        return 'long' if side == LONG else 'short'
 
-    def get_position_info(self):
+    def get_position_info(self, token_id=None):
         """Pozisyon bilgilerini döndür"""
+        token_id = self.token_id if token_id is None else token_id
+        positions = [p for p in self.open_positions.values() if p['token_id'] == token_id]
+        if not positions:
+            return {'position': None, 'entry_price': None, 'entry_time': None, 'quantity': 0.0, 'open_positions': 0}
+
+        # Ters yöndekiler açılışta kapatıldığı için bir token'da tek yön vardır
+        quantity = sum(p['qty'] for p in positions)
         return {
-            'position': self.current_position,
-            'entry_price': self.entry_price,
-            'entry_time': self.entry_time
-        }
\ No newline at end of file
+            'position': self._side_name(positions[0]['side']),
+            'entry_price': sum(p['qty'] * p['entry_price'] for p in positions) / quantity,
+            'entry_time': datetime.fromtimestamp(min(p['entry_ts'] for p in positions), tz=timezone.utc),
+            'quantity': quantity,
+            'open_positions': len(positions),
+        }
+
+    def get_analytics(self, marks=None):
+        """Ledger özet istatistikleri (marks: {token_id: güncel fiyat})"""
+        return self.analytics.summary(marks)
+
+    def get_equity(self, marks=None):
+        """Başlangıç sermayesi + gerçekleşmiş + gerçekleşmemiş PnL"""
+        summary = self._current_summary(marks or {})
+        return self.params.INITIAL_CAPITAL + summary['realized_pnl'] + summary['unrealized_pnl']
+
+    def _current_summary(self, marks):
+        """Önbelleklenmiş günlük özeti + açık pozisyonların güncel değerleri"""
+        # Günlük özeti sadece yeni olay eklendiyse yeniden hesaplanır; açık
+        # pozisyon değerleri her dakika küçük sözlük üzerinden güncellenir
+        if self._summary_events != len(self.ledger):
+            self._summary = self.get_analytics()
+            self._summary_events = len(self.ledger)
+
+        summary = dict(self._summary)
+        marked = [(p, marks[p['token_id']]) for p in self.open_positions.values() if p['token_id'] in marks]
+        summary['unrealized_pnl'] = sum(p['side'] * p['qty'] * (price - p['entry_price']) for p, price in marked)
+        summary['exposure'] = sum(p['qty'] * price for p, price in marked)
+        return summary
+
+    def publish_metrics(self, marks):
+        """Pozisyon özetini metrik kayıt defterine yaz"""
+        summary = self._current_summary(marks)
+        summary.update(self.get_position_info())
+        summary['entry_time'] = str(summary['entry_time']) if summary['entry_time'] else None
+        get_metrics().publish('positions', summary)
@@ -0,0 +1,103 @@
+import math
+import logging
+import numpy as np
+from config.loader import get_config
+from trading.decision import (
+    DecisionRecord, DECISION_DTYPE, SIGNAL_HOLD, FILTER_SIZING,
+    REASON_OK, REASON_HOLD, REASON_NO_ATR, REASON_BELOW_MIN, REASON_CAPPED
+)
+
+
+class PositionSizer:
+    """ATR tabanlı, volatiliteye duyarlı pozisyon boyutlandırma
+
+    Stop mesafesi ATR_STOP_MULTIPLIER * ATR'dir; stop'a ulaşıldığında kayıp
+    özsermaye * RISK_PER_TRADE olacak şekilde miktar seçilir. Nominal değer
+    [MIN_POSITION_SIZE, MAX_POSITION_SIZE] ve özsermaye ile sınırlanır;
+    minimumun altındaki işlemler yapılmaz.
+    """
+
+    def __init__(self, config=None):
+        self.params = config or get_config()
+        self.logger = logging.getLogger('position_sizer')
+
+    def size(self, signal, price, atr, equity=None, record=None):
+        """Tek bir karar (dakikalık yol); sonucu DecisionRecord'a yazar"""
+        if record is None:
+            record = DecisionRecord(price=price)
+            record.raw_signal = signal
+        record.signal = signal
+
+        if signal == SIGNAL_HOLD:
+            return record.veto(REASON_HOLD)
+
+        equity = self.params.INITIAL_CAPITAL if equity is None else equity
+        stop_distance = self.params.ATR_STOP_MULTIPLIER * atr
+        if not (stop_distance > 0 and price > 0) or math.isnan(stop_distance):
+            return record.veto(REASON_NO_ATR, FILTER_SIZING)
+
+        risk_amount = equity * self.params.RISK_PER_TRADE
+        notional = risk_amount / stop_distance * price
+
+        reason = REASON_OK
+        cap = min(self.params.MAX_POSITION_SIZE, equity)
+        if notional > cap:
+            notional = cap
+            reason = REASON_CAPPED
+        if notional < self.params.MIN_POSITION_SIZE:
+            return record.veto(REASON_BELOW_MIN, FILTER_SIZING)
+
+        record.quantity = notional / price
+        record.notional = notional
+        record.stop_distance = stop_distance
+        record.risk_amount = record.quantity * stop_distance
+        record.reason = reason
+        return record
+
+    def size_batch(self, signals, prices, atrs, equities=None, out=None):
+        """Çok token/bar için vektörel boyutlandırma (backtest yolu)
+
+        signals: int8 sinyal kodları. size() ile aynı kuralları uygular; sonuçları
+        DECISION_DTYPE dizisine (out verilmezse yeni dizi) yazar.
+        """
+        signals = np.asarray(signals, dtype=np.int8)
+        prices = np.asarray(prices, dtype=np.float64)
+        atrs = np.asarray(atrs, dtype=np.float64)
+        if equities is None:
+            equities = np.full(len(prices), self.params.INITIAL_CAPITAL)
+        equities = np.broadcast_to(np.asarray(equities, dtype=np.float64), prices.shape)
+
+        if out is None:
+            out = np.zeros(len(prices), dtype=DECISION_DTYPE)
+            out['price'] = prices
+            out['raw_signal'] = signals
+        out['reason'] = REASON_HOLD
+        out['signal'] = SIGNAL_HOLD
+        out['quantity'] = 0.0
+        out['notional'] = 0.0
+        out['risk_amount'] = 0.0
+
+        stop_distance = self.params.ATR_STOP_MULTIPLIER * atrs
+        active = signals != SIGNAL_HOLD
+        valid = active & (stop_distance > 0) & (prices > 0)  # NaN karşılaştırmaları False
+        out['reason'][active & ~valid] = REASON_NO_ATR
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            risk_amount = equities * self.params.RISK_PER_TRADE
+            notional = risk_amount / stop_distance * prices
+
+        cap = np.minimum(self.params.MAX_POSITION_SIZE, equities)
+        capped = valid & (notional > cap)
+        notional = np.where(capped, cap, notional)
+        below = valid & (notional < self.params.MIN_POSITION_SIZE)
+        trade = valid & ~below
+
+        out['reason'][below] = REASON_BELOW_MIN
+        out['filters'][active & ~trade] |= FILTER_SIZING
+        out['reason'][trade] = np.where(capped[trade], REASON_CAPPED, REASON_OK)
+        out['signal'][trade] = signals[trade]
+        out['notional'][trade] = notional[trade]
+        out['quantity'][trade] = notional[trade] / prices[trade]
+        out['stop_distance'][trade] = stop_distance[trade]
+        out['risk_amount'][trade] = out['quantity'][trade] * stop_distance[trade]
+        return out
@@ -1,33 +1,66 @@
+import time
 import logging
-from config.trading_params import TradingParams
+import numpy as np
+from config.loader import get_config
+from trading.decision import (
+    SIGNAL_HOLD, REASON_ERROR, REASON_HOLD, REASON_OVERTRADING, REASON_STOP_LOSS,
+    FILTER_STOP_LOSS, FILTER_SIZING, FILTER_OVERTRADING
+)
+from trading.position_sizing import PositionSizer
 
 
 class RiskManager:
-    def __init__(self):
-        self.params = TradingParams()
+    def __init__(self, config=None):
+        self.params = config or get_config()
         self.logger = logging.getLogger('risk_manager')
-        self.last_positions = []  # Son pozisyonları takip et
-
-    def apply_risk_controls(self, signal, features_df):
-        """Risk kontrolleri uygula"""
+        # Son 4 sinyal (int8 halka tampon) - aşırı işlem kontrolü için
+        self.last_signals = np.zeros(4, dtype=np.int8)
+        self._signal_count = 0
+        self.sizer = PositionSizer(self.params)
+        self.trace_enabled = self.params.FILTER_TRACE_ENABLED
+
+    def state_dict(self):
+        """Kontrol noktası için aşırı işlem tamponu"""
+        return {'last_signals': self.last_signals.copy(), 'signal_count': self._signal_count}
+
+    def load_state(self, state):
+        self.last_signals = np.array(state['last_signals'], dtype=np.int8)
+        self._signal_count = int(state['signal_count'])
+
+    def apply_risk_controls(self, record, features_df, equity=None):
+        """Risk kontrolleri uygula; sinyal, miktar ve gerekçeyi DecisionRecord'a yaz"""
+        started = time.perf_counter()
         try:
-            if signal == 'hold':
-                return signal
+            signal = record.signal
+            if signal == SIGNAL_HOLD:
+                return record.veto(REASON_HOLD)
 
             # Stop loss kontrolü
+            if self.trace_enabled and 'atr_14' in features_df.columns:
+                record.evaluated |= FILTER_STOP_LOSS
             controlled_signal = self._stop_loss_control(signal, features_df)
+            if controlled_signal == SIGNAL_HOLD:
+                self._overtrading_control(SIGNAL_HOLD)
+                return record.veto(REASON_STOP_LOSS, FILTER_STOP_LOSS)
 
             # Pozisyon büyüklüğü kontrolü
-            final_signal = self._position_size_control(controlled_signal, features_df)
+            if self.trace_enabled:
+                record.evaluated |= FILTER_SIZING | FILTER_OVERTRADING
+            self._position_size_control(record, features_df, equity)
 
             # Aşırı işlem kontrolü
-            final_signal = self._overtrading_control(final_signal)
+            if self._overtrading_control(record.signal) != record.signal:
+                return record.veto(REASON_OVERTRADING, FILTER_OVERTRADING)
 
-            return final_signal
+            self.logger.info(f"Risk kararı: {record}")
+            return record
 
         except Exception as e:
             self.logger.error(f"Risk kontrol hatası: {e}")
-            return 'hold'
+            return record.veto(REASON_ERROR)
+
+        finally:
+            record.risk_ms = (time.perf_counter() - started) * 1000
 
     def _stop_loss_control(self, signal, features_df):
         """Stop loss kontrolü"""
@@ -37,13 +70,13 @@ class RiskManager:
                 atr = features_df['atr_14'].iloc[-1]
                 current_price = features_df['close'].iloc[-1]
 
-                # ATR'nin %200'ü kadar stop loss
-                stop_distance = atr * 2
+                # ATR'nin ATR_STOP_MULTIPLIER katı kadar stop loss
+                stop_distance = atr * self.params.ATR_STOP_MULTIPLIER
                 stop_percentage = stop_distance / current_price
 
                 if stop_percentage > self.params.STOP_LOSS_THRESHOLD:
                     self.logger.warning(f"Yüksek risk: {stop_percentage:.3f} > {self.params.STOP_LOSS_THRESHOLD}")
-                    return 'hold'
+                    return SIGNAL_HOLD
 
             return signal
 
@@ -51,27 +84,78 @@ class RiskManager:
             self.logger.error(f"Stop loss kontrol hatası: {e}")
             return signal
 
-    def _position_size_control(self, signal, features_df):
-        """Pozisyon büyüklüğü kontrolü"""
-        # Bu örnek implementasyonda sadece sinyali döndürüyoruz
-        # Gerçek uygulamada pozisyon büyüklüğü hesaplanabilir
-        return signal
+    def _position_size_control(self, record, features_df, equity=None):
+        """Pozisyon büyüklüğü kontrolü: ATR, özsermaye ve risk bütçesinden miktar"""
+        atr = features_df['atr_14'].iloc[-1] if 'atr_14' in features_df.columns else float('nan')
+        current_price = features_df['close'].iloc[-1]
+        record.price = float(current_price)
+        return self.sizer.size(record.signal, float(current_price), float(atr), equity, record)
 
     def _overtrading_control(self, signal):
         """Aşırı işlem kontrolü"""
-        # Son 5 sinyali kontrol et
-        self.last_positions.append(signal)
-        if len(self.last_positions) > 5:
-            self.last_positions.pop(0)
-
-        # Son 5 işlemde 4'ü aynı yönde ise dur
-        if len(self.last_positions) >= 4:
-            recent_signals = self.last_positions[-4:]
-            if recent_signals.count('buy') >= 3 and signal == 'buy':
-                self.logger.warning("Aşırı alım, sinyal iptal edildi")
-                return 'hold'
-            elif recent_signals.count('sell') >= 3 and signal == 'sell':
-                self.logger.warning("Aşırı satım, sinyal iptal edildi")
-                return 'hold'
-
-        return signal
\ No newline at end of file
+        # Son 4 sinyali halka tamponda tut
+        self.last_signals[self._signal_count % 4] = signal
+        self._signal_count += 1
+
+        # Son 4 işlemde en az 3'ü aynı yönde ise dur
+        if self._signal_count >= 4 and signal != SIGNAL_HOLD:
+            if np.count_nonzero(self.last_signals == signal) >= 3:
+                self.logger.warning("Aşırı alım, sinyal iptal edildi" if signal > 0 else "Aşırı satım, sinyal iptal edildi")
+                return SIGNAL_HOLD
+
+        return signal
+
+    def apply_risk_controls_batch(self, decisions, features_df, equities=None):
+        """Backtest için vektörel risk kontrolü (generate_signals_batch çıktısı üzerinde)
+
+        Dakikalık yolla aynı sırayı izler: stop loss, boyutlandırma, aşırı işlem.
+        Aşırı işlem kontrolü yeni bir RiskManager'ın boş geçmişiyle başlar.
+        """
+        signals = decisions['signal'].copy()
+        close = features_df['close'].to_numpy(dtype=np.float64)
+        active = signals != SIGNAL_HOLD
+
+        # Stop loss
+        stopped = np.zeros(len(signals), dtype=bool)
+        if 'atr_14' in features_df.columns:
+            atr = features_df['atr_14'].to_numpy(dtype=np.float64)
+            if self.trace_enabled:
+                decisions['evaluated'][active] |= FILTER_STOP_LOSS
+            with np.errstate(invalid='ignore', divide='ignore'):
+                stopped = active & (atr * self.params.ATR_STOP_MULTIPLIER / close > self.params.STOP_LOSS_THRESHOLD)
+        else:
+            atr = np.full(len(signals), np.nan)
+
+        # Boyutlandırma (stop loss'tan geçenler)
+        sized_rows = active & ~stopped
+        if self.trace_enabled:
+            decisions['evaluated'][sized_rows] |= FILTER_SIZING | FILTER_OVERTRADING
+        sized = decisions[sized_rows]
+        self.sizer.size_batch(signals[sized_rows], close[sized_rows], atr[sized_rows],
+                              None if equities is None
+                              else np.broadcast_to(np.asarray(equities, dtype=np.float64), signals.shape)[sized_rows],
+                              out=sized)
+        decisions[sized_rows] = sized
+
+        # Aşırı işlem: kontrole giren sinyal dizisinde son 4'ün en az 3'ü aynı yönde
+        entering = np.where(stopped, SIGNAL_HOLD, decisions['signal'])[active].astype(np.int8)
+        padded = np.concatenate([np.full(3, 127, dtype=np.int8), entering])
+        windows = np.lib.stride_tricks.sliding_window_view(padded, 4)
+        same = (windows == entering[:, None]).sum(axis=1)
+        overtraded = (np.arange(len(entering)) >= 3) & (entering != SIGNAL_HOLD) & (same >= 3)
+
+        rows = np.flatnonzero(active)
+        vetoed = rows[overtraded]
+        decisions['filters'][vetoed] |= FILTER_OVERTRADING
+        decisions['reason'][vetoed] = REASON_OVERTRADING
+
+        stop_rows = rows[stopped[active]]
+        decisions['filters'][stop_rows] |= FILTER_STOP_LOSS
+        decisions['reason'][stop_rows] = REASON_STOP_LOSS
+
+        for rows_ in (vetoed, stop_rows):
+            decisions['signal'][rows_] = SIGNAL_HOLD
+            decisions['quantity'][rows_] = 0.0
+            decisions['notional'][rows_] = 0.0
+            decisions['risk_amount'][rows_] = 0.0
+        return decisions
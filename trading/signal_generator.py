@@ -1,70 +1,109 @@
+import time
 import logging
-from config.trading_params import TradingParams
+import numpy as np
+from config.loader import get_config
+from trading.decision import (
+    DecisionRecord, DECISION_DTYPE, signal_name, SIGNAL_BUY, SIGNAL_SELL, SIGNAL_HOLD,
+    REASON_OK, REASON_HOLD, FILTER_HIGH_VOLATILITY, FILTER_RSI, FILTER_MACD, FILTER_VOLUME
+)
 
 
 class SignalGenerator:
-    def __init__(self):
-        self.params = TradingParams()
+    def __init__(self, config=None):
+        self.params = config or get_config()
         self.logger = logging.getLogger('signal_generator')
+        self.trace_enabled = self.params.FILTER_TRACE_ENABLED
+
+    def generate_signal(self, prediction, features_df, market_condition, record=None):
+        """Al/sat sinyali üret; sonucu DecisionRecord olarak döndür"""
+        started = time.perf_counter()
+        if record is None:
+            record = DecisionRecord(regime=market_condition)
+        record.regime = market_condition
+        record.raw_signal = record.signal = SIGNAL_HOLD
+        record.reason = REASON_HOLD
 
-    def generate_signal(self, prediction, features_df, market_condition):
-        """Al/sat sinyali üret"""
         try:
             if prediction is None or len(features_df) == 0:
-                return 'hold'
+                return record
 
             # Mevcut fiyatı al
             current_price = features_df['close'].iloc[-1]
+            record.prediction = prediction
+            record.price = current_price
 
             # Fiyat değişimi yüzdesini hesapla
             price_change = (prediction - current_price) / current_price
 
             # Temel sinyal mantığı
             signal = self._basic_signal_logic(price_change)
+            record.raw_signal = signal
 
             # Piyasa durumuna göre sinyal filtreleme
-            filtered_signal = self._filter_by_market_condition(signal, features_df, market_condition)
+            filtered_signal = self._filter_by_market_condition(signal, features_df, market_condition, record)
 
             # Teknik indikatör filtreleme
-            final_signal = self._technical_filter(filtered_signal, features_df)
+            final_signal = self._technical_filter(filtered_signal, features_df, record)
 
-            self.logger.info(f"Sinyal üretimi - Değişim: {price_change:.4f}, Temel: {signal}, Final: {final_signal}")
+            record.signal = final_signal
+            record.reason = REASON_OK if final_signal != SIGNAL_HOLD else REASON_HOLD
 
-            return final_signal
+            self.logger.info(
+                f"Sinyal üretimi - Değişim: {price_change:.4f}, Temel: {signal_name(signal)}, Final: {record.signal_name}"
+            )
+            return record
 
         except Exception as e:
             self.logger.error(f"Sinyal üretimi hatası: {e}")
-            return 'hold'
+            record.signal = SIGNAL_HOLD
+            return record
+
+        finally:
+            record.signal_ms = (time.perf_counter() - started) * 1000
 
     def _basic_signal_logic(self, price_change):
         """Temel sinyal mantığı"""
         if price_change > self.params.MIN_MOVE:
-            return 'buy'
+            return SIGNAL_BUY
         elif price_change < -self.params.MIN_MOVE:
-            return 'sell'
+            return SIGNAL_SELL
         else:
-            return 'hold'
+            return SIGNAL_HOLD
+
+    def _evaluated(self, record, filter_bit):
+        """Filtrenin çalıştığını işaretle (iz kapalıysa hiçbir şey yapmaz)"""
+        if self.trace_enabled and record is not None:
+            record.evaluated |= filter_bit
 
-    def _filter_by_market_condition(self, signal, features_df, market_condition):
+    @staticmethod
+    def _veto(record, filter_bit, signal):
+        """Sinyali hold'a çevir; işlem sinyalini durduran filtreyi kaydet"""
+        if record is not None and signal != SIGNAL_HOLD:
+            record.filters |= filter_bit
+        return SIGNAL_HOLD
+
+    def _filter_by_market_condition(self, signal, features_df, market_condition, record=None):
         """Piyasa durumuna göre sinyal filtrele"""
         try:
             # Yüksek volatilite dönemlerinde daha temkinli ol
             if market_condition == 3:  # Yüksek volatilite
                 if 'atr_14' in features_df.columns:
+                    self._evaluated(record, FILTER_HIGH_VOLATILITY)
                     atr = features_df['atr_14'].iloc[-1]
                     if atr > features_df['atr_14'].mean() * 1.5:
                         # Çok yüksek volatilite, bekle
-                        return 'hold'
+                        return self._veto(record, FILTER_HIGH_VOLATILITY, signal)
 
             # Sideways piyasada daha sık işlem
             elif market_condition == 2:  # Sideways
                 # RSI ile kontrol
                 if 'rsi_7' in features_df.columns:
+                    self._evaluated(record, FILTER_RSI)
                     rsi = features_df['rsi_7'].iloc[-1]
-                    if signal == 'buy' and rsi > 70:
-                        return 'hold'  # Aşırı alım
-                    elif signal == 'sell' and rsi < 30:
-                        return 'hold'  # Aşırı satım
+                    if signal == SIGNAL_BUY and rsi > 70:
+                        return self._veto(record, FILTER_RSI, signal)  # Aşırı alım
+                    elif signal == SIGNAL_SELL and rsi < 30:
+                        return self._veto(record, FILTER_RSI, signal)  # Aşırı satım
 
             return signal
 
@@ -72,31 +111,104 @@ class SignalGenerator:
             self.logger.error(f"Market condition filter hatası: {e}")
             return signal
 
-    def _technical_filter(self, signal, features_df):
+    def _technical_filter(self, signal, features_df, record=None):
         """Teknik indikatör filtresi"""
         try:
             # MACD kontrolü
             if 'macd_hist' in features_df.columns:
+                self._evaluated(record, FILTER_MACD)
                 macd_hist = features_df['macd_hist'].iloc[-1]
 
-                if signal == 'buy' and macd_hist < 0:
+                if signal == SIGNAL_BUY and macd_hist < 0:
                     # MACD negatif iken al sinyali verme
-                    signal = 'hold'
-                elif signal == 'sell' and macd_hist > 0:
+                    signal = self._veto(record, FILTER_MACD, signal)
+                elif signal == SIGNAL_SELL and macd_hist > 0:
                     # MACD pozitif iken sat sinyali verme
-                    signal = 'hold'
+                    signal = self._veto(record, FILTER_MACD, signal)
 
             # Volume kontrolü
             if 'volumeTo' in features_df.columns:
+                self._evaluated(record, FILTER_VOLUME)
                 current_volume = features_df['volumeTo'].iloc[-1]
                 avg_volume = features_df['volumeTo'].tail(20).mean()
 
                 # Düşük volume'da işlem yapma
                 if current_volume < avg_volume * 0.5:
-                    signal = 'hold'
+                    signal = self._veto(record, FILTER_VOLUME, signal)
 
             return signal
 
         except Exception as e:
             self.logger.error(f"Technical filter hatası: {e}")
-            return signal
\ No newline at end of file
+            return signal
+
+    def generate_signals_batch(self, predictions, features_df, market_conditions, out=None):
+        """Backtest için vektörel sinyal üretimi
+
+        features_df tüm geçmişi kapsar; her satır için dakikalık yolun 60 satırlık
+        feature penceresi rolling pencerelerle taklit edilir. Aynı filtre izini
+        (filters/evaluated) DECISION_DTYPE dizisine yazar.
+        """
+        n = len(features_df)
+        if out is None:
+            out = np.zeros(n, dtype=DECISION_DTYPE)
+        predictions = np.asarray(predictions, dtype=np.float64)
+        regimes = np.asarray(market_conditions, dtype=np.int8)
+        close = features_df['close'].to_numpy(dtype=np.float64)
+
+        out['prediction'] = predictions
+        out['price'] = close
+        out['regime'] = regimes
+        if features_df.index.dtype.kind == 'M':
+            out['timestamp'] = features_df.index.asi8 // 10**9
+
+        # Temel sinyal
+        with np.errstate(invalid='ignore'):
+            change = (predictions - close) / close
+        raw = np.where(change > self.params.MIN_MOVE, SIGNAL_BUY,
+                       np.where(change < -self.params.MIN_MOVE, SIGNAL_SELL, SIGNAL_HOLD)).astype(np.int8)
+        out['raw_signal'] = raw
+        signal = raw.copy()
+        filters = np.zeros(n, dtype=np.uint16)
+        evaluated = np.zeros(n, dtype=np.uint16)
+
+        def apply(bit, ran, veto):
+            # ran: filtrenin çalıştığı satırlar; veto: sinyali hold'a çevirdiği satırlar
+            if self.trace_enabled:
+                evaluated[ran] |= bit
+            stopped = ran & veto & (signal != SIGNAL_HOLD)
+            filters[stopped] |= bit
+            signal[ran & veto] = SIGNAL_HOLD
+
+        # Piyasa durumu filtreleri
+        if 'atr_14' in features_df.columns:
+            atr = features_df['atr_14']
+            atr_mean = atr.rolling(self.params.LOOK_BACK, min_periods=1).mean().to_numpy()
+            apply(FILTER_HIGH_VOLATILITY, regimes == 3, atr.to_numpy() > atr_mean * 1.5)
+        if 'rsi_7' in features_df.columns:
+            rsi = features_df['rsi_7'].to_numpy()
+            apply(FILTER_RSI, regimes == 2,
+                  ((signal == SIGNAL_BUY) & (rsi > 70)) | ((signal == SIGNAL_SELL) & (rsi < 30)))
+
+        # Teknik filtreler
+        every_row = np.ones(n, dtype=bool)
+        if 'macd_hist' in features_df.columns:
+            macd_hist = features_df['macd_hist'].to_numpy()
+            apply(FILTER_MACD, every_row,
+                  ((signal == SIGNAL_BUY) & (macd_hist < 0)) | ((signal == SIGNAL_SELL) & (macd_hist > 0)))
+        if 'volumeTo' in features_df.columns:
+            volume = features_df['volumeTo']
+            avg_volume = volume.rolling(20, min_periods=1).mean().to_numpy()
+            apply(FILTER_VOLUME, every_row, volume.to_numpy() < avg_volume * 0.5)
+
+        # Tahmini olmayan dakikalar dakikalık yolda olduğu gibi hold
+        missing = np.isnan(predictions)
+        signal[missing] = SIGNAL_HOLD
+        filters[missing] = 0
+        evaluated[missing] = 0
+
+        out['signal'] = signal
+        out['filters'] = filters
+        out['evaluated'] = evaluated
+        out['reason'] = np.where(signal != SIGNAL_HOLD, REASON_OK, REASON_HOLD)
+        return out
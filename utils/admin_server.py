@@ -0,0 +1,156 @@
+import json
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from config.loader import get_config, ConfigError
+from utils.metrics import get_metrics
+
+COMMANDS = ('pause', 'resume', 'reload', 'profile')
+
+
+def _json_default(value):
+    # NumPy skalerleri ve zaman damgaları
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'MetricTreesAdmin/1.0'
+
+    def log_message(self, format, *args):
+        self.server.admin.logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send(self, status, body):
+        payload = json.dumps(body, default=_json_default).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        admin = self.server.admin
+        path = urlparse(self.path).path.rstrip('/')
+        if path in ('', '/status'):
+            self._send(200, admin.status())
+        elif path == '/metrics':
+            self._send(200, get_metrics().snapshot())
+        elif path == '/health':
+            health = admin.health()
+            self._send(200 if health['ok'] else 503, health)
+        else:
+            self._send(404, {'error': f"bilinmeyen yol: {path}"})
+
+    def do_POST(self):
+        admin = self.server.admin
+        url = urlparse(self.path)
+        command = url.path.strip('/').split('/')[-1]
+        if admin.token and self.headers.get('X-Admin-Token') != admin.token:
+            self._send(403, {'error': 'geçersiz X-Admin-Token'})
+            return
+        if command not in COMMANDS:
+            self._send(404, {'error': f"bilinmeyen komut: {command}", 'commands': list(COMMANDS)})
+            return
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            self._send(202, admin.submit(command, query))
+        except (ValueError, ConfigError) as e:
+            self._send(400, {'error': str(e)})
+
+
+class AdminServer:
+    """Yerel durum/yönetim HTTP uç noktası (arka plan thread'i)
+
+    Durum sadece metrik kayıt defterinin kopyasından okunur; bot nesnelerine ve
+    ana döngünün kilitlerine dokunulmaz. Komutlar botların komut kuyruğuna
+    yazılır, bir sonraki dakikada botun kendi thread'inde uygulanır.
+
+    GET  /status, /metrics, /health
+    POST /pause, /resume, /reload, /profile?minutes=N  (isteğe bağlı ?token=ID)
+    """
+
+    def __init__(self, bots, config=None, reload=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('admin_server')
+        # Botlardan sadece komut kuyrukları tutulur
+        self.commands = {bot.config.TOKEN_ID: bot.commands for bot in bots}
+        self.reload = reload  # Konfigürasyonu dosyadan yeniden okuyan fonksiyon
+        self.token = self.config.ADMIN_TOKEN
+        self._server = None
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._server.server_address if self._server is not None else None
+
+    def start(self):
+        """Sunucuyu arka plan thread'inde başlat"""
+        self._server = ThreadingHTTPServer((self.config.ADMIN_HOST, self.config.ADMIN_PORT), _Handler)
+        self._server.daemon_threads = True
+        self._server.admin = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='admin-server', daemon=True)
+        self._thread.start()
+        host, port = self.address[:2]
+        self.logger.info(f"Yönetim uç noktası: http://{host}:{port}/status")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def status(self):
+        """Token başına bot durumu, model yükleme durumu ve kuyruk derinlikleri"""
+        metrics = get_metrics()
+        bots = {}
+        for token, queue in self.commands.items():
+            status = dict(metrics.get(f"bot.{token}") or {})
+            status['queues'] = {**status.get('queues', {}), 'admin_commands': queue.qsize()}
+            bots[token] = status
+        runtime = metrics.get('async_runtime')
+        return {
+            'bots': bots,
+            'ensemble_deadline': metrics.get('ensemble_deadline'),
+            'pending_publishes': runtime['pending_publishes'] if runtime else None,
+            'time': time.time(),
+        }
+
+    def health(self):
+        """Her bot son ADMIN_STALE_SECONDS içinde bir dakikayı tamamladıysa sağlıklı"""
+        now = time.time()
+        ages = {}
+        for token in self.commands:
+            status = get_metrics().get(f"bot.{token}")
+            ages[token] = None if status is None else now - status['updated_at']
+        ok = all(age is not None and age <= self.config.ADMIN_STALE_SECONDS for age in ages.values())
+        return {'ok': ok, 'age_s': ages}
+
+    def submit(self, command, query):
+        """Komutu hedef botların kuyruğuna yaz"""
+        if 'token' in query:
+            token = int(query['token'])
+            if token not in self.commands:
+                raise ValueError(f"bilinmeyen token: {token}")
+            targets = [token]
+        else:
+            targets = list(self.commands)
+
+        argument = None
+        if command == 'reload':
+            if self.reload is None:
+                raise ValueError("yeniden yükleme kaynağı yok")
+            # Dosya bu thread'de okunup doğrulanır; hatalı konfigürasyon bota ulaşmaz
+            argument = self.reload()
+        elif command == 'profile':
+            argument = int(query.get('minutes', self.config.PROFILE_MINUTES))
+            if argument < 1:
+                raise ValueError("minutes >= 1 olmalı")
+
+        for token in targets:
+            self.commands[token].put((command, argument))
+        self.logger.info(f"Yönetim komutu kuyruğa alındı: {command} -> {targets}")
+        return {'queued': command, 'tokens': targets}
@@ -0,0 +1,223 @@
+import os
+import signal
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from config.loader import get_config
+from utils.metrics import get_metrics
+
+
+class StageTimeout(Exception):
+    """Bir aşama ASYNC_*_TIMEOUT süresinde bitmedi"""
+
+
+def seconds_until(now, second):
+    """now'dan sonraki ilk 'second' saniyesine kadar kalan süre (saniye)"""
+    offset = second - (now.second + now.microsecond / 1e6)
+    return offset if offset > 0 else offset + 60
+
+
+def token_config(config, token_id):
+    """Aynı süreçte çalışan her token için ayrı ledger, cache, gölge log ve kontrol noktası dosyası"""
+    def suffixed(path):
+        if not path:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}_{token_id}{ext}"
+
+    return config.replace(
+        TOKEN_ID=int(token_id),
+        LEDGER_PATH=suffixed(config.LEDGER_PATH),
+        PREDICTION_CACHE_PATH=suffixed(config.PREDICTION_CACHE_PATH),
+        SHADOW_LOG_PATH=suffixed(config.SHADOW_LOG_PATH),
+        CHECKPOINT_PATH=suffixed(config.CHECKPOINT_PATH),
+    )
+
+
+class AsyncRuntime:
+    """TradingBot'ları tek asyncio olay döngüsünde çalıştır
+
+    Bar çekme ve tahmin gönderimi ağ G/Ç thread'lerinde, feature/çıkarım/karar
+    aşaması CPU executor'ında çalışır; her aşamanın kendi zaman aşımı vardır.
+    Birden fazla token'ın beklemeleri ve gönderimleri birbirini bloklamaz.
+    Zaman aşımına uğrayan aşamanın thread'i iptal edilemez: bitene kadar o
+    bot için yeni aşama başlatılmaz, dakika atlanır.
+    """
+
+    def __init__(self, bots, config=None, clock=None):
+        self.params = config or get_config()
+        self.logger = logging.getLogger('async_runtime')
+        self.bots = list(bots)
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+        self.io_executor = ThreadPoolExecutor(self.params.ASYNC_IO_WORKERS, thread_name_prefix='io')
+        self.cpu_executor = ThreadPoolExecutor(self.params.ASYNC_CPU_WORKERS, thread_name_prefix='cpu')
+
+        self.is_running = False
+        self._tasks = []
+        self._publishes = set()
+        self._busy = {}  # id(bot) -> zaman aşımına rağmen süren executor işi
+        self.stats = {
+            'minutes': 0,
+            'skipped': 0,
+            'errors': 0,
+            'timeouts': {'fetch': 0, 'compute': 0, 'publish': 0, 'speculate': 0},
+        }
+
+    async def _stage(self, bot, name, executor, timeout, fn, *args):
+        """fn'i executor'da çalıştır; zaman aşımında StageTimeout fırlat"""
+        future = asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        try:
+            # shield: zaman aşımı/iptal thread'i durduramaz, iş _busy'de izlenir
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'][name] += 1
+            self.logger.warning(f"{name} aşaması {timeout:.0f} sn'de bitmedi (token {bot.config.TOKEN_ID})")
+            raise StageTimeout(name)
+        finally:
+            if not future.done():
+                self._busy[id(bot)] = future
+
+    async def _settle(self, bot, timeout):
+        """Önceki dakikadan süren iş varsa bitmesini bekle; bitmezse False"""
+        future = self._busy.get(id(bot))
+        if future is None or future.done():
+            self._busy.pop(id(bot), None)
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return False
+        except Exception:
+            pass  # Hata zaten aşamanın kendi loglarında
+        self._busy.pop(id(bot), None)
+        return True
+
+    async def process_minute(self, bot):
+        """Tek dakika: çek (G/Ç) -> karar (CPU) -> gönder (G/Ç, arka planda)"""
+        if not await self._settle(bot, self.params.ASYNC_FETCH_TIMEOUT):
+            self.stats['skipped'] += 1
+            self.logger.warning(f"Önceki aşama sürüyor, dakika atlandı (token {bot.config.TOKEN_ID})")
+            return None
+
+        bot.memory_guard.begin()
+        try:
+            new_data = await self._stage(bot, 'fetch', self.io_executor, self.params.ASYNC_FETCH_TIMEOUT,
+                                         bot._fetch_bar)
+            if new_data is None:
+                return None
+            record = await self._stage(bot, 'compute', self.cpu_executor, self.params.ASYNC_COMPUTE_TIMEOUT,
+                                       bot.profiler.profiled(bot._decide), new_data)
+            if record is None:
+                return None
+
+            # Gönderim sonraki token'ların işiyle örtüşür; ufuk tahminleri şimdiden kopyalanır
+            horizons = dict(bot.ensemble_predictor.last_horizon_predictions or {})
+            task = asyncio.create_task(self._publish(bot, record, horizons))
+            self._publishes.add(task)
+            task.add_done_callback(self._publishes.discard)
+            self.stats['minutes'] += 1
+            return record
+
+        except StageTimeout:
+            return None
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.logger.error(f"Asenkron dakikalık işlem hatası: {e}")
+            return None
+
+        finally:
+            bot.memory_guard.end()
+            self.publish()
+
+    async def _publish(self, bot, record, horizon_predictions):
+        try:
+            await self._stage(bot, 'publish', self.io_executor, self.params.ASYNC_PUBLISH_TIMEOUT,
+                              bot._publish, record, horizon_predictions)
+        except StageTimeout:
+            pass
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.logger.error(f"Asenkron gönderim hatası: {e}")
+
+    async def speculate(self, bot):
+        """Geçici barı çek (G/Ç) ve ön hesaplamayı CPU executor'ında yap"""
+        try:
+            provisional = await self._stage(bot, 'speculate', self.io_executor, self.params.ASYNC_FETCH_TIMEOUT,
+                                            bot.api_client.get_latest_data)
+            await self._stage(bot, 'speculate', self.cpu_executor, self.params.ASYNC_COMPUTE_TIMEOUT,
+                              bot.speculator.prepare, bot.sliding_window.get_window(), provisional)
+        except StageTimeout:
+            pass
+        except Exception as e:
+            self.logger.error(f"Asenkron spekülatif hesaplama hatası: {e}")
+
+    async def _run_bot(self, bot):
+        """Bot döngüsü: 1 sn yoklama yerine bir sonraki olaya kadar uyu"""
+        last_minute = None
+        while self.is_running:
+            now = self.clock()
+            minute = now.replace(second=0, microsecond=0)
+            if now.second >= 59 and minute != last_minute:
+                last_minute = minute
+                await self.process_minute(bot)
+            elif bot.speculator is not None and bot.speculator.claim(now, bot.sliding_window.get_last_timestamp()):
+                await self.speculate(bot)
+            else:
+                delay = seconds_until(now, 59)
+                if bot.speculator is not None:
+                    delay = min(delay, seconds_until(now, self.params.SPECULATIVE_START_SECOND))
+                await asyncio.sleep(delay)
+
+    async def run(self):
+        """Botları başlat ve durdurulana kadar çalıştır"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows veya ana thread dışı
+
+        self.is_running = True
+        try:
+            # İlk pencereler paralel çekilir
+            await asyncio.gather(*(
+                loop.run_in_executor(self.io_executor, bot._initialize_data) for bot in self.bots
+            ))
+            self.logger.info(f"Asenkron çalışma başladı: {len(self.bots)} token")
+            self._tasks = [asyncio.create_task(self._run_bot(bot)) for bot in self.bots]
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            await self.shutdown()
+
+    def stop(self):
+        """Döngüleri iptal et (sinyal işleyicisinden çağrılabilir)"""
+        self.is_running = False
+        for task in self._tasks:
+            task.cancel()
+        self.logger.info("Asenkron çalışma durduruluyor...")
+
+    async def shutdown(self):
+        """Bekleyen gönderimleri tamamla, executor'ları kapat"""
+        if self._publishes:
+            await asyncio.wait(self._publishes, timeout=self.params.ASYNC_PUBLISH_TIMEOUT)
+        # Süren CPU işleri (ledger yazımı) yarıda kesilmez
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown_executors)
+        for bot in self.bots:
+            bot.stop()
+        self.publish()
+
+    def _shutdown_executors(self):
+        self.io_executor.shutdown(wait=True, cancel_futures=True)
+        self.cpu_executor.shutdown(wait=True, cancel_futures=True)
+
+    def publish(self):
+        """Sayaçları metrik kayıt defterine yaz"""
+        get_metrics().publish('async_runtime', {
+            'tokens': [bot.config.TOKEN_ID for bot in self.bots],
+            'minutes': self.stats['minutes'],
+            'skipped': self.stats['skipped'],
+            'errors': self.stats['errors'],
+            'timeouts': dict(self.stats['timeouts']),
+            'pending_publishes': len(self._publishes),
+        })
@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+from config.loader import get_config
+from utils.metrics import get_metrics
+
+CHECKPOINT_VERSION = 1
+_META_KEY = '__meta__'
+
+
+def _json_default(value):
+    # NumPy skalerleri
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"JSON'a çevrilemeyen değer: {type(value)}")
+
+
+def flatten_state(state, prefix=''):
+    """İç içe durum sözlüğünü ('a/b' anahtarlı) diziler ve JSON skalerleri olarak ayır"""
+    arrays, scalars = {}, {}
+    for key, value in state.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            child_arrays, child_scalars = flatten_state(value, name + '/')
+            arrays.update(child_arrays)
+            scalars.update(child_scalars)
+        elif isinstance(value, np.ndarray):
+            arrays[name] = value
+        else:
+            scalars[name] = value
+    return arrays, scalars
+
+
+def unflatten_state(values):
+    """flatten_state() çıktısını iç içe sözlüğe geri çevir"""
+    state = {}
+    for name, value in values.items():
+        *parents, key = name.split('/')
+        node = state
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return state
+
+
+class Checkpointer:
+    """Bot durumunun periyodik, atomik ve sıkıştırmasız ikili kontrol noktası
+
+    Tek bir .npz dosyası: pencere ve izleyici dizileri ayrı girdiler, skalerler
+    (sayaçlar, kova sınırları, sürüm) tek bir JSON girdisi. Dosya geçici adla
+    yazılıp fsync sonrası os.replace ile yerine konur; çökme anında ya eski
+    ya yeni kontrol noktası okunur. Gönderilmemiş son karar da saklanır;
+    başarılı gönderim .npz yeniden yazılmadan küçük bir yan dosyaya işaretlenir.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('checkpoint')
+        self.path = self.config.CHECKPOINT_PATH
+        self.published_path = self.path + '.published'
+        self.minutes = 0
+        self.saves = 0
+        self.last_save_ms = None
+        self.last_bytes = 0
+        self.published = 0  # Başarıyla gönderilen son kararın bar zamanı
+        # Kayıt CPU aşamasında, gönderim işareti G/Ç thread'inde yazılır
+        self._lock = threading.Lock()
+        self._arrays = None
+        self._scalars = None
+
+    def save(self, state, pending=None, saved_at=None):
+        """CHECKPOINT_EVERY dakikada bir durumu yaz; pending: gönderilecek karar dizileri"""
+        self.minutes += 1
+        if self.minutes % self.config.CHECKPOINT_EVERY:
+            return False
+        arrays, scalars = flatten_state({'state': state, 'pending': pending or {}})
+        scalars['version'] = CHECKPOINT_VERSION
+        scalars['token_id'] = self.config.TOKEN_ID
+        scalars['saved_at'] = time.time() if saved_at is None else saved_at
+        with self._lock:
+            self._arrays, self._scalars = arrays, scalars
+            return self._write()
+
+    def mark_published(self, timestamp):
+        """Kararın gönderildiğini yan dosyaya kaydet (yeniden başlatmada tekrar gönderilmez)
+
+        fsync yapılmaz: çökmede işaret kaybolursa karar en fazla bir kez daha gönderilir.
+        """
+        with self._lock:
+            self.published = max(self.published, int(timestamp))
+            tmp_path = self.published_path + '.tmp'
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(tmp_path, 'w') as f:
+                    f.write(str(self.published))
+                os.replace(tmp_path, self.published_path)
+            except Exception as e:
+                self.logger.error(f"Gönderim işareti yazma hatası: {e}")
+                return False
+            return True
+
+    def _write(self):
+        started = time.perf_counter()
+        scalars = {**self._scalars, 'published': self.published}
+        meta = np.frombuffer(json.dumps(scalars, default=_json_default).encode(), dtype=np.uint8)
+        tmp_path = self.path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **{_META_KEY: meta}, **self._arrays)
+                f.flush()
+                os.fsync(f.fileno())
+                self.last_bytes = f.tell()
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.error(f"Kontrol noktası yazma hatası: {e}")
+            return False
+        self.saves += 1
+        self.last_save_ms = (time.perf_counter() - started) * 1000
+        self.publish()
+        return True
+
+    def load(self):
+        """Kontrol noktasını oku: {'state', 'pending', 'saved_at', 'published'}; yoksa/uyumsuzsa None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with np.load(self.path) as data:
+                scalars = json.loads(data[_META_KEY].tobytes().decode())
+                values = {name: data[name] for name in data.files if name != _META_KEY}
+        except Exception as e:
+            self.logger.warning(f"Bozuk kontrol noktası atlandı: {self.path} ({e})")
+            return None
+
+        if scalars.get('version') != CHECKPOINT_VERSION or scalars.get('token_id') != self.config.TOKEN_ID:
+            self.logger.warning(f"Uyumsuz kontrol noktası atlandı: sürüm {scalars.get('version')}, "
+                                f"token {scalars.get('token_id')}")
+            return None
+
+        checkpoint = unflatten_state({**values, **scalars})
+        checkpoint['published'] = max(int(checkpoint['published']), self._read_published())
+        self.published = checkpoint['published']
+        checkpoint.setdefault('state', {})
+        checkpoint.setdefault('pending', {})
+        return checkpoint
+
+    def _read_published(self):
+        """Yan dosyadaki son gönderim zamanı; yoksa/bozuksa 0"""
+        try:
+            with open(self.published_path) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return 0
+
+    def publish(self):
+        """Kontrol noktası durumunu metrik kayıt defterine yaz"""
+        get_metrics().publish('checkpoint', {
+            'saves': self.saves,
+            'last_save_ms': self.last_save_ms,
+            'bytes': self.last_bytes,
+            'published': self.published,
+        })
@@ -1,30 +1,38 @@
 import logging
 import os
-from config.settings import Config
+from logging.handlers import RotatingFileHandler
+from config.loader import get_config
 
 
-def setup_logger(name, log_file, level=logging.INFO):
-    """Logger kurulumu"""
-    config = Config()
+def setup_logger(name, log_file, level=logging.INFO, config=None):
+    """Logger kurulumu (tekrar çağrılırsa handler eklemez)"""
+    config = config or get_config()
+    log_path = os.path.abspath(log_file)
+
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+
+    # Aynı dosyaya yazan handler zaten varsa (ör. bot yeniden kurulduğunda) çoğaltma
+    if any(getattr(handler, 'baseFilename', None) == log_path for handler in logger.handlers):
+        return logger
 
     # Log dizinini oluştur
-    os.makedirs('logs', exist_ok=True)
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
 
     # Formatter
     formatter = logging.Formatter(config.LOG_FORMAT)
 
-    # File handler
-    file_handler = logging.FileHandler(log_file)
+    # Dönen file handler: uzun çalışmada log dosyası sınırsız büyümez
+    file_handler = RotatingFileHandler(
+        log_path, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUP_COUNT, encoding='utf-8'
+    )
     file_handler.setFormatter(formatter)
-
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-
-    # Logger
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
     logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+
+    # Console handler (logger başına bir tane)
+    if not any(type(handler) is logging.StreamHandler for handler in logger.handlers):
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        logger.addHandler(console_handler)
 
     return logger
@@ -1,81 +1,281 @@
 import numpy as np
 import logging
-from config.trading_params import TradingParams
+from config.loader import get_config
 
+# Rejim (strateji) kodları
+REGIME_UNKNOWN = 0  # Pencereler dolmadan önce; dışarıya DEFAULT_REGIME döner
+REGIME_TREND = 1
+REGIME_SIDEWAYS = 2
+REGIME_HIGH_VOLATILITY = 3
+REGIME_LOW_VOLATILITY = 4
+DEFAULT_REGIME = REGIME_TREND
 
-class MarketAnalyzer:
-    def __init__(self):
-        self.params = TradingParams()
-        self.logger = logging.getLogger('market_analyzer')
+# Artımlı toplamların kayan nokta birikimini sınırlamak için tam yeniden hesap aralığı
+_RESYNC_INTERVAL = 1000
 
-    def analyze_market(self, features_df):
-        """Piyasa durumunu analiz et ve strateji tipini döndür"""
-        try:
-            if len(features_df) < 20:
-                return 1  # Default: trend following
 
-            # Volatilite hesapla (son 20 periyot)
-            volatility = self._calculate_volatility(features_df)
+def regime_thresholds(current, params):
+    """Mevcut rejime göre (yüksek volatilite, düşük volatilite, trend) eşikleri
 
-            # Trend analizi
-            trend_strength = self._analyze_trend(features_df)
+    Mevcut rejimin eşiği REGIME_HYSTERESIS oranında gevşetilir (kalmak kolay),
+    diğer rejimlerin eşiği aynı oranda sıkılaştırılır (girmek zor). Rejim
+    bilinmiyorsa eşikler olduğu gibi kullanılır.
+    """
+    h = params.REGIME_HYSTERESIS if current != REGIME_UNKNOWN else 0.0
+    high = params.VOLATILITY_THRESHOLD_HIGH * (1 - h if current == REGIME_HIGH_VOLATILITY else 1 + h)
+    low = params.VOLATILITY_THRESHOLD_LOW * (1 + h if current == REGIME_LOW_VOLATILITY else 1 - h)
+    trend = params.TREND_THRESHOLD * (1 - h if current == REGIME_TREND else 1 + h)
+    return high, low, trend
 
-            # Piyasa durumunu belirle
-            market_condition = self._determine_market_condition(volatility, trend_strength)
 
-            self.logger.info(
-                f"Piyasa analizi - Volatilite: {volatility:.4f}, Trend: {trend_strength:.4f}, Durum: {market_condition}")
+def classify_regime(volatility, trend_strength, current, params):
+    """Volatilite ve trend gücünden aday rejim"""
+    high, low, trend = regime_thresholds(current, params)
+    if volatility > high:
+        return REGIME_HIGH_VOLATILITY
+    elif volatility < low:
+        return REGIME_LOW_VOLATILITY
+    elif trend_strength > trend:
+        return REGIME_TREND
+    return REGIME_SIDEWAYS
 
-            return market_condition
 
-        except Exception as e:
-            self.logger.error(f"Piyasa analizi hatası: {e}")
-            return 1  # Default
+class RegimeTracker:
+    """Dakikalık kapanışlarla O(1) güncellenen rejim durumu
 
-    def _calculate_volatility(self, features_df):
-        """Volatilite hesapla"""
-        if 'log_ret' in features_df.columns:
-            returns = features_df['log_ret'].tail(20)
-            volatility = returns.std()
-        else:
-            # Fallback: close fiyat değişimi
-            close_changes = features_df['close'].pct_change().tail(20)
-            volatility = close_changes.std()
+    Log getirilerin kayan varyansı ve kapanışların kayan OLS eğimi halka
+    tamponlar üzerindeki toplamlarla güncellenir. Aday rejim REGIME_MIN_DWELL
+    ardışık dakika görülmeden geçiş yapılmaz.
+    """
 
-        return volatility if not np.isnan(volatility) else 0.01
+    def __init__(self, config=None):
+        self.params = config or get_config()
+        self.vol_window = self.params.REGIME_VOL_WINDOW
+        self.slope_window = self.params.REGIME_SLOPE_WINDOW
+        self.reset()
 
-    def _analyze_trend(self, features_df):
-        """Trend gücünü analiz et"""
-        try:
-            # Slope değerlerini kullan
-            if 'close_slope_60' in features_df.columns:
-                slope = features_df['close_slope_60'].iloc[-1]
-            else:
-                # Fallback: basit slope hesapla
-                close_prices = features_df['close'].tail(20)
-                x = np.arange(len(close_prices))
-                slope = np.polyfit(x, close_prices.values, 1)[0]
+    def reset(self):
+        self._returns = np.zeros(self.vol_window)
+        self._closes = np.zeros(self.slope_window)
+        self._n_returns = 0
+        self._n_closes = 0
+        self._sum_r = self._sum_r2 = 0.0
+        self._sum_y = self._sum_xy = 0.0
+        self.last_close = None
+        self.last_timestamp = None
 
-            return abs(slope) if not np.isnan(slope) else 0
+        self.regime = REGIME_UNKNOWN
+        self.pending = REGIME_UNKNOWN
+        self.pending_count = 0
+        self.volatility = float('nan')
+        self.trend_strength = float('nan')
 
-        except Exception as e:
-            self.logger.error(f"Trend analizi hatası: {e}")
-            return 0
+    @property
+    def is_warm(self):
+        return self._n_returns >= self.vol_window and self._n_closes >= self.slope_window
+
+    def state_dict(self):
+        """Kontrol noktası için izleyici durumu (halka tamponlar, toplamlar, histerezis)"""
+        return {
+            'returns': self._returns.copy(),
+            'closes': self._closes.copy(),
+            'counts': [self._n_returns, self._n_closes],
+            'sums': [self._sum_r, self._sum_r2, self._sum_y, self._sum_xy],
+            'last_close': self.last_close,
+            'last_timestamp': None if self.last_timestamp is None
+            else int(np.datetime64(self.last_timestamp, 'ns').astype(np.int64)),
+            'regime': [int(self.regime), int(self.pending), int(self.pending_count)],
+            'volatility': float(self.volatility),
+            'trend_strength': float(self.trend_strength),
+        }
+
+    def load_state(self, state):
+        """state_dict() çıktısını yükle; pencere boyları değiştiyse False (izleyici pencereden yeniden ısınır)"""
+        if len(state['returns']) != self.vol_window or len(state['closes']) != self.slope_window:
+            return False
+        self._returns = np.array(state['returns'], dtype=np.float64)
+        self._closes = np.array(state['closes'], dtype=np.float64)
+        self._n_returns, self._n_closes = state['counts']
+        self._sum_r, self._sum_r2, self._sum_y, self._sum_xy = state['sums']
+        self.last_close = state['last_close']
+        self.last_timestamp = None if state['last_timestamp'] is None \
+            else np.datetime64(state['last_timestamp'], 'ns')
+        self.regime, self.pending, self.pending_count = state['regime']
+        self.volatility = state['volatility']
+        self.trend_strength = state['trend_strength']
+        return True
+
+    @property
+    def current(self):
+        """Dışarıya verilen rejim (ısınma sırasında varsayılan)"""
+        return self.regime if self.regime != REGIME_UNKNOWN else DEFAULT_REGIME
+
+    def update(self, close, timestamp=None):
+        """Yeni kapanışı ekle ve rejimi döndür"""
+        close = float(close)
+        if self.last_close is not None and self.last_close > 0 and close > 0:
+            self._push_return(np.log(close / self.last_close))
+        self._push_close(close)
+        self.last_close = close
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+
+        if (self._n_closes % _RESYNC_INTERVAL) == 0:
+            self._resync()
 
-    def _determine_market_condition(self, volatility, trend_strength):
-        """Piyasa durumunu belirle"""
-        # Yüksek volatilite
-        if volatility > self.params.VOLATILITY_THRESHOLD_HIGH:
-            return 3  # Yüksek volatilite stratejisi
+        if self.is_warm:
+            self.volatility = self._volatility()
+            self.trend_strength = abs(self._slope())
+            self._transition(classify_regime(self.volatility, self.trend_strength, self.regime, self.params))
+        return self.current
 
-        # Düşük volatilite
-        elif volatility < self.params.VOLATILITY_THRESHOLD_LOW:
-            return 4  # Düşük volatilite stratejisi
+    def _transition(self, candidate):
+        """Histerezisli adaydan bekleme süresine göre rejim geçişi"""
+        if self.regime == REGIME_UNKNOWN:
+            self.regime = candidate  # İlk rejim beklemeden atanır
+        elif candidate == self.regime:
+            self.pending, self.pending_count = REGIME_UNKNOWN, 0
+        else:
+            if candidate == self.pending:
+                self.pending_count += 1
+            else:
+                self.pending, self.pending_count = candidate, 1
+            if self.pending_count >= self.params.REGIME_MIN_DWELL:
+                self.regime = candidate
+                self.pending, self.pending_count = REGIME_UNKNOWN, 0
 
-        # Güçlü trend
-        elif trend_strength > self.params.TREND_THRESHOLD:
-            return 1  # Trend takip stratejisi
+    def _push_return(self, r):
+        i = self._n_returns % self.vol_window
+        old = self._returns[i] if self._n_returns >= self.vol_window else 0.0
+        self._sum_r += r - old
+        self._sum_r2 += r * r - old * old
+        self._returns[i] = r
+        self._n_returns += 1
 
-        # Sideways piyasa
+    def _push_close(self, y):
+        n = self.slope_window
+        if self._n_closes < n:
+            # Pencere dolana kadar x = 0..k-1
+            self._sum_xy += self._n_closes * y
+            self._sum_y += y
         else:
-            return 2  # Sideways strateji
\ No newline at end of file
+            # En eski nokta düşer, kalanların x'i bir azalır, yeni nokta x = n-1
+            old = self._closes[self._n_closes % n]
+            self._sum_xy += -(self._sum_y - old) + (n - 1) * y
+            self._sum_y += y - old
+        self._closes[self._n_closes % n] = y
+        self._n_closes += 1
+
+    def _resync(self):
+        """Toplamları halka tampondan tam olarak yeniden hesapla"""
+        k = min(self._n_returns, self.vol_window)
+        returns = self._returns[:k]
+        self._sum_r, self._sum_r2 = float(returns.sum()), float((returns * returns).sum())
+
+        k = min(self._n_closes, self.slope_window)
+        closes = self._ordered_closes()
+        self._sum_y = float(closes.sum())
+        self._sum_xy = float(np.arange(k) @ closes)
+
+    def _ordered_closes(self):
+        if self._n_closes < self.slope_window:
+            return self._closes[:self._n_closes]
+        return np.roll(self._closes, -(self._n_closes % self.slope_window))
+
+    def _volatility(self):
+        k = min(self._n_returns, self.vol_window)
+        var = (self._sum_r2 - self._sum_r * self._sum_r / k) / (k - 1)
+        return float(np.sqrt(max(var, 0.0)))
+
+    def _slope(self):
+        k = min(self._n_closes, self.slope_window)
+        sum_x = k * (k - 1) / 2
+        sum_xx = (k - 1) * k * (2 * k - 1) / 6
+        return (k * self._sum_xy - sum_x * self._sum_y) / (k * sum_xx - sum_x * sum_x)
+
+
+def label_regimes(history, config=None):
+    """Tüm geçmişi vektörel etiketle (backtest ve ağırlık öğrenimi için)
+
+    history: 'close' sütunlu DataFrame veya kapanış dizisi (ardışık dakikalar).
+    RegimeTracker'a satır satır verilmiş gibi aynı int8 rejim dizisini döndürür.
+    Göstergeler, adaylar ve aday koşu uzunlukları NumPy ile tek geçişte hesaplanır;
+    histerezis/bekleme durumu sadece rejim geçişlerinde (bar başına değil) ilerletilir.
+    """
+    params = config or get_config()
+    closes = np.asarray(history['close'] if hasattr(history, 'columns') else history, dtype=np.float64)
+    n = len(closes)
+    vol_window, slope_window = params.REGIME_VOL_WINDOW, params.REGIME_SLOPE_WINDOW
+    labels = np.full(n, DEFAULT_REGIME, dtype=np.int8)
+    start = max(vol_window, slope_window - 1)
+    if n <= start:
+        return labels
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(closes[1:] / closes[:-1])
+    volatility = np.full(n, np.nan)
+    volatility[vol_window:] = np.lib.stride_tricks.sliding_window_view(returns, vol_window).std(axis=1, ddof=1)
+
+    x = np.arange(slope_window) - (slope_window - 1) / 2
+    trend = np.full(n, np.nan)
+    trend[slope_window - 1:] = np.abs(np.lib.stride_tricks.sliding_window_view(closes, slope_window) @ x / (x @ x))
+
+    # Her olası mevcut rejim için aday (satır: mevcut rejim 0..4), classify_regime ile aynı sıra
+    volatility, trend = volatility[start:], trend[start:]
+    candidates = np.empty((REGIME_LOW_VOLATILITY + 1, n - start), dtype=np.int8)
+    for state in range(REGIME_LOW_VOLATILITY + 1):
+        high, low, trend_threshold = regime_thresholds(state, params)
+        candidates[state] = np.select(
+            [volatility > high, volatility < low, trend > trend_threshold],
+            [REGIME_HIGH_VOLATILITY, REGIME_LOW_VOLATILITY, REGIME_TREND], default=REGIME_SIDEWAYS)
+
+    # Bekleme süresi aday dizilerinin koşu uzunluklarıyla çözülür: r rejimindeyken geçiş,
+    # r dışı aynı adayın REGIME_MIN_DWELL dakika sürdüğü ilk konumda olur
+    dwell = params.REGIME_MIN_DWELL
+    index = np.arange(n - start)
+    changed = np.ones(candidates.shape, dtype=bool)
+    changed[:, 1:] = candidates[:, 1:] != candidates[:, :-1]
+    run_length = index - np.maximum.accumulate(np.where(changed, index, 0), axis=1) + 1
+    triggers = [np.flatnonzero((row != state) & (length >= dwell))
+                for state, (row, length) in enumerate(zip(candidates, run_length))]
+
+    # Python döngüsü bar başına değil geçiş başına döner; ilk rejim beklemeden atanır.
+    # Geçişten sonraki bekleme sayacı sıfırdan başlar: sonraki tetik en erken i + dwell'de
+    regime, i = int(candidates[REGIME_UNKNOWN, 0]), 0
+    while True:
+        positions = triggers[regime]
+        k = np.searchsorted(positions, i + dwell)
+        if k == len(positions):
+            labels[start + i:] = regime
+            return labels
+        j = int(positions[k])
+        labels[start + i:start + j] = regime
+        regime, i = int(candidates[regime, j]), j
+
+
+class MarketAnalyzer:
+    def __init__(self, config=None):
+        self.params = config or get_config()
+        self.logger = logging.getLogger('market_analyzer')
+        self.tracker = RegimeTracker(self.params)
+
+    def analyze_market(self, features_df):
+        """Piyasa durumunu analiz et ve strateji tipini döndür"""
+        try:
+            # Sadece izleyicinin henüz görmediği barları ekle (ilk çağrıda tüm pencere)
+            closes = features_df['close']
+            if self.tracker.last_timestamp is not None:
+                closes = closes[closes.index > self.tracker.last_timestamp]
+            for timestamp, close in zip(closes.index, closes.to_numpy(dtype=np.float64)):
+                self.tracker.update(close, timestamp)
+
+            market_condition = self.tracker.current
+            self.logger.info(
+                f"Piyasa analizi - Volatilite: {self.tracker.volatility:.4f}, "
+                f"Trend: {self.tracker.trend_strength:.4f}, Durum: {market_condition}")
+
+            return market_condition
+
+        except Exception as e:
+            self.logger.error(f"Piyasa analizi hatası: {e}")
+            return DEFAULT_REGIME
@@ -0,0 +1,164 @@
+import os
+import time
+import logging
+import tracemalloc
+from collections import deque
+import numpy as np
+from config.loader import get_config
+from utils.metrics import get_metrics
+
+
+def current_rss_mb():
+    """Sürecin anlık RSS belleği (MB, Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def growth_per_day(minutes, rss_mb):
+    """RSS örneklerinin doğrusal eğimi (MB / gün)"""
+    if len(minutes) < 3:
+        return 0.0
+    slope = np.polyfit(np.asarray(minutes, dtype=np.float64), np.asarray(rss_mb, dtype=np.float64), 1)[0]
+    return float(slope * 1440)
+
+
+class MemoryGuard:
+    """Uzun süre çalışan bot için bellek izleme
+
+    Her dakika aşamalar arasında ayrılan belleği (tracemalloc açıksa Python
+    tahsisleri, değilse RSS) ölçer; MEMORY_SNAPSHOT_INTERVAL dakikada bir RSS
+    örneği alır. Isınma sonrası örneklerin eğimi MEMORY_GROWTH_ALERT_MB_PER_DAY
+    eşiğini aşarsa en çok büyüyen aşamalarla birlikte uyarı loglar.
+    """
+
+    def __init__(self, config=None):
+        self.params = config or get_config()
+        self.logger = logging.getLogger('memory_guard')
+        self.enabled = self.params.MEMORY_GUARD_ENABLED
+        self.interval = max(1, self.params.MEMORY_SNAPSHOT_INTERVAL)
+        self.warmup = self.params.MEMORY_WARMUP_MINUTES
+
+        self.minute = 0
+        self.samples = deque(maxlen=self.params.MEMORY_HISTORY_SIZE)  # (dakika, RSS MB)
+        self.stages = {}  # aşama -> [çağrı, toplam KB, ısınma sonrası toplam KB]
+        self.alerts = 0
+        self.growth_mb_per_day = 0.0
+        self.top_allocations = []
+        self._mark = None
+        self._snapshot = None
+        # Son dakikanın aşama süreleri (ms); bellek izleme kapalıyken de tutulur
+        self.stage_ms = {}
+        self._stage_started = None
+
+        self.tracing = False
+        if self.enabled and self.params.MEMORY_TRACEMALLOC:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.params.MEMORY_TRACEMALLOC_FRAMES)
+            self.tracing = True
+
+    def _allocated_kb(self):
+        if self.tracing:
+            return tracemalloc.get_traced_memory()[0] / 1024
+        return current_rss_mb() * 1024
+
+    def begin(self):
+        """Dakikanın ilk aşamasından önce çağrılır"""
+        self._stage_started = time.perf_counter()
+        if self.enabled:
+            self._mark = self._allocated_kb()
+
+    def mark(self, stage):
+        """Önceki işaretten bu yana aşamanın bellek farkını ve süresini kaydet"""
+        if self._stage_started is not None:
+            now = time.perf_counter()
+            self.stage_ms[stage] = (now - self._stage_started) * 1000
+            self._stage_started = now
+        if not self.enabled or self._mark is None:
+            return
+        now = self._allocated_kb()
+        delta = now - self._mark
+        self._mark = now
+
+        totals = self.stages.get(stage)
+        if totals is None:
+            totals = self.stages[stage] = [0, 0.0, 0.0]
+        totals[0] += 1
+        totals[1] += delta
+        if self.minute >= self.warmup:
+            totals[2] += delta
+
+    def end(self):
+        """Dakikayı kapat; gerekiyorsa RSS örneği al ve büyümeyi kontrol et"""
+        self._stage_started = None
+        if not self.enabled:
+            return
+        self._mark = None
+        self.minute += 1
+        if self.minute % self.interval == 0:
+            self.sample()
+
+    def sample(self):
+        """RSS ve (açıksa) tracemalloc anlık görüntüsü al"""
+        try:
+            self.samples.append((self.minute, current_rss_mb()))
+            if self.tracing:
+                self._compare_snapshots()
+
+            steady = [(m, rss) for m, rss in self.samples if m >= self.warmup]
+            self.growth_mb_per_day = growth_per_day([m for m, _ in steady], [rss for _, rss in steady])
+            if self.growth_mb_per_day > self.params.MEMORY_GROWTH_ALERT_MB_PER_DAY:
+                self._alert()
+            self.publish()
+
+        except Exception as e:
+            self.logger.error(f"Bellek örnekleme hatası: {e}")
+
+    def _compare_snapshots(self):
+        """Önceki anlık görüntüye göre en çok büyüyen satırlar"""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        if self._snapshot is not None:
+            stats = snapshot.compare_to(self._snapshot, 'lineno')
+            self.top_allocations = [
+                {'location': str(stat.traceback), 'size_diff_kb': stat.size_diff / 1024, 'count_diff': stat.count_diff}
+                for stat in stats[:self.params.MEMORY_TOP_ALLOCATIONS] if stat.size_diff > 0
+            ]
+        self._snapshot = snapshot
+
+    def _alert(self):
+        self.alerts += 1
+        growing = sorted(self.stages.items(), key=lambda item: item[1][2], reverse=True)[:3]
+        stages = ", ".join(f"{name}: {totals[2] / 1024:+.1f} MB" for name, totals in growing)
+        self.logger.warning(
+            f"Bellek büyümesi: {self.growth_mb_per_day:+.1f} MB/gün "
+            f"(eşik {self.params.MEMORY_GROWTH_ALERT_MB_PER_DAY} MB/gün), aşamalar: {stages}"
+        )
+        for allocation in self.top_allocations:
+            self.logger.warning(f"   {allocation['location']}: {allocation['size_diff_kb']:+.1f} KB")
+
+    def summary(self):
+        """Son bellek durumu"""
+        return {
+            'minute': self.minute,
+            'rss_mb': self.samples[-1][1] if self.samples else current_rss_mb(),
+            'traced_mb': tracemalloc.get_traced_memory()[0] / (1024 * 1024) if self.tracing else None,
+            'growth_mb_per_day': self.growth_mb_per_day,
+            'alerts': self.alerts,
+            'stages': {
+                name: {'calls': calls, 'net_kb': total, 'mean_kb': total / calls, 'steady_kb': steady}
+                for name, (calls, total, steady) in self.stages.items()
+            },
+            'top_allocations': list(self.top_allocations),
+            'sampled_at': time.time(),
+        }
+
+    def publish(self):
+        """Özeti metrik kayıt defterine yaz"""
+        get_metrics().publish('memory', self.summary())
@@ -0,0 +1,43 @@
+import time
+import threading
+
+
+class MetricsRegistry:
+    """Bileşenlerin yayınladığı ölçümleri tutan hafif kayıt defteri
+
+    Yazarlar kendi bölümlerini tek seferde (yeni bir sözlük olarak) günceller;
+    okuyucular snapshot() ile tutarlı bir kopya alır. Kilit sadece sözlük
+    referansı değiştirilirken çok kısa süre tutulur.
+    """
+
+    def __init__(self):
+        self._sections = {}
+        self._lock = threading.Lock()
+
+    def publish(self, section, values):
+        """Bir bölümün ölçümlerini topluca güncelle"""
+        entry = dict(values)
+        entry['updated_at'] = time.time()
+        with self._lock:
+            sections = dict(self._sections)
+            sections[section] = entry
+            self._sections = sections
+
+    def get(self, section, default=None):
+        """Tek bir bölümü döndür"""
+        return self._sections.get(section, default)
+
+    def snapshot(self):
+        """Tüm ölçümlerin kopyasını döndür"""
+        return {name: dict(values) for name, values in self._sections.items()}
+
+
+_registry = None
+
+
+def get_metrics():
+    """Paylaşılan metrik kayıt defterini döndür"""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
@@ -0,0 +1,169 @@
+import logging
+import numpy as np
+from config.loader import get_config
+from utils.metrics import get_metrics
+
+
+class PredictionMonitor:
+    """Tahminleri STEP_AHEAD sonra gerçekleşen fiyatla eşleyip canlı doğruluk ve drift ölç
+
+    Bekleyen tahminler dakika indeksli bir halka tamponda tutulur; her bar
+    geldiğinde tek bir slot okunur. Kayan MAE, yön doğruluğu ve model bazlı
+    hata, pencereden çıkan değerin toplamdan düşülmesiyle O(1) güncellenir.
+    """
+
+    def __init__(self, model_names=None, scaler_X=None, window=None, config=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('prediction_monitor')
+        self.metrics = get_metrics()
+        self.model_names = list(model_names or self.config.MODEL_PATHS.keys())
+        self.horizon = self.config.STEP_AHEAD * 60
+        k = len(self.model_names)
+
+        # Bekleyen tahminler: slot = (zaman // 60) % kapasite
+        self.capacity = self.config.STEP_AHEAD * 4
+        self._slot_ts = np.full(self.capacity, -1, dtype=np.int64)
+        self._slot_pred = np.zeros(self.capacity)
+        self._slot_base = np.zeros(self.capacity)
+        self._slot_models = np.zeros((self.capacity, k))
+
+        # Kayan değerlendirme penceresi
+        self.window = window or self.config.MONITOR_WINDOW
+        self._abs_err = np.zeros(self.window)
+        self._dir_hit = np.zeros(self.window)
+        self._model_abs_err = np.zeros((self.window, k))
+        self._model_valid = np.zeros((self.window, k))
+        self._sum_abs_err = 0.0
+        self._sum_dir_hit = 0.0
+        self._sum_model_abs_err = np.zeros(k)
+        self._sum_model_valid = np.zeros(k)
+        self._pos = 0
+        self._filled = 0
+        self.total_evaluated = 0
+        self.total_expired = 0
+
+        # Feature drift: eğitim istatistiklerine karşı üstel hareketli ortalama/varyans
+        self._train_mean = None
+        self._train_scale = None
+        if scaler_X is not None and hasattr(scaler_X, 'mean_'):
+            self._train_mean = np.asarray(scaler_X.mean_, dtype=float)
+            self._train_scale = np.asarray(scaler_X.scale_, dtype=float)
+            self._train_scale = np.where(self._train_scale > 0, self._train_scale, 1.0)
+        self._ew_mean = None
+        self._ew_var = None
+        self._drift_alert = False
+
+    def record(self, timestamp, prediction, current_price, model_predictions=None, feature_row=None):
+        """Yeni tahmini halka tampona yaz"""
+        timestamp = int(timestamp)
+        slot = (timestamp // 60) % self.capacity
+        if self._slot_ts[slot] >= 0:
+            # Eşleşmeden üzerine yazılan tahmin
+            self.total_expired += 1
+
+        self._slot_ts[slot] = timestamp
+        self._slot_pred[slot] = prediction
+        self._slot_base[slot] = current_price
+        if model_predictions:
+            self._slot_models[slot] = [model_predictions.get(name, np.nan) for name in self.model_names]
+        else:
+            self._slot_models[slot] = np.nan
+
+        if feature_row is not None:
+            self._update_drift(np.asarray(feature_row, dtype=float))
+
+    def observe(self, timestamp, close):
+        """Yeni bar geldi: STEP_AHEAD önceki tahmini değerlendir"""
+        origin = int(timestamp) - self.horizon
+        slot = (origin // 60) % self.capacity
+        if self._slot_ts[slot] != origin:
+            return
+
+        pred = self._slot_pred[slot]
+        base = self._slot_base[slot]
+        model_err = np.abs(self._slot_models[slot] - close)
+        model_valid = np.isfinite(model_err).astype(float)
+        model_err = np.nan_to_num(model_err)
+        self._slot_ts[slot] = -1
+
+        abs_err = abs(pred - close)
+        dir_hit = 1.0 if np.sign(pred - base) == np.sign(close - base) else 0.0
+
+        # O(1) kayan toplam güncellemesi
+        i = self._pos
+        self._sum_abs_err += abs_err - self._abs_err[i]
+        self._sum_dir_hit += dir_hit - self._dir_hit[i]
+        self._sum_model_abs_err += model_err - self._model_abs_err[i]
+        self._sum_model_valid += model_valid - self._model_valid[i]
+        self._abs_err[i] = abs_err
+        self._dir_hit[i] = dir_hit
+        self._model_abs_err[i] = model_err
+        self._model_valid[i] = model_valid
+        self._pos = (i + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+        self.total_evaluated += 1
+
+        self._publish()
+
+    def _update_drift(self, row):
+        if self._train_mean is None or len(row) != len(self._train_mean) or not np.isfinite(row).all():
+            return
+
+        alpha = self.config.DRIFT_EW_ALPHA
+        if self._ew_mean is None:
+            self._ew_mean = row.copy()
+            self._ew_var = np.square(self._train_scale)
+            return
+
+        diff = row - self._ew_mean
+        self._ew_mean += alpha * diff
+        self._ew_var = (1 - alpha) * (self._ew_var + alpha * diff * diff)
+
+    def drift_stats(self):
+        """Feature bazlı z-skoru ve varyans oranı"""
+        if self._ew_mean is None:
+            return None
+        z = (self._ew_mean - self._train_mean) / self._train_scale
+        var_ratio = self._ew_var / np.square(self._train_scale)
+        return z, var_ratio
+
+    def get_metrics(self):
+        """Güncel doğruluk ve drift ölçümlerini döndür"""
+        n = max(self._filled, 1)
+        result = {
+            'evaluated': self.total_evaluated,
+            'expired': self.total_expired,
+            'window': self._filled,
+            'mae': self._sum_abs_err / n if self._filled else None,
+            'directional_accuracy': self._sum_dir_hit / n if self._filled else None,
+            'model_mae': {
+                name: float(self._sum_model_abs_err[j] / self._sum_model_valid[j])
+                if self._sum_model_valid[j] > 0.5 else None
+                for j, name in enumerate(self.model_names)
+            },
+        }
+
+        drift = self.drift_stats()
+        if drift is not None:
+            z, var_ratio = drift
+            worst = int(np.argmax(np.abs(z)))
+            result['drift_max_z'] = float(np.abs(z[worst]))
+            result['drift_worst_feature'] = self.config.FEATURES_LIST[worst] \
+                if worst < len(self.config.FEATURES_LIST) else worst
+            result['drift_mean_abs_z'] = float(np.abs(z).mean())
+            result['drift_max_var_ratio'] = float(var_ratio.max())
+        return result
+
+    def _publish(self):
+        result = self.get_metrics()
+        self.metrics.publish('prediction_monitor', result)
+
+        # Drift alarmı durum değiştiğinde loglanır
+        alert = result.get('drift_max_z', 0) > self.config.DRIFT_Z_THRESHOLD
+        if alert and not self._drift_alert:
+            self.logger.warning(
+                f"Feature drift tespit edildi: {result['drift_worst_feature']} "
+                f"z={result['drift_max_z']:.2f}")
+        elif not alert and self._drift_alert:
+            self.logger.info("Feature drift normale döndü")
+        self._drift_alert = alert
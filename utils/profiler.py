@@ -0,0 +1,198 @@
+import os
+import sys
+import time
+import signal
+import pstats
+import logging
+import cProfile
+import threading
+from collections import Counter
+from config.loader import get_config
+from utils.metrics import get_metrics
+
+# Sinyal işleyicisi sadece sayacı artırır; aynı süreçteki tüm profilleyiciler görür
+_signal_requests = 0
+
+
+def _on_signal(signum, frame):
+    global _signal_requests
+    _signal_requests += 1
+
+
+def install_signal_handler():
+    """SIGUSR1 ile profillemeyi tetikle (sadece ana thread'de, Unix)"""
+    if not hasattr(signal, 'SIGUSR1') or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGUSR1, _on_signal)
+    return True
+
+
+class StackSampler(threading.Thread):
+    """Tüm thread'lerin yığınlarını aralıklarla örnekle (flamegraph 'folded' biçimi)"""
+
+    def __init__(self, interval):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path):
+        """'yığın sayı' satırları (flamegraph.pl, speedscope, inferno ile açılır)"""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """Çalışan bot için isteğe bağlı profilleme
+
+    SIGUSR1 veya PROFILE_TRIGGER_PATH dosyası (içeriği isteğe bağlı dakika
+    sayısı) sonraki PROFILE_MINUTES dakikalık işlemi cProfile ile ölçer ve bu
+    sürede tüm thread'lerin yığınlarını örnekler. Sonuç PROFILE_PATH altına
+    .pstats, .folded ve özet .txt olarak yazılır. Kapalıyken begin() sadece
+    bir sayaç karşılaştırması ve dosya varlığı kontrolüdür.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self.logger = logging.getLogger('profiler')
+        self.remaining = 0
+        self.sessions = 0
+        self.last_output = None
+        self._seen_signals = _signal_requests
+        self._request = 0
+        self._profile = None
+        self._sampler = None
+        self._thread = None
+        self._minutes = 0
+        self._started = None
+
+    @property
+    def active(self):
+        return self._profile is not None
+
+    def _requested(self):
+        """Yeni tetikleme varsa istenen dakika sayısı, yoksa 0"""
+        if self._request:
+            minutes, self._request = self._request, 0
+            return minutes
+        if self._seen_signals != _signal_requests:
+            self._seen_signals = _signal_requests
+            return self.config.PROFILE_MINUTES
+
+        path = self.config.PROFILE_TRIGGER_PATH
+        if not path or not os.path.exists(path):
+            return 0
+        try:
+            with open(path) as f:
+                content = f.read().strip()
+            os.remove(path)
+            return int(content) if content else self.config.PROFILE_MINUTES
+        except ValueError:
+            return self.config.PROFILE_MINUTES
+        except OSError as e:
+            self.logger.error(f"Profil tetikleme dosyası okuma hatası: {e}")
+            return 0
+
+    def request(self, minutes=None):
+        """Sonraki dakikadan itibaren profillemeyi tetikle (yönetim komutu)"""
+        self._request = minutes or self.config.PROFILE_MINUTES
+
+    def begin(self):
+        """Dakikalık işlem başı: tetikleme varsa oturumu başlat, profillemeyi aç"""
+        if self.remaining == 0:
+            minutes = self._requested()
+            if minutes <= 0:
+                return
+            self._start(minutes)
+
+        # cProfile sadece açıldığı thread'i ölçer (asenkron modda executor thread'i)
+        self._thread = threading.get_ident()
+        self._profile.enable()
+
+    def end(self):
+        """Dakikalık işlem sonu: profillemeyi kapat, oturum bittiyse sonuçları yaz"""
+        if self._profile is None or self._thread != threading.get_ident():
+            return
+        self._profile.disable()
+        self._thread = None
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self._finish()
+
+    def profiled(self, fn):
+        """fn'i begin/end arasında çalıştıran sarmalayıcı (executor'da çalışan aşamalar için)"""
+        def run(*args, **kwargs):
+            self.begin()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.end()
+        return run
+
+    def _start(self, minutes):
+        self.remaining = self._minutes = minutes
+        self._started = time.strftime('%Y%m%d_%H%M%S')
+        self._profile = cProfile.Profile()
+        self._sampler = StackSampler(self.config.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        self._sampler.start()
+        self.logger.info(f"Profilleme başladı: sonraki {minutes} dakika")
+        self.publish()
+
+    def _finish(self):
+        profile, sampler = self._profile, self._sampler
+        self._profile = self._sampler = None
+        self.remaining = 0
+        sampler.stop()
+
+        try:
+            os.makedirs(self.config.PROFILE_PATH, exist_ok=True)
+            base = os.path.join(self.config.PROFILE_PATH, f"profile_{self.config.TOKEN_ID}_{self._started}")
+            profile.dump_stats(base + '.pstats')
+            sampler.write(base + '.folded')
+            with open(base + '.txt', 'w') as f:
+                f.write(f"{self._minutes} dakika, {sampler.samples} yığın örneği\n\n")
+                pstats.Stats(profile, stream=f).sort_stats('cumulative').print_stats(40)
+            self.sessions += 1
+            self.last_output = base
+            self.logger.info(f"Profil kaydedildi: {base}.pstats / .folded / .txt")
+        except Exception as e:
+            self.logger.error(f"Profil yazma hatası: {e}")
+        self.publish()
+
+    def stop(self):
+        """Süren oturumu eldeki ölçümlerle kapat"""
+        if self._profile is not None:
+            if self._thread is not None:
+                self._profile.disable()
+            self._finish()
+
+    def publish(self):
+        """Profilleme durumunu metrik kayıt defterine yaz"""
+        get_metrics().publish('profiler', {
+            'active': self.active,
+            'remaining_minutes': self.remaining,
+            'sessions': self.sessions,
+            'last_output': self.last_output,
+        })
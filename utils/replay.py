@@ -0,0 +1,187 @@
+import json
+import threading
+import logging
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+
+
+class ApiRecorder:
+    """APIClient isteklerini ve yanıtlarını JSON satırları olarak kaydet"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, kind, request, response):
+        entry = {
+            'kind': kind,
+            'recorded_at': datetime.now(timezone.utc).timestamp(),
+            'request': request,
+            'response': response,
+        }
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+
+class SimulatedClock:
+    """Tekrar oynatmada "şimdi"yi belirleyen saat (APIClient clock parametresi)"""
+
+    def __init__(self, start_ts):
+        self.ts = int(start_ts)
+
+    def set(self, ts):
+        self.ts = int(ts)
+
+    def now(self):
+        return datetime.fromtimestamp(self.ts, tz=timezone.utc)
+
+    __call__ = now
+
+
+class BarTape:
+    """Tekrar oynatılacak dakikalık barlar (zaman damgasına göre sıralı)"""
+
+    def __init__(self, bars):
+        bars = sorted({int(bar['time']): bar for bar in bars}.values(), key=lambda bar: int(bar['time']))
+        self.bars = bars
+        self.times = np.array([int(bar['time']) for bar in bars], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.bars)
+
+    @classmethod
+    def from_recording(cls, path):
+        """Kayıt dosyasındaki tüm getinterval yanıtlarından bar bandı oluştur"""
+        bars = []
+        with open(path) as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry['kind'] == 'getinterval' and entry['response']:
+                    bars.extend(entry['response'].get('data') or [])
+        return cls(bars)
+
+    @classmethod
+    def synthetic(cls, minutes, start_ts=1704067200, price=0.5, volatility=0.001, seed=42):
+        """Kayıt yoksa rastgele yürüyüşle sentetik bar bandı"""
+        rng = np.random.default_rng(seed)
+        close = price * np.exp(np.cumsum(rng.normal(0, volatility, minutes)))
+        open_ = np.concatenate([[price], close[:-1]])
+        spread = np.abs(rng.normal(0, volatility / 2, minutes)) * close
+        volume = rng.lognormal(8, 0.5, minutes)
+        bars = [
+            {
+                'time': int(start_ts + i * 60),
+                'open': float(open_[i]),
+                'high': float(max(open_[i], close[i]) + spread[i]),
+                'low': float(min(open_[i], close[i]) - spread[i]),
+                'close': float(close[i]),
+                'volumeTo': float(volume[i]),
+            }
+            for i in range(minutes)
+        ]
+        return cls(bars)
+
+    def between(self, start_ts, end_ts):
+        """[start_ts, end_ts] aralığındaki barlar"""
+        lo = np.searchsorted(self.times, start_ts, side='left')
+        hi = np.searchsorted(self.times, end_ts, side='right')
+        return self.bars[lo:hi]
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """MetricTrees API'sinin /Prices/getinterval ve /ModelPredictions/add uçları"""
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server.replay
+        url = urlparse(self.path)
+        if not url.path.endswith('/Prices/getinterval'):
+            return self._send_json(404, {'error': 'not found'})
+
+        params = parse_qs(url.query)
+        start_ts = int(params['startTime'][0])
+        # Saatin ilerisindeki barlar henüz "oluşmamıştır"
+        end_ts = min(int(params['endTime'][0]), server.cursor)
+        bars = server.tape.between(start_ts, end_ts)
+        if server.provisional and bars and int(bars[-1]['time']) == server.cursor:
+            bars = bars[:-1] + [server.provisional_bar(bars[-1])]
+        server.stats['getinterval'] += 1
+        server.stats['bars_served'] += len(bars)
+        self._send_json(200, {'data': bars})
+
+    def do_POST(self):
+        server = self.server.replay
+        url = urlparse(self.path)
+        if not url.path.endswith('/ModelPredictions/add'):
+            return self._send_json(404, {'error': 'not found'})
+
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        with server.lock:
+            server.predictions.append(payload)
+        server.stats['predictions'] += 1
+        self._send_json(200, {'success': True})
+
+    def log_message(self, format, *args):
+        # Her isteği stderr'e yazma
+        pass
+
+
+class ReplayServer:
+    """Yerel HTTP API taklidi: bar bandını simüle saate göre sunar, tahminleri toplar"""
+
+    def __init__(self, tape, host='127.0.0.1', port=0, provisional_noise=0.0):
+        self.tape = tape
+        self.cursor = int(tape.times[0]) if len(tape) else 0
+        # provisional: imleçteki bar henüz kapanmamış gibi (gürültülü) sunulur
+        self.provisional = False
+        self.provisional_noise = provisional_noise
+        self.predictions = []
+        self.lock = threading.Lock()
+        self.stats = {'getinterval': 0, 'bars_served': 0, 'predictions': 0}
+        self.logger = logging.getLogger('replay_server')
+
+        self._httpd = ThreadingHTTPServer((host, port), _ReplayHandler)
+        self._httpd.replay = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def advance_to(self, ts, provisional=False):
+        """Sunulabilecek en son bar zamanını ayarla"""
+        self.cursor = int(ts)
+        self.provisional = provisional
+
+    def provisional_bar(self, bar):
+        """Kapanmamış barın taklidi: fiyatlar göreli gürültülü, hacim eksik"""
+        rng = np.random.default_rng(int(bar['time']))
+        factor = 1 + rng.normal(0, self.provisional_noise)
+        provisional = dict(bar)
+        for key in ('high', 'low', 'close'):
+            provisional[key] = float(bar[key]) * factor
+        provisional['volumeTo'] = float(bar['volumeTo']) * rng.uniform(0.75, 1.0)
+        return provisional
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Replay sunucusu başlatıldı: {self.base_url} ({len(self.tape)} bar)")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,161 @@
+import time
+import logging
+import numpy as np
+import pandas as pd
+from config.loader import get_config
+from utils.metrics import get_metrics
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+BAR_COLUMNS = PRICE_COLUMNS + ['volumeTo']
+# invariant_features'ın en uzun geriye bakışı (60 barlık lag/rolling) + son bar
+TAIL_BARS = 61
+
+
+class Speculation:
+    """Oluşmakta olan barla önceden hesaplanmış feature'lar ve model çıktıları"""
+
+    __slots__ = ('bar_time', 'previous_time', 'bar', 'features_df', 'inference', 'elapsed_ms')
+
+    def __init__(self, bar_time, previous_time, bar, features_df, inference, elapsed_ms):
+        self.bar_time = bar_time
+        self.previous_time = previous_time
+        self.bar = bar
+        self.features_df = features_df
+        self.inference = inference
+        self.elapsed_ms = elapsed_ms
+
+
+class SpeculativePipeline:
+    """Dakika kapanmadan (SPECULATIVE_START_SECOND'dan itibaren) feature ve çıkarımı hazırla
+
+    Kapanışta son bar geçici bara tolerans içinde yakınsa feature'ların son
+    satırı kesin barla yeniden hesaplanır ve model çıktıları yeniden kullanılır.
+    Önceki satırlar son bardan etkilenmez; fark büyükse feature'lar ve çıkarım
+    baştan hesaplanır.
+    """
+
+    def __init__(self, data_processor, ensemble_predictor, config=None):
+        self.params = config or get_config()
+        self.logger = logging.getLogger('speculation')
+        self.data_processor = data_processor
+        self.ensemble_predictor = ensemble_predictor
+        self.pending = None
+        self.attempted_minute = None
+        self.hits = 0
+        self.misses = 0
+        self.last_status = None
+        self.last_resolve_ms = 0.0
+
+    def claim(self, now, last_bar_time=None):
+        """Bu dakika için ön hesaplama sırası geldiyse dakikayı işaretle ve True döndür"""
+        if not (self.params.SPECULATIVE_START_SECOND <= now.second < 59):
+            return False
+        minute = pd.Timestamp(now).tz_localize(None).floor('min')
+        if last_bar_time is not None and minute <= last_bar_time:
+            return False  # Bu dakikanın barı zaten pencerede
+        if self.attempted_minute is not None and minute <= self.attempted_minute:
+            return False  # Dakika başına tek deneme (başarısız olsa da)
+        self.attempted_minute = minute
+        return True
+
+    def prepare(self, window_data, provisional):
+        """Pencereye geçici barı ekleyip feature ve model çıktılarını hesapla"""
+        started = time.perf_counter()
+        try:
+            if provisional is None or len(provisional) == 0 or len(window_data) == 0:
+                return None
+            bar_time = provisional.index[-1]
+            if bar_time <= window_data.index[-1]:
+                return None
+
+            window = pd.concat([window_data, provisional[window_data.columns.intersection(provisional.columns)]])
+            window = window.iloc[-len(window_data):]
+            features_df = self.data_processor.calculate_features(window)
+            inference = self.ensemble_predictor.infer(features_df)
+
+            self.pending = Speculation(
+                bar_time, window_data.index[-1], provisional[BAR_COLUMNS].iloc[-1].to_numpy(dtype=np.float64),
+                features_df, inference, (time.perf_counter() - started) * 1000
+            )
+            self.logger.info(f"Spekülatif hesaplama hazır: {bar_time} ({self.pending.elapsed_ms:.1f} ms)")
+            return self.pending
+
+        except Exception as e:
+            self.logger.error(f"Spekülatif hesaplama hatası: {e}")
+            self.pending = None
+            return None
+
+    def within_tolerance(self, provisional_bar, final_bar):
+        """Geçici ve kesin bar arasındaki göreli fark eşiklerin altında mı"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            diff = np.abs(final_bar - provisional_bar) / np.abs(final_bar)
+        diff = np.nan_to_num(diff, nan=0.0, posinf=np.inf)
+        return bool((diff[:4] <= self.params.SPECULATIVE_PRICE_TOLERANCE).all()
+                    and diff[4] <= self.params.SPECULATIVE_VOLUME_TOLERANCE)
+
+    def refresh_last_row(self, features_df, window_data):
+        """Spekülatif feature'ların son satırını kesin pencereyle yeniden hesapla
+
+        Pencere başından kümülatif sütunlar (vwap, obv, macd) tüm pencerenin ham
+        barlarıyla, diğerleri son TAIL_BARS barla hesaplanır. Kesin barla satır
+        NaN'a düşerse (dropna pencereyi kaydırır) None döner.
+        """
+        price_df = window_data[BAR_COLUMNS].copy()
+        price_df['close'] = pd.to_numeric(price_df['close'], errors='coerce')
+        self.data_processor.add_window_features(price_df)
+        tail = self.data_processor.invariant_features(price_df.iloc[-TAIL_BARS:].copy())
+
+        row = tail.iloc[-1][features_df.columns]
+        if tail.index[-1] != features_df.index[-1] or row.isna().any():
+            return None
+        features_df.iloc[-1] = row
+        return features_df
+
+    def resolve(self, window_data):
+        """Kapanıştaki pencere için (features_df, inference) döndür
+
+        inference None ise tahmin sırasında modeller çalıştırılır.
+        """
+        started = time.perf_counter()
+        speculation, self.pending = self.pending, None
+
+        reusable = (
+            speculation is not None
+            and len(window_data) > 1
+            and speculation.bar_time == window_data.index[-1]
+            and speculation.previous_time == window_data.index[-2]
+        )
+        final_bar = window_data[BAR_COLUMNS].iloc[-1].to_numpy(dtype=np.float64)
+
+        features_df = None
+        if reusable and self.within_tolerance(speculation.bar, final_bar):
+            features_df = self.refresh_last_row(speculation.features_df, window_data)
+
+        if features_df is not None:
+            # Sadece model çıktıları yeniden kullanılır; feature'lar kesin bara ait
+            inference = speculation.inference
+            self.hits += 1
+            self.last_status = 'hit'
+        else:
+            features_df = self.data_processor.calculate_features(window_data)
+            inference = None
+            if speculation is not None:
+                self.misses += 1
+                self.last_status = 'miss'
+            else:
+                self.last_status = 'none'
+
+        self.last_resolve_ms = (time.perf_counter() - started) * 1000
+        self.publish()
+        return features_df, inference
+
+    def publish(self):
+        """İsabet oranını metrik kayıt defterine yaz"""
+        total = self.hits + self.misses
+        get_metrics().publish('speculation', {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else None,
+            'last_status': self.last_status,
+            'last_resolve_ms': self.last_resolve_ms,
+        })